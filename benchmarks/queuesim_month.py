@@ -0,0 +1,65 @@
+"""
+Benchmark — one month of a 300-agent voice queue through the queue simulator.
+
+    python -m benchmarks.queuesim_month                 # exits 1 if over --budget
+    python -m benchmarks.queuesim_month --agents 500 --hours 720 --budget 15
+
+The queue carries the heaviest load its agents meet 80/20 at (AHT 240 s) under
+Erlang C, open 24/7 for --hours. Each case times simulate() for one
+replication and sets the simulated SL / ASA beside the analytic figures:
+exponential handle times (should agree with Erlang C within noise), lognormal
+handle times with bursty arrivals, and the same calls split over two skills
+with dedicated agents that overflow.
+"""
+
+import argparse
+import sys
+import time
+import numpy as np
+
+from ccbudget.engine import service_level, erlang_c
+from ccbudget.engine import queuesim
+
+AHT, TARGET, SECONDS = 240.0, 0.8, 20.0
+
+def _case(label, queues, groups, hours, seed, **kw):
+    t0  = time.perf_counter()
+    res = queuesim.simulate(queues, groups, hours, reps=1, seed=seed, **kw)
+    dt  = time.perf_counter() - t0
+    s   = queuesim.summarize(res)
+    print(f"{label:<34} {res['n_calls']:>10,} calls {dt:>7.2f} s {res['n_calls'] / dt:>11,.0f} calls/s   "
+          f"SL {s['sl_mean']:6.1%} (daily P5 {s['sl'][5]:6.1%})   ASA {s['asa_mean']:5.1f} s   "
+          f"occ {s['occ']:6.1%}")
+    return dt
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.queuesim_month", description=__doc__.split("\n\n")[0].strip())
+    ap.add_argument("--agents", type=int,   default=300,   help="agents on the queue (default: 300)")
+    ap.add_argument("--hours",  type=float, default=720,   help="simulated hours (default: 720 = 30 days)")
+    ap.add_argument("--budget", type=float, default=10.0,  help="seconds allowed for the base case (default: 10)")
+    ap.add_argument("--seed",   type=int,   default=2024,  help="random seed (default: 2024)")
+    args = ap.parse_args(argv)
+
+    grid = np.arange(1, args.agents * 100) / 100
+    load = grid[service_level(args.agents, grid, AHT, SECONDS) >= TARGET].max()
+    rate = load * 3600 / AHT
+    c    = float(erlang_c(args.agents, load))
+    print(f"{args.agents} agents, {load:.2f} Erlangs ({rate:,.0f} calls/h), {args.hours:g} h — Erlang C: "
+          f"SL {float(service_level(args.agents, load, AHT, SECONDS)):.1%}, ASA {c * AHT / (args.agents - load):.1f} s, "
+          f"occ {load / args.agents:.1%}")
+    queue = dict(rate=rate, aht=AHT, sl_seconds=SECONDS)
+    base  = _case("exponential AHT", [queue], [dict(agents=args.agents)], args.hours, args.seed)
+    _case("lognormal AHT (CV 1.5), bursts 15%", [queue], [dict(agents=args.agents)], args.hours, args.seed,
+          aht_dist="lognormal", aht_cv=1.5, burst=0.15)
+    half = dict(queue, rate=rate / 2)
+    _case("2 skills, dedicated + overflow", [half, half],
+          [dict(agents=args.agents // 2, primary=0), dict(agents=args.agents - args.agents // 2, primary=1)],
+          args.hours, args.seed)
+    if base > args.budget:
+        print(f"✗ base case took {base:.2f} s — over the {args.budget:g} s budget", file=sys.stderr)
+        return 1
+    print(f"✓ base case within the {args.budget:g} s budget")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
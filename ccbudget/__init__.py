@@ -0,0 +1,6 @@
+"""
+CCBudget — call-centre budget & forecast tool.
+The Streamlit app lives in streamlit_app.py / pages/; the maths in ccbudget.engine;
+saved budgets in ccbudget.store (SQLite); the precomputed Erlang C lookup table in
+ccbudget.erlang_table.
+"""
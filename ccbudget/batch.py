@@ -0,0 +1,98 @@
+"""
+Batch P&L — compute full-year P&L for a directory of filled import templates.
+
+    python -m ccbudget.batch budgets/ -o portfolio.csv --fx 38.5 --workers 8
+
+Each workbook is parsed with the same rules as the sidebar import and computed
+in a process pool (one workbook per task, all cores by default). Output is one
+long CSV: client, month, line, value — one row per client × month × line item.
+"""
+
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .engine import MONTHS, OH_ROLES, DEFAULT_SETTINGS, default_budget, make_settings, year_totals
+from .importer import parse_workbook, apply_import
+
+HEADER = ["client", "month", "line", "value"]
+
+def flatten(totals):
+    """One month's totals → [(line, value)], overhead roles as oh_<role>_<key>."""
+    lines = [(k, v) for k, v in totals.items() if k != "oh"]
+    for role, _ in OH_ROLES:
+        for k in ("hc", "cost_eur", "cost_try"):
+            lines.append((f"oh_{role}_{k}", totals["oh"][role][k]))
+    return lines
+
+def compute_file(path, settings):
+    """Worker: parse one workbook and return its long rows."""
+    name   = os.path.splitext(os.path.basename(path))[0]
+    budget = apply_import(default_budget(name), parse_workbook(path))
+    year   = year_totals(budget, settings)
+    return [(name, m, line, v) for m in MONTHS for line, v in flatten(year[m])]
+
+def find_workbooks(folder):
+    return sorted(os.path.join(folder, f) for f in os.listdir(folder)
+                  if f.lower().endswith(".xlsx") and not f.startswith("~$"))
+
+def run(paths, settings, out, workers=None):
+    """Compute every workbook in parallel and stream rows to out (a text file).
+    Returns {path: error message} for workbooks that failed."""
+    writer = csv.writer(out)
+    writer.writerow(HEADER)
+    failed = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(p, pool.submit(compute_file, p, settings)) for p in paths]
+        for path, fut in futures:                 # file order, so output is deterministic
+            try:
+                writer.writerows(fut.result())
+            except Exception as e:
+                failed[path] = str(e)
+    return failed
+
+def _parser():
+    ap = argparse.ArgumentParser(prog="python -m ccbudget.batch", description=__doc__.split("\n\n")[0].strip())
+    ap.add_argument("folder", help="directory of filled '② Budget Data' templates (.xlsx)")
+    ap.add_argument("-o", "--output", default="-", help="CSV path (default: stdout)")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="worker processes (default: all cores)")
+    d = DEFAULT_SETTINGS
+    ap.add_argument("--hours",     type=float, default=d["hours"],     help="worked hours / agent / month")
+    ap.add_argument("--shrink",    type=float, default=d["shrink"],    help="default shrinkage (decimal)")
+    ap.add_argument("--fx",        type=float, default=d["fx"],        help="EUR/TRY")
+    ap.add_argument("--usd-try",   type=float, default=None,           help="USD/TRY for USD-billed blocks (default: --fx)")
+    ap.add_argument("--ctc",       type=float, default=d["ctc"],       help="salary multiplier (CTC)")
+    ap.add_argument("--bonus-pct", type=float, default=d["bonus_pct"], help="bonus %% of base (decimal)")
+    ap.add_argument("--meal",      type=float, default=d["meal"],      help="meal card / agent / month (TRY)")
+    ap.add_argument("--attrition", type=float, default=d["attrition_rate"],      help="monthly attrition (decimal)")
+    ap.add_argument("--backfill",  type=float, default=d["backfill_efficiency"], help="backfill training efficiency")
+    return ap
+
+def main(argv=None):
+    args  = _parser().parse_args(argv)
+    if not os.path.isdir(args.folder):
+        print(f"Not a directory: {args.folder}", file=sys.stderr)
+        return 1
+    paths = find_workbooks(args.folder)
+    if not paths:
+        print(f"No .xlsx workbooks in {args.folder}", file=sys.stderr)
+        return 1
+    g = dict(hours=args.hours, shrink=args.shrink, fx=args.fx, ctc=args.ctc,
+             bonus_pct=args.bonus_pct, meal=args.meal)
+    if args.usd_try is not None:
+        g["usd_try"] = args.usd_try
+    settings = make_settings(g, args.attrition, args.backfill)
+    if args.output == "-":
+        failed = run(paths, settings, sys.stdout, args.workers)
+    else:
+        with open(args.output, "w", newline="") as out:
+            failed = run(paths, settings, out, args.workers)
+    for path, err in failed.items():
+        print(f"⚠ {os.path.basename(path)}: {err}", file=sys.stderr)
+    print(f"{len(paths) - len(failed)}/{len(paths)} workbooks computed", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
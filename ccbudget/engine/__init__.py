@@ -0,0 +1,23 @@
+"""
+Headless calculation engine — pure functions over explicit budget / settings dicts.
+
+No Streamlit import: safe for worker processes, batch jobs and benchmarks.
+
+    from ccbudget.engine import default_budget, make_settings, year_totals
+    year = year_totals(budget, make_settings(g, attrition_rate=0.05))
+"""
+
+from .common import MONTHS, TotalsCache, fingerprint
+from .budget import (OH_ROLES, DEFAULT_OPEX, DEFAULT_SETTINGS, DEFAULT_CONTRACT, default_budget,
+                     make_settings, get_oh_cfg, effective_hc)
+from .blocks import (BLOCK_SCHEMA, BLOCK_FIELDS, SIDE_TABLES, Block, BlockView, load_blocks, new_block,
+                     new_block_id, copy_month, apply_to_all, rekey_positions, block_labels)
+from .timeline import (TIMELINE_GLOBALS, date_pos, compile_timelines, timelines,
+                       effective_up, effective_salary, month_globals)
+from .cache import BUDGET_KEYS, month_fingerprints, budget_fps, budget_hash
+from .totals import (MonthTracker, year_lines, split_months, year_totals,
+                     get_totals, get_totals_scenario, calc_overhead)
+from .erlang import (erlang_b, erlang_c, service_level, solve_agents, erlang_solve, erlang_a,
+                     solve_agents_a, rostered_hc)
+from .portfolio import portfolio_years, portfolio_totals, pricing_record
+from . import target, goalseek, montecarlo, scenarios, sensitivity, periods, horizon, intervals, queuesim
@@ -0,0 +1,326 @@
+"""
+Typed production block records — one master per block, sparse monthly deltas.
+
+A Block keeps its fields in __slots__ (no per-instance dict) but reads and
+writes like the dicts the app has always stored — b["hc"], b.get("fx_override"),
+b.update({...}) — so editors, exports and pages keep working unchanged. A field
+at None reads as missing, as an absent dict key would: b.get(k, default) returns
+default, b[k] raises KeyError. Keys outside the schema go in a small side dict.
+
+budget["blocks"][month] holds BlockViews: a shared master Block plus that
+month's own changes, copy-on-write — writing through a view only records a
+delta (like hc_ramp does for HC), so a stable 12-month budget stores each block
+once, copying a month copies a list of views, and apply_to_all edits a block in
+every month that has not overridden the field.
+
+Every block has a stable id (shared by all its months' views) and the per-block
+side tables — SIDE_TABLES — are keyed by it, so deleting or reordering blocks
+never re-points a COLA, raise or hiring wave to another block. Each write
+stamps a Block with a fresh version — and a BlockView's own delta gets its own
+stamp — so caches key a month's block on (id, version, delta version) instead
+of hashing its fields. Nested values (hc_ramp) are replaced, never
+edited in place, or the stamp would not see the change.
+
+Older sessions hold plain dicts (schema 0), one Block per month (schema 1) or
+side tables keyed by list position (schema 2); load_blocks upgrades a budget in
+place and stamps it with BLOCK_SCHEMA.
+"""
+
+import copy
+import threading
+import uuid
+from collections.abc import MutableMapping
+from operator import attrgetter
+from .common import MONTHS
+
+BLOCK_SCHEMA = 3
+# Per-block configs {block id: …} kept outside the block records
+SIDE_TABLES = ("cola_configs", "salary_raises", "hc_waves")
+
+# (field, default) — defaults match what "+ Add Production Block" always wrote
+BLOCK_FIELDS = (
+    ("lang",               ""),
+    ("hc",                 0),
+    ("salary",             0),
+    ("unit_price",         0),      # EUR / hr — what the engine bills
+    ("unit_price_raw",     None),   # as entered (USD or EUR)
+    ("up_currency",        None),   # None = EUR
+    ("shrink_override",    None),   # decimal (0.15)
+    ("fx_override",        None),
+    ("hours_override",     None),
+    ("attrition_override", None),
+    ("hc_ramp",            None),   # {month: HC}
+    ("id",                 None),   # stable block id — set on creation
+)
+_FIELDS = frozenset(f for f, _ in BLOCK_FIELDS)
+_NAMES  = tuple(f for f, _ in BLOCK_FIELDS)
+_RECORD = attrgetter(*_NAMES)
+
+class _Stamps:
+    """Version stamps, unique in the process. .last is the newest one issued, so a
+    cache can tell in O(1) that no block anywhere has been written since it looked."""
+    __slots__ = ("last", "_lock")
+
+    def __init__(self):
+        self.last  = 0
+        self._lock = threading.Lock()
+
+    def __next__(self):
+        with self._lock:
+            self.last += 1
+            return self.last
+
+_STAMP  = _Stamps()
+
+def last_stamp():
+    """The newest version stamp issued — unchanged means no Block / BlockView was
+    created or written since."""
+    return _STAMP.last
+
+def new_block_id():
+    return uuid.uuid4().hex[:8]
+
+class Block(MutableMapping):
+    """One production block in one month (dict-compatible, see module docstring)."""
+    __slots__ = tuple(f for f, _ in BLOCK_FIELDS) + ("_extra", "_v")
+
+    def __init__(self, data=None, **kw):
+        for f, d in BLOCK_FIELDS:
+            setattr(self, f, d)
+        self._extra = None
+        self.update(data or {}, **kw)
+        if self.id is None:
+            self.id = new_block_id()
+        self._v = next(_STAMP)
+
+    @classmethod
+    def load(cls, d):
+        """Block from a stored record — a Block / BlockView, or a legacy (schema 0) dict."""
+        if isinstance(d, (Block, BlockView)):
+            return d
+        b = cls(d)
+        # Schema 0 sessions stored shrinkage as a percentage (15.0 for 0.15)
+        if b.shrink_override is not None and b.shrink_override > 1:
+            b["shrink_override"] = b.shrink_override / 100
+        return b
+
+    def __copy__(self):
+        b = object.__new__(Block)
+        for f in Block.__slots__:
+            setattr(b, f, getattr(self, f))
+        return b
+
+    def __deepcopy__(self, memo):
+        # Scalars are immutable; only the ramp and extra keys need their own copies
+        b = self.__copy__()
+        b.hc_ramp = dict(self.hc_ramp) if self.hc_ramp is not None else None
+        b._extra  = copy.deepcopy(self._extra, memo) if self._extra else None
+        return b
+
+    def record(self):
+        """Every field as a tuple in BLOCK_FIELDS order (None where unset)."""
+        return _RECORD(self)
+
+    def key(self):
+        """Cache key: (id, version) — changes whenever a field is written."""
+        return self.id, self._v
+
+    def to_dict(self):
+        """Plain dict of every field (None included) plus any extra keys."""
+        out = dict(zip(_NAMES, _RECORD(self)))
+        out.update(self._extra or {})
+        return out
+
+    def __getitem__(self, k):
+        v = self.get(k)
+        if v is None:
+            raise KeyError(k)
+        return v
+
+    def get(self, k, default=None):
+        v = getattr(self, k) if k in _FIELDS else (self._extra or {}).get(k)
+        return default if v is None else v
+
+    def __setitem__(self, k, v):
+        if k in _FIELDS:
+            setattr(self, k, v)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[k] = v
+        self._v = next(_STAMP)
+
+    def __delitem__(self, k):
+        if k in _FIELDS:
+            setattr(self, k, None)
+        else:
+            del (self._extra or {})[k]
+        self._v = next(_STAMP)
+
+    def __contains__(self, k):
+        return self.get(k) is not None
+
+    def __iter__(self):
+        yield from (f for f, _ in BLOCK_FIELDS if getattr(self, f) is not None)
+        yield from (self._extra or {})
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"Block({dict(self)!r})"
+
+class BlockView(MutableMapping):
+    """A block in one month: its master Block plus this month's delta
+    {field: value} (None = no changes). Reads fall through to the master;
+    writes only touch the delta, and a value equal to the master's drops out.
+    Every delta change stamps the view with a fresh version (_v), like a Block."""
+    __slots__ = ("master", "delta", "_v")
+
+    def __init__(self, master, delta=None):
+        self.master = master
+        self.delta  = delta or None
+        self._v     = next(_STAMP)
+
+    def fork(self):
+        """Another month's view of the same block, with its own copy of the delta."""
+        return BlockView(self.master, dict(self.delta) if self.delta else None)
+
+    def record(self):
+        r = self.master.record()
+        if self.delta:
+            d = self.delta
+            r = tuple(d[f] if f in d else v for f, v in zip(_NAMES, r))
+        return r
+
+    def key(self):
+        """Cache key: the master's (id, version) plus this month's delta version."""
+        return self.master.id, self.master._v, self._v
+
+    def to_dict(self):
+        out = self.master.to_dict()
+        out.update(self.delta or {})
+        return out
+
+    def get(self, k, default=None):
+        d = self.delta
+        v = d[k] if d is not None and k in d else self.master.get(k)
+        return default if v is None else v
+
+    def __getitem__(self, k):
+        v = self.get(k)
+        if v is None:
+            raise KeyError(k)
+        return v
+
+    def __getattr__(self, k):                   # b.hc etc., like a Block
+        if k in _FIELDS:
+            d = object.__getattribute__(self, "delta")
+            return d[k] if d is not None and k in d else getattr(self.master, k)
+        raise AttributeError(k)
+
+    def __setitem__(self, k, v):
+        if k == "id":
+            raise KeyError("A block's id is set on its master, not per month")
+        self._v = next(_STAMP)
+        if self.master.get(k) == v:
+            if self.delta is not None:
+                self.delta.pop(k, None)
+                self.delta = self.delta or None
+            return
+        if self.delta is None:
+            self.delta = {}
+        self.delta[k] = v
+
+    def __delitem__(self, k):
+        self[k] = None
+
+    def __iter__(self):
+        yield from (k for k, v in self.to_dict().items() if v is not None)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"BlockView({dict(self)!r}, delta={self.delta!r})"
+
+def load_blocks(budget):
+    """Upgrade budget["blocks"] to BlockViews in place (idempotent). The same
+    position in consecutive months becomes one master while its label stays the
+    same; differing fields become that month's delta. Side tables still keyed by
+    position move to the ids of the blocks at that position. Returns the budget."""
+    masters = {}                                # position → master Block
+    for m in MONTHS:
+        blks = budget["blocks"].get(m) or []
+        for i, b in enumerate(blks):
+            if isinstance(b, BlockView):
+                masters[i] = b.master
+                continue
+            b = Block.load(b)
+            master = masters.get(i)
+            if master is None or master.lang != b.lang:   # a different block at this position
+                masters[i] = master = b
+            view = BlockView(master)
+            if b is not master:
+                view.update({k: v for k, v in zip(_NAMES, b.record())
+                             if k != "id" and v != getattr(master, k)})
+            blks[i] = view
+    if budget.get("block_schema", 0) < 3:
+        for t in SIDE_TABLES:
+            if budget.get(t):
+                budget[t] = rekey_positions(budget, budget[t])
+    budget["block_schema"] = BLOCK_SCHEMA
+    return budget
+
+def rekey_positions(budget, table, months=MONTHS):
+    """{str(position): cfg} → {block id: cfg} for the blocks at each position in
+    any of months (a position that held several blocks over the year gives each
+    its own copy, as the positional config applied to all of them). Keys that
+    are already ids are kept."""
+    ids = {}
+    for m in months:
+        for i, b in enumerate(budget["blocks"].get(m) or []):
+            bid = b.get("id")
+            if bid is not None and bid not in ids.setdefault(str(i), []):
+                ids[str(i)].append(bid)
+    out = {k: v for k, v in table.items() if not str(k).isdigit()}
+    for k, v in table.items():
+        for bid in ids.get(str(k), []) if str(k).isdigit() else ():
+            out.setdefault(bid, copy.deepcopy(v))
+    return out
+
+def block_labels(budget):
+    """{block id: label} for every block in any month, in first-seen order —
+    "#position · lang" as of the first month the block appears."""
+    out = {}
+    for m in MONTHS:
+        for i, b in enumerate(budget["blocks"].get(m) or []):
+            if b.get("id") is not None and b["id"] not in out:
+                out[b["id"]] = f"#{i+1}" + (f" · {b['lang']}" if b.get("lang") else "")
+    return out
+
+def new_block(**fields):
+    """A new block (its own master) as a month entry."""
+    return BlockView(Block(fields))
+
+def copy_month(budget, src, dst):
+    """Month dst gets src's blocks: views of the same masters, deltas copied.
+    No record is duplicated, so later edits in either month stay independent."""
+    budget["blocks"][dst] = [BlockView.fork(b) if isinstance(b, BlockView) else BlockView(Block.load(b))
+                             for b in budget["blocks"].get(src, [])]
+
+def apply_to_all(budget, view):
+    """Make a view's month changes the block's own values: the delta moves into
+    the master and every month's override of those fields is cleared."""
+    if not view.delta:
+        return
+    master, changes = view.master, dict(view.delta)
+    for k, v in changes.items():
+        master[k] = v
+    for m in MONTHS:
+        for b in budget["blocks"].get(m, []):
+            if isinstance(b, BlockView) and b.master is master and b.delta:
+                for k in changes:
+                    b.delta.pop(k, None)
+                b.delta = b.delta or None
+                b._v    = next(_STAMP)
@@ -0,0 +1,88 @@
+"""
+Budget and settings objects.
+
+A budget is the plain dict the app keeps per client (blocks, COLA, raises,
+overhead, OPEX …). Settings are the global inputs (the app's `g`) plus the
+attrition / backfill rates, also a plain dict.
+"""
+
+import copy
+from .common import MONTHS
+from .blocks import BLOCK_SCHEMA
+
+OH_ROLES = [("TM", {"ratio":10, "salary":55000}),
+            ("QM", {"ratio":20, "salary":60000}),
+            ("OM", {"ratio":50, "salary":80000})]
+
+DEFAULT_OPEX = {
+    "training_cost_per_hire": 5000,   # TRY — one-time per backfill hire
+    "recruitment_fee":        8000,   # TRY — one-time per any new hire (ramp-up + backfill)
+    "it_cost_per_seat":       1500,   # TRY — monthly per active HC
+    "facilities_per_seat":    2000,   # TRY — monthly per active HC
+    "capex_pc":              15000,   # TRY — one-time per new seat (HC increase only)
+    "capex_headset":          3000,   # TRY — one-time per new seat
+    "capex_software":         5000,   # TRY — one-time per new seat
+}
+
+# Multi-year contract horizon (see engine.horizon). months=12 is the plain fiscal year.
+DEFAULT_CONTRACT = dict(
+    start_year = None,     # calendar year of month 1 (None = this year)
+    months     = 12,       # horizon length, 12 … 60
+    roll       = "hold",   # later years: "hold" December's blocks, or "repeat" Jan … Dec
+    cola_pct   = 0.0,      # unit price step at each contract anniversary
+    sal_pct    = 0.0,      # salary step (production + overhead) at each anniversary
+    fx_drift   = 0.0,      # annual EUR/TRY change, compounded monthly
+    fx_curve   = None,     # or EUR/TRY per horizon month (overrides drift)
+)
+
+DEFAULT_SETTINGS = dict(
+    hours=180, shrink=0.15, fx=38.0,
+    ctc=1.70, bonus_pct=0.10, meal=5850,
+    attrition_rate=0.05, backfill_efficiency=0.50,
+)
+
+def default_budget(name="Client A"):
+    return dict(
+        name=name,
+        blocks={m: [] for m in MONTHS},         # {month: [Block]} — see engine.blocks
+        block_schema=BLOCK_SCHEMA,
+        cola_configs={},
+        # Salary raises by block position: {str(idx): {date, pct}} — like cola_configs
+        salary_raises={},
+        # Intra-month hiring waves by block position: {str(idx): [{date, delta}]} —
+        # HC added (or removed) from that day on, day-prorated in its month
+        hc_waves={},
+        # Dated changes to global inputs: {setting: [{date, value}]}
+        global_changes={"hours": [], "fx": [], "shrink": []},
+        # Scenario Planner library: [{name, up_pct, sal_pct, hc_pct, fx, attrition, shrink}]
+        scenarios=[dict(name="Optimistic",   up_pct=5,  sal_pct=0,  hc_pct=0, fx=0, attrition=None, shrink=None),
+                   dict(name="Conservative", up_pct=-5, sal_pct=10, hc_pct=0, fx=0, attrition=None, shrink=None)],
+        overhead_global={
+            "TM": {"ratio": 10, "hc_override": None, "salary": 55000},
+            "QM": {"ratio": 20, "hc_override": None, "salary": 60000},
+            "OM": {"ratio": 50, "hc_override": None, "salary": 80000},
+        },
+        overhead_monthly={m: None for m in MONTHS},
+        opex=copy.deepcopy(DEFAULT_OPEX),
+        contract=copy.deepcopy(DEFAULT_CONTRACT),
+        # Actuals: {month: {rev, cost, hc, hrs_billable, margin}}
+        actuals={m: {} for m in MONTHS},
+    )
+
+def make_settings(g=None, attrition_rate=None, backfill_efficiency=None, **kw):
+    """Settings dict: defaults ← g ← explicit attrition / backfill ← kw."""
+    s = dict(DEFAULT_SETTINGS, **(g or {}))
+    if attrition_rate      is not None: s["attrition_rate"]      = attrition_rate
+    if backfill_efficiency is not None: s["backfill_efficiency"] = backfill_efficiency
+    s.update(kw)
+    return s
+
+def get_oh_cfg(month, budget):
+    mo = budget["overhead_monthly"].get(month)
+    return mo if mo is not None else budget["overhead_global"]
+
+def effective_hc(month, block):
+    """Return effective HC for a block in a given month.
+    Uses ramp schedule if defined, otherwise falls back to block base HC."""
+    ramp = block.get("hc_ramp", {})
+    return ramp.get(month, block.get("hc", 0))
@@ -0,0 +1,62 @@
+"""
+Content fingerprints for result caching and month-level dirty tracking.
+
+Full-year results are keyed by a content hash of everything the engine reads,
+so recomputing an unchanged budget is a dict lookup. Typed blocks enter the hash
+by their version stamps (id, version, delta version — see engine.blocks) as one
+tuple hash per month, never serialised. That per-month key is itself memoised
+behind a probe — the newest stamp issued plus the identities of the month's
+list and its blocks — so while no block anywhere is written, created, added,
+removed or moved, a lookup never walks the blocks; it costs a few small JSON
+hashes of the month's config, the side tables and the settings, each once.
+Stamps are process-local, like the caches they key.
+"""
+
+from .common import MONTHS, TotalsCache, fingerprint
+from .budget import get_oh_cfg
+from .blocks import Block, BlockView, last_stamp
+from .timeline import timelines
+
+BUDGET_KEYS = ("blocks", "block_schema", "cola_configs", "salary_raises", "hc_waves", "global_changes",
+               "overhead_global", "overhead_monthly", "opex", "contract")
+
+_MONTH_KEYS = TotalsCache(maxsize=1024)    # id(month list) → (probe, blocks key, block ids)
+
+def _blocks_key(blks):
+    """One month's blocks → (single int: the tuple hash of their stamps, frozenset
+    of their ids). Memoised for typed blocks; legacy dict blocks hash by content."""
+    probe = (last_stamp(), hash(tuple(map(id, blks))))
+    hit   = _MONTH_KEYS.get(id(blks))
+    if hit is not None and hit[0] == probe:
+        return hit[1], hit[2]
+    typed = all(isinstance(b, (Block, BlockView)) for b in blks)
+    key   = hash(tuple(b.key() if isinstance(b, (Block, BlockView)) else fingerprint(b) for b in blks))
+    bids  = frozenset(b.get("id") for b in blks)
+    if typed:
+        _MONTH_KEYS.put(id(blks), (probe, key, bids))
+    return key, bids
+
+def month_fingerprints(budget):
+    """One hash per month over everything that month's own lines read: its blocks,
+    its overhead config and the COLA / salary raise rates and hiring waves in
+    force that month."""
+    tl  = timelines(budget)
+    ids = tl["ids"]
+    fps = []
+    for mi, m in enumerate(MONTHS):
+        key, bids = _blocks_key(budget["blocks"].get(m, ()))
+        rows  = [r for k, r in ids.items() if k in bids]
+        rates = [(float(tl[w][r, mi]), float(tl[v][r])) for r in rows
+                 for w, v in (("cola_w", "cola_up"), ("raise_w", "raise_pct")) if tl[w][r, mi]]
+        waves = [float(tl["hc_wave"][r, mi]) for r in rows if tl["hc_wave"][r, mi]]
+        fps.append(fingerprint([key, get_oh_cfg(m, budget), rates, waves]))
+    return fps
+
+def budget_fps(budget, settings):
+    """(month fingerprints, global fingerprint) for one budget."""
+    return month_fingerprints(budget), fingerprint([budget.get("opex"), budget.get("global_changes"), settings])
+
+def budget_hash(budget, settings):
+    """Canonical content hash of one budget + settings (budget name excluded)."""
+    fps, gfp = budget_fps(budget, settings)
+    return fingerprint([gfp, fps])
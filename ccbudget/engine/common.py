@@ -0,0 +1,70 @@
+"""
+Shared constants and small array helpers for the calculation engine.
+"""
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+MONTHS = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
+
+def fingerprint(obj):
+    """Canonical content hash of any JSON-able structure (records with to_dict too)."""
+    raw = json.dumps(obj, sort_keys=True, separators=(",", ":"),
+                     default=lambda o: o.to_dict() if hasattr(o, "to_dict") else str(o))
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+def _opt(v):
+    """None → NaN so optional overrides can live in float arrays."""
+    return np.nan if v is None else v
+
+def _norm_shrink(v):
+    """Shrinkage as a decimal in [0, 0.99]; old sessions stored 15 instead of 0.15."""
+    v = np.asarray(v, dtype=float)
+    return np.clip(np.where(v > 1, v / 100, v), 0.0, 0.99)
+
+def _norm_attrition(v):
+    v = np.asarray(v, dtype=float)
+    return np.clip(np.where(v <= 1, v, v / 100), 0.0, 1.0)
+
+def _div(a, b):
+    """a / b with 0 wherever b == 0 (broadcasting)."""
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    return np.divide(a, b, out=np.zeros(a.shape), where=b != 0)
+
+class TotalsCache:
+    """Bounded LRU of full-year results with hit/miss counters. Thread-safe."""
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            val = self._data.get(key)
+            if val is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return val
+
+    def put(self, key, val):
+        with self._lock:
+            self._data[key] = val
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)   # evict least recently used
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return dict(hits=self.hits, misses=self.misses, size=len(self._data),
+                    maxsize=self.maxsize, hit_rate=self.hits / total if total else 0.0)
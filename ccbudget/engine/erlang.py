@@ -0,0 +1,283 @@
+"""
+Erlang C / Erlang A staffing maths (voice / blended queues) and shrinkage grossing-up.
+
+Erlang B comes from its recurrence B(n) = A·B(n-1) / (n + A·B(n-1)), which stays
+in [0, 1] — no factorials or powers of A, so loads of thousands of Erlangs are
+as stable as ten. Erlang C follows from B: C = N·B / (N − A·(1 − B)).
+
+The solver walks N upward for every queue at once (any array shape — months,
+months × intervals): below A the recurrence forgets its starting value within
+a few √A steps, so each queue starts WARMUP·√A under its load from the fluid
+approximation B ≈ 1 − n/A (burnt in over another WARMUP·√A steps), and stops
+at the first N > A that meets the service level. Cost is O(√A) numpy steps for the whole array; there is no agent ceiling.
+
+Erlang A (M/M/N+M) adds caller patience — exponential with mean `patience`
+seconds, θ = 1 / patience. With x = N·patience/aht, y = A·patience/aht and the
+queue-state series M(x, y) = Σ_k y^k / ∏_{i≤k} (x + i), the probability that all
+N agents are busy follows from Erlang B, abandonment is θ·E[queue] / λ, and the
+share of calls answered within t has a closed form in M(x, y) and M(x, y·e^(-θt))
+— no integration. The series are summed in log scale, so huge queues stay
+finite. The solver brackets N between a warm start and the Erlang C answer
+(galloping up if short patience needs more), walks the B recurrence across the
+bracket once, and narrows the bracket on the stored B values — interpolating
+on SL, with bisection every other probe. Identical parameter rows — the
+same hour on every weekday, empty nights — are solved once.
+"""
+
+import itertools
+import numpy as np
+
+# Warm start: the recurrence starts this many √A below the load (error ~ e^(-W²/2))
+WARMUP = 10.0
+# Erlang A bisection keeps (queues x bracket) B values; queues per chunk
+_CHUNK = 4096
+_LOG_BIG = 100 * np.log(10)
+
+def rostered_hc(productive_hc, shrinkage_pct):
+    shrink = max(0.0, min(0.99, shrinkage_pct / 100))
+    return productive_hc / (1 - shrink) if shrink < 1 else productive_hc
+
+def _warm_start(A):
+    """(n0, B(n0, A)) — where each queue's recurrence starts, WARMUP·√A under
+    the load. B(n0) itself comes from a burn-in walk of another WARMUP·√A steps
+    from the fluid value B ≈ 1 − n/A (or from B(0) = 1): each step there shrinks
+    the start error by n/A ≤ 1 − WARMUP/√A, so it is gone by n0."""
+    A  = np.asarray(A, dtype=float)
+    w  = WARMUP * np.sqrt(np.maximum(A, 0))
+    n0 = np.maximum(0.0, np.floor(A - w))
+    n  = np.maximum(0.0, np.floor(A - 2 * w))
+    b  = np.where(n > 0, 1 - n / np.where(A > 0, A, 1), 1.0)
+    for _ in range(int((n0 - n).max(initial=0))):
+        step = n < n0
+        n1   = n + 1
+        b    = np.where(step, A * b / (n1 + A * b), b)
+        n    = np.where(step, n1, n)
+    return n0, b
+
+def erlang_b(N, A):
+    """Erlang B blocking probability for N agents at A Erlangs (arrays broadcast)."""
+    N, A = np.broadcast_arrays(np.asarray(N, dtype=float), np.asarray(A, dtype=float))
+    n, b = _warm_start(A)
+    low  = N < n                                # N under the warm start: recur from B(0) = 1
+    n, b = np.where(low, 0.0, n), np.where(low, 1.0, b)
+    for _ in range(int((N - n).max(initial=0))):
+        step = n < N
+        n1   = n + 1
+        b    = np.where(step, A * b / (n1 + A * b), b)
+        n    = np.where(step, n1, n)
+    return b
+
+def erlang_c(N, A):
+    """Erlang C probability of waiting (1 where N ≤ A)."""
+    N, A = np.asarray(N, dtype=float), np.asarray(A, dtype=float)
+    return _erlang_c(N, A, erlang_b(N, A))
+
+def _erlang_c(N, A, B):
+    den = N - A * (1 - B)
+    return np.where(N > A, N * B / np.where(N > A, den, 1), 1.0)
+
+def _sl(N, A, C, aht, t):
+    return np.where(N > A, 1 - C * np.exp(-np.maximum(N - A, 0) * (t / aht)), 0.0)
+
+def _asa(N, A, C, aht):
+    return np.where(N > A, C * aht / np.where(N > A, N - A, 1), np.inf)
+
+def service_level(N, A, aht, t):
+    """Share of calls answered within t seconds with N agents."""
+    N, A = np.asarray(N, dtype=float), np.asarray(A, dtype=float)
+    return _sl(N, A, erlang_c(N, A), aht, t)
+
+def _unique_rows(mask, *cols):
+    """Distinct parameter rows among the masked elements → (columns of the
+    unique rows, index of each masked element's row)."""
+    rows = np.column_stack([c[mask] for c in cols]) if mask.any() else np.zeros((0, len(cols)))
+    u, where = np.unique(rows, axis=0, return_inverse=True)
+    return tuple(u.T), where.ravel()
+
+def _check_inputs(A, *cols):
+    """Reject NaN / infinite loads, and AHTs, targets or times of queues with
+    load (the solvers would never stop), and negative answer times."""
+    if not np.isfinite(A).all():
+        raise ValueError("Offered load must be a finite number of Erlangs")
+    live = A > 0
+    if not all(np.isfinite(c[live]).all() for c in cols):
+        raise ValueError("AHT, patience, service-level target and answer time must be finite numbers")
+    if (cols[-1][live] < 0).any():
+        raise ValueError("Answer time cannot be negative")
+
+def solve_agents(A, aht, sl_target, sl_seconds):
+    """Smallest N per queue meeting sl_target of calls answered within sl_seconds.
+    All arguments broadcast (A in Erlangs, aht / sl_seconds in seconds, target a
+    fraction). Returns dict(agents, asa seconds, occ %, sl) of arrays; queues with
+    no load get 0 agents, 0 ASA and 0 occupancy."""
+    A, aht, target, t = np.broadcast_arrays(*(np.asarray(x, dtype=float)
+                                              for x in (A, aht, sl_target, sl_seconds)))
+    _check_inputs(A, aht, target, t)
+    live = A > 0
+    if np.any(live & ((target >= 1) | ~(aht > 0))):
+        raise ValueError("Erlang C needs a service-level target below 100% and AHT above 0")
+    agents, asa, sl = np.zeros(A.shape, dtype=np.int64), np.zeros(A.shape), np.zeros(A.shape)
+    (a, h, g, s), where = _unique_rows(live, A, aht, target, t)
+    u_n, u_asa, u_sl = np.zeros(a.size), np.zeros(a.size), np.zeros(a.size)
+    idx  = np.arange(a.size)
+    n, b = _warm_start(a)
+    # Past A + WARMUP·√A, C < e^(-WARMUP²/2): any target below 1 is met by then
+    limit = int((a - n + WARMUP * np.sqrt(a)).max(initial=0)) + 64
+    for _ in range(limit):
+        if not idx.size:
+            break
+        n = n + 1
+        b = a * b / (n + a * b)
+        c = _erlang_c(n, a, b)
+        q = _sl(n, a, c, h, s)
+        ok = (n > a) & (q >= g)
+        if ok.any():
+            hit = idx[ok]
+            u_n[hit], u_asa[hit], u_sl[hit] = n[ok], _asa(n[ok], a[ok], c[ok], h[ok]), q[ok]
+            keep = ~ok
+            idx, a, h, g, s, n, b = (x[keep] for x in (idx, a, h, g, s, n, b))
+    if idx.size:
+        raise ValueError(f"Erlang C found no agent count meeting the target for {idx.size} queue(s)")
+    agents[live], asa[live], sl[live] = u_n[where], u_asa[where], u_sl[where]
+    occ = np.where(agents > 0, A / np.maximum(agents, 1) * 100, 0.0)
+    return dict(agents=agents, asa=asa, occ=occ, sl=sl)
+
+def erlang_solve(A, aht, sl_target, sl_seconds):
+    """Smallest agent count meeting sl_target of calls answered within sl_seconds.
+    A: offered traffic in Erlangs. Returns (agents, ASA seconds, occupancy %)."""
+    if A <= 0: return 0, 0, 0
+    r = solve_agents(A, aht, sl_target, sl_seconds)
+    return int(r["agents"]), float(r["asa"]), float(r["occ"])
+
+# ── Erlang A (abandonment) ───────────────────────────────────
+def _queue_series(x, y):
+    """(log Σ_{k≥1} T_k, log Σ_k k·T_k) with T_k = y^k / ∏_{i≤k} (x + i) — the
+    queue states of Erlang A relative to "all agents busy". Summed until the
+    geometric tail bound is below 1e-16 (checked every 8 terms), rescaling by
+    1e-100 to stay finite."""
+    lm, lk = np.full(x.shape, -np.inf), np.full(x.shape, -np.inf)
+    idx = np.flatnonzero(y > 0)
+    x, y = x[idx], y[idx]
+    t, m, k1, scale = np.ones(idx.size), np.zeros(idx.size), np.zeros(idx.size), np.zeros(idx.size)
+    k = 0
+    while idx.size:
+        for _ in range(8):
+            k += 1
+            t  = t * y / (x + k)
+            m  = m + t
+            k1 = k1 + k * t
+        big = m > 1e100
+        if big.any():
+            t[big], m[big], k1[big] = t[big] * 1e-100, m[big] * 1e-100, k1[big] * 1e-100
+            scale[big] += _LOG_BIG
+        r    = y / (x + k + 1)                  # ratio of the next term; falls with k
+        q    = r / np.where(r < 1, 1 - r, 1)
+        done = (r < 1) & (t * q <= 1e-16 * m) & (t * (k * q + q / np.where(r < 1, 1 - r, 1)) <= 1e-16 * k1)
+        if done.any():
+            lm[idx[done]] = scale[done] + np.log(m[done])
+            lk[idx[done]] = scale[done] + np.log(k1[done])
+            keep = ~done
+            idx, x, y, t, m, k1, scale = (v[keep] for v in (idx, x, y, t, m, k1, scale))
+    return lm, lk
+
+def _erlang_a(N, A, B, aht, patience, t):
+    """Erlang A figures for N agents at A Erlangs, given B = erlang_b(N, A):
+    dict(wait P(all busy), abandon share, asa mean wait of offered calls
+    (E[queue] / λ, as Erlang C's ASA), sl share answered within t)."""
+    r   = patience / aht
+    x, y = N * r, A * r
+    v0  = np.exp(-t / patience)
+    lm, lk   = _queue_series(np.concatenate([x, x]), np.concatenate([y, y * v0]))
+    lm1, lm01 = np.split(lm, 2)
+    lk, _     = np.split(lk, 2)
+    with np.errstate(divide="ignore"):
+        lb  = np.log(B)
+        lpn = lb - np.logaddexp(np.log1p(-B), lb + np.logaddexp(0.0, lm1))   # log P(N busy)
+    wait = np.exp(lpn + np.logaddexp(0.0, lm1))
+    eq   = np.exp(lpn + lk)                      # E[queue] relative to λ·(aht / A)
+    lg   = y * (1 - v0) - N * t / aht
+    sl   = 1 - wait + N / A * (np.exp(lpn + lm1) - np.exp(lpn + lg + lm01))
+    return dict(wait=wait, abandon=eq / y, asa=eq * aht / A, sl=np.clip(sl, 0.0, 1.0))
+
+def erlang_a(N, A, aht, patience, t):
+    """Erlang A for N agents (arrays broadcast): dict(wait, abandon, asa, sl) —
+    see _erlang_a. Queues with N = 0 or no load get zeros."""
+    N, A, aht, patience, t = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (N, A, aht, patience, t)))
+    out = {k: np.zeros(N.shape) for k in ("wait", "abandon", "asa", "sl")}
+    ok  = (N > 0) & (A > 0)
+    if ok.any():
+        n, a = N[ok], A[ok]
+        for k, v in _erlang_a(n, a, erlang_b(n, a), aht[ok], patience[ok], t[ok]).items():
+            out[k][ok] = v
+    return out
+
+def _b_table(a, n0, b0, width):
+    """B(n0 + j, a) for j = 0 … width, one recurrence walk: (queues, width + 1)."""
+    cols, b = [b0], b0
+    for j in range(1, width + 1):
+        b = a * b / (n0 + j + a * b)
+        cols.append(b)
+    return np.stack(cols, axis=1)
+
+def _solve_a(a, h, p, g, s):
+    """Bracketed search for distinct live queues → agent counts (float).
+    Probes alternate interpolation on SL with bisection (SL rises smoothly in N)."""
+    rows   = np.arange(a.size)
+    n0, b0 = _warm_start(a)
+    sl_lo  = np.zeros(a.size)
+    # Lower bracket must miss the target: else start from no agents (B(0) = 1)
+    chk = np.flatnonzero(n0 >= 1)
+    if chk.size:
+        sl_lo[chk] = _erlang_a(n0[chk], a[chk], b0[chk], h[chk], p[chk], s[chk])["sl"]
+        hit = chk[sl_lo[chk] >= g[chk]]
+        n0[hit], b0[hit], sl_lo[hit] = 0.0, 1.0, 0.0
+    # Upper bracket: the Erlang C count, doubled while short patience still misses
+    top = solve_agents(a, h, g, s)["agents"] - n0
+    tab = _b_table(a, n0, b0, int(top.max()))
+    while True:
+        sl_hi = _erlang_a(n0 + top, a, tab[rows, top.astype(np.intp)], h, p, s)["sl"]
+        miss  = sl_hi < g
+        if not miss.any():
+            break
+        top = np.where(miss, 2 * top, top)
+        tab = _b_table(a, n0, b0, int(top.max()))
+    lo, hi = np.zeros(a.size), top
+    for it in itertools.count():
+        act = np.flatnonzero(hi - lo > 1)
+        if not act.size:
+            return n0 + hi
+        l, u = lo[act], hi[act]
+        if it % 2:
+            mid = (l + u) // 2
+        else:
+            frac = (g[act] - sl_lo[act]) / np.maximum(sl_hi[act] - sl_lo[act], 1e-12)
+            mid  = np.clip(np.ceil(l + frac * (u - l)), l + 1, u - 1)
+        q  = _erlang_a(n0[act] + mid, a[act], tab[act, mid.astype(np.intp)], h[act], p[act], s[act])["sl"]
+        ok = q >= g[act]
+        hi[act[ok]], sl_hi[act[ok]]   = mid[ok], q[ok]
+        lo[act[~ok]], sl_lo[act[~ok]] = mid[~ok], q[~ok]
+
+def solve_agents_a(A, aht, patience, sl_target, sl_seconds):
+    """Erlang A staffing: smallest N per queue with sl_target of offered calls
+    answered within sl_seconds, callers abandoning after `patience` seconds on
+    average. Arguments broadcast as in solve_agents. Returns dict(agents, asa,
+    abandon share, occ % — answered load over agents, sl, wait) of arrays."""
+    A, aht, pat, target, t = np.broadcast_arrays(*(np.asarray(x, dtype=float)
+                                                   for x in (A, aht, patience, sl_target, sl_seconds)))
+    _check_inputs(A, aht, pat, target, t)
+    live = A > 0
+    if np.any(live & ((target >= 1) | ~(aht > 0) | ~(pat > 0))):
+        raise ValueError("Erlang A needs a service-level target below 100%, AHT and patience above 0")
+    out = dict(agents=np.zeros(A.shape, dtype=np.int64), **{k: np.zeros(A.shape) for k in
+                                                             ("asa", "abandon", "occ", "sl", "wait")})
+    (a, h, p, g, s), where = _unique_rows(live, A, aht, pat, target, t)
+    n = np.zeros(a.size)
+    for i in range(0, a.size, _CHUNK):
+        sl_ = slice(i, i + _CHUNK)
+        n[sl_] = _solve_a(a[sl_], h[sl_], p[sl_], g[sl_], s[sl_])
+    q = erlang_a(n, a, h, p, s)
+    q["occ"] = a * (1 - q["abandon"]) / np.maximum(n, 1) * 100
+    out["agents"][live] = n[where]
+    for k in ("asa", "abandon", "occ", "sl", "wait"):
+        out[k][live] = q[k][where]
+    return out
@@ -0,0 +1,119 @@
+"""
+Goal-seek against the real budget — the full engine (blocks, overhead ceilings,
+backfill, OPEX, CAPEX), not the one-cohort formulas in target.py.
+
+Each solve is a batched bracket: K candidates go through one _apply call, the
+bracket shrinks to the gap around the first (or last) one that meets the target,
+and a few passes reach the tolerance. Overhead HC is a ceiling, so margin is a
+step function of HC — bracketing handles the steps where Newton would stall.
+Block stats are linear in a block's UP and HC, so candidate stats are a lerp
+between two reductions, never a reload.
+"""
+
+import numpy as np
+from .common import MONTHS, _div
+from .timeline import month_globals
+from .totals import _reduce_rows, _load_block_rows, _oh_params, _params, _apply
+
+K = 33          # candidates per engine call
+
+def _context(budget, settings):
+    rows = _load_block_rows(budget)
+    return dict(rows=rows, stats=_reduce_rows(rows), opex=budget.get("opex", {}),
+                oh=_oh_params(budget), mg=month_globals(settings, budget), settings=settings)
+
+def _fy(ctx, stats=None, overlay=None):
+    """FY (margin %, margin, rev) for the batch in stats / overlay."""
+    p     = _params(ctx["settings"], overlay, ctx["mg"])
+    lines = _apply(ctx["stats"] if stats is None else stats, ctx["opex"], ctx["oh"], p)
+    rev, margin = lines["rev"].sum(axis=-1), lines["margin"].sum(axis=-1)
+    return _div(margin, rev), margin, rev
+
+def _lerp_stats(s0, s1, x):
+    """Stats at x for stats linear in x: s0 at 0, s1 at 1. An array x becomes a
+    leading batch axis."""
+    x = np.asarray(x, dtype=float)
+    return {k: s0[k] + x.reshape(x.shape + (1,) * s0[k].ndim) * (s1[k] - s0[k]) for k in s0}
+
+def _seek(f, lo, hi, target, side="min", tol=1e-6, integer=False, max_iter=20):
+    """Smallest (side="min") or largest (side="max") x in [lo, hi] with f(x) ≥ target,
+    to within tol (1 for integer). f maps an array of candidates to margin %.
+    None if no candidate qualifies."""
+    best = None
+    for _ in range(max_iter):
+        xs = np.linspace(lo, hi, K)
+        if integer:
+            xs = np.unique(np.round(xs))
+        ok = f(xs) >= target
+        if not ok.any():
+            return best
+        i = int(np.argmax(ok)) if side == "min" else len(ok) - 1 - int(np.argmax(ok[::-1]))
+        best = float(xs[i])
+        if side == "min":
+            if i == 0: return best
+            lo, hi = xs[i - 1], xs[i]
+        else:
+            if i == len(xs) - 1: return best
+            lo, hi = xs[i], xs[i + 1]
+        if hi - lo <= (1 if integer else tol * max(1.0, abs(hi))):
+            return best
+    return best
+
+def _result(ctx, stats=None, overlay=None, **extra):
+    pct, margin, rev = _fy(ctx, stats, overlay)
+    return dict(extra, margin_pct=float(pct), margin=float(margin), rev=float(rev))
+
+def up_uplift(budget, settings, target, hi=5.0):
+    """Uniform unit price multiplier (all blocks) for FY margin ≥ target (decimal).
+    Returns dict(up_mult, margin_pct, margin, rev, base_margin_pct) or None."""
+    ctx  = _context(budget, settings)
+    f    = lambda xs: _fy(ctx, overlay=dict(up_pct=xs[:, None]))[0]
+    mult = _seek(f, 0.0, hi, target)
+    if mult is None:
+        return None
+    return _result(ctx, overlay=dict(up_pct=mult), up_mult=mult,
+                   base_margin_pct=float(_fy(ctx)[0]))
+
+def _block_rows(ctx, bid):
+    hit = ctx["rows"]["bid"] == bid
+    if not hit.any():
+        raise ValueError(f"No block with id '{bid}' in any month")
+    return hit
+
+def block_up(budget, settings, bid, target, hi=5.0):
+    """Multiplier on one block's UP (by block id; every month, COLA price included)
+    for FY margin ≥ target, other blocks at plan.
+    Returns dict(up_mult, up={month: new UP}, margin_pct, margin, rev) or None."""
+    ctx  = _context(budget, settings)
+    rows = ctx["rows"]
+    hit  = _block_rows(ctx, bid)
+    s1   = _reduce_rows({**rows, "up": np.where(hit, 0.0, rows["up"]), "up_raw": np.where(hit, 0.0, rows["up_raw"])})
+    s2   = _reduce_rows(rows)
+    # stats(mult) = s1 + mult × (s2 − s1)
+    f    = lambda xs: _fy(ctx, _lerp_stats(s1, s2, xs))[0]
+    mult = _seek(f, 0.0, hi, target)
+    if mult is None:
+        return None
+    up = {MONTHS[m]: float(u * mult) for m, u in zip(rows["month"][hit], rows["up"][hit])}
+    return _result(ctx, _lerp_stats(s1, s2, mult), up_mult=mult, up=up)
+
+def max_block_hc(budget, settings, bid, target, unit_price=None, cap=None):
+    """Largest flat HC for one block (by block id, every month it exists) keeping
+    FY margin ≥ target, optionally at a new unit price (EUR/hr). Overhead ceilings,
+    backfill, recruitment and CAPEX on the HC steps are all included.
+    Returns dict(hc, capped, margin_pct, margin, rev) or None if even 0 misses."""
+    ctx  = _context(budget, settings)
+    rows = dict(ctx["rows"])
+    hit  = _block_rows(ctx, bid)
+    if unit_price is not None:
+        rows["up"]     = np.where(hit, unit_price, rows["up"])
+        rows["up_raw"] = np.where(hit, unit_price, rows["up_raw"])
+        rows["usd"]    = np.where(hit, False, rows["usd"])
+    s0  = _reduce_rows({**rows, "hc": np.where(hit, 0.0, rows["hc"])})
+    s1  = _reduce_rows({**rows, "hc": np.where(hit, 1.0, rows["hc"])})
+    cap = cap or max(1000, 10 * int(rows["hc"][hit].max()))
+    f   = lambda xs: _fy(ctx, _lerp_stats(s0, s1, xs))[0]
+    hc  = _seek(f, 0, cap, target, side="max", integer=True)
+    if hc is None:
+        return None
+    return _result(ctx, _lerp_stats(s0, s1, hc), hc=int(hc), capped=hc >= cap)
@@ -0,0 +1,133 @@
+"""
+Multi-year contract horizon — up to 60 months on one time axis.
+
+budget["contract"] (see budget.DEFAULT_CONTRACT) sets the start year, the length
+in months, how the fiscal-year block schedule rolls into later years ("hold"
+keeps December's blocks — the steady state after ramps; "repeat" re-runs
+Jan … Dec) and the annual escalators: unit price COLA and salary steps at each
+anniversary, EUR/TRY drift or an explicit month-by-month FX curve.
+
+Nothing is stored per horizon month. Block rows are gathered onto the horizon
+with one index array (columnar, linear in its length), dated changes compile on
+year-aware positions, and one _apply gives every line as a (months,) array.
+by_year / contract_total / year_slice cut that back into FY views.
+
+Dates follow two conventions. The fiscal-year engine (year_lines) places a date
+by month and day only — 2025-04-15 is mid-April of the budget year — while the
+horizon counts its year from start_year: a change dated before the contract is
+already in force in month 1, one dated in year 3 lands in year 3. Contract year
+1 equals year_lines only when every dated change falls in start_year
+(off_year_changes lists the ones that do not).
+"""
+
+import datetime as _dt
+import numpy as np
+from .common import MONTHS, fingerprint, _div
+from .budget import OH_ROLES, DEFAULT_CONTRACT
+from .timeline import compile_timelines, timeline_rows, date_pos
+from .totals import _raw_block_rows, _dated_rows, _reduce_rows, _oh_params, _params, _apply, _year_key
+from .periods import _period_rows, aggregate
+
+MAX_MONTHS = 60
+ROLL_MODES = ("hold", "repeat")
+
+def contract_cfg(budget):
+    """The budget's contract settings over the defaults."""
+    return {**DEFAULT_CONTRACT, **(budget.get("contract") or {})}
+
+def horizon_axis(contract):
+    """Month axis of a contract → dict(start_year, labels, edges (n+1,), month (n,)
+    source fiscal month of each horizon month, year (n,) contract year, frac (n,))."""
+    c = {**DEFAULT_CONTRACT, **(contract or {})}
+    n = int(c["months"])
+    if not 1 <= n <= MAX_MONTHS:
+        raise ValueError(f"Contract horizon must be 1 … {MAX_MONTHS} months, got {n}")
+    if c["roll"] not in ROLL_MODES:
+        raise ValueError(f"Unknown roll mode '{c['roll']}' — use one of {ROLL_MODES}")
+    start = int(c["start_year"] or _dt.date.today().year)
+    h = np.arange(n)
+    return dict(granularity="horizon", start_year=start, n_years=(n + 11) // 12,
+                labels=[f"{MONTHS[i % 12]} {start + i // 12}" for i in h],
+                edges=np.arange(n + 1, dtype=float),
+                month=h % 12 if c["roll"] == "repeat" else np.minimum(h, len(MONTHS) - 1),
+                year=h // 12, frac=np.ones(n))
+
+def off_year_changes(budget, start_year):
+    """[(table, date)] of dated changes outside start_year — where contract year 1
+    and the fiscal-year view differ (see the module docstring)."""
+    out = []
+    for t in ("cola_configs", "salary_raises"):
+        out += [(t, c["date"]) for c in (budget.get(t) or {}).values() if c and c.get("date")]
+    out += [("hc_waves", w["date"]) for ws in (budget.get("hc_waves") or {}).values() for w in ws or []
+            if w.get("date")]
+    out += [(f"global_changes.{k}", c["date"]) for k, cs in (budget.get("global_changes") or {}).items()
+            for c in cs or [] if c.get("date")]
+    return [(t, d) for t, d in out if date_pos(d) is not None and str(d).strip()[:4] != str(start_year)]
+
+def _fx_path(c, fx, n):
+    """EUR/TRY per horizon month: the explicit curve, else plan rates × drift."""
+    if c["fx_curve"] is not None:
+        curve = np.asarray(c["fx_curve"], dtype=float)
+        if curve.shape != (n,):
+            raise ValueError(f"FX curve has {curve.size} rates for a {n}-month horizon")
+        return curve
+    return fx * (1 + c["fx_drift"]) ** (np.arange(n) / len(MONTHS))
+
+def horizon_lines(budget, settings, cache=None):
+    """(axis, every P&L line as {key: array (months,)}) over the contract horizon.
+    Per-block FX overrides keep their rate; USD/TRY moves with EUR/TRY.
+    With a cache (TotalsCache) the result is keyed on the budget / settings hash."""
+    c    = contract_cfg(budget)
+    axis = horizon_axis(c)
+    if cache is not None:
+        # dated configs by full date: the year-1 fingerprints only see month positions
+        key = fingerprint(["horizon", _year_key(budget, settings)[0], c, budget.get("cola_configs"),
+                           budget.get("salary_raises"), budget.get("hc_waves")])
+        hit = cache.get(key)
+        if hit is not None:
+            return axis, hit
+    n    = len(axis["frac"])
+    tl   = compile_timelines(budget, axis["edges"], start_year=axis["start_year"])
+    raw  = _raw_block_rows(budget)
+    raw["trow"] = timeline_rows(tl, raw.pop("bid"))
+    rows = _period_rows(raw, axis)
+    rows = _dated_rows(rows, tl, rows["month"])
+    # Anniversary steps by each row's contract year
+    up_k  = (1 + c["cola_pct"]) ** axis["year"][rows["month"]]
+    sal_k = (1 + c["sal_pct"]) ** axis["year"][rows["month"]]
+    rows  = dict(rows, up=rows["up"] * up_k, up_raw=rows["up_raw"] * up_k, sal=rows["sal"] * sal_k)
+    stats = _reduce_rows(rows, n=n)
+
+    mg = {k: settings[k] * base_w + fixed for k, (base_w, fixed) in tl["globals"].items()}
+    fx = _fx_path(c, mg["fx"], n)
+    p  = _params(settings, None, {**mg, "fx": fx})
+    p["usd_try"] = p["usd_try"] * np.where(mg["fx"] != 0, _div(fx, mg["fx"]), 1.0)
+    oh_k = (1 + c["sal_pct"]) ** axis["year"]
+    oh   = {role: (ratio[axis["month"]], sal[axis["month"]] * oh_k, ovr[axis["month"]])
+            for role, (ratio, sal, ovr) in _oh_params(budget).items()}
+    lines = _apply(stats, budget.get("opex", {}), oh, p, frac=axis["frac"])
+    if cache is not None:
+        cache.put(key, lines)
+    return axis, lines
+
+def by_year(lines, axis):
+    """Horizon lines → {key: array (contract years,)}: flows summed, headcounts
+    averaged over the months of each year (a short last year averages its own)."""
+    per_year = np.bincount(axis["year"])
+    return aggregate(lines, axis["year"], axis["n_years"], 1 / per_year[axis["year"]])
+
+def contract_total(lines, axis):
+    """Whole-contract totals {key: float}: flows summed, headcounts averaged."""
+    n   = len(axis["year"])
+    tot = aggregate(lines, np.zeros(n, dtype=np.intp), 1, np.full(n, 1 / n))
+    return {k: float(v[0]) for k, v in tot.items() if k != "oh"}
+
+def year_slice(lines, axis, k):
+    """Contract year k's months in the year_lines layout: {key: array (≤ 12,)}
+    (oh nested), plus labels — ready for split_months-style monthly tables."""
+    sl  = slice(12 * k, 12 * (k + 1))
+    out = {key: v[..., sl] for key, v in lines.items() if key != "oh"}
+    out["oh"] = {role: {key: v[..., sl] for key, v in lines["oh"][role].items()} for role, _ in OH_ROLES}
+    out["oh"]["total_cost_try"] = out["oh_cost_try"]
+    out["oh"]["total_cost_eur"] = out["oh_cost_eur"]
+    return out, axis["labels"][sl]
@@ -0,0 +1,102 @@
+"""
+Interval staffing — Erlang C / Erlang A on a weekly profile of 15-minute intervals.
+
+Each queue has, per month, a typical week of arrivals (INTERVALS = 672 interval
+call counts) and an AHT curve on the same axis. Every interval of every month
+and queue is solved in one solve_agents (Erlang C) or solve_agents_a (Erlang A,
+with caller patience) call over a (queues, 12, 672) array;
+the monthly rollup turns agents-on-phone back into the productive / rostered
+HC, occupancy and service level the monthly schedules carry.
+
+    calls = weekly_calls[:, :, None] * weekly_profile(days, intraday)
+    sol, months = interval_schedule(calls, aht, 0.8, 20, hours_per_fte=180,
+                                    shrinkage_pct=15)
+"""
+
+import numpy as np
+from .erlang import solve_agents, solve_agents_a
+
+INTERVAL_MIN    = 15
+DAYS            = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+PER_DAY         = 24 * 60 // INTERVAL_MIN           # 96
+INTERVALS       = len(DAYS) * PER_DAY               # 672
+WEEKS_PER_MONTH = 52 / 12
+
+def interval_labels():
+    """'Mon 00:00' … 'Sun 23:45'."""
+    return [f"{d} {i * INTERVAL_MIN // 60:02d}:{i * INTERVAL_MIN % 60:02d}" for d in DAYS for i in range(PER_DAY)]
+
+def weekly_profile(day_weights, intraday):
+    """Share of a week's calls in each interval (sums to 1). day_weights: 7
+    weights Mon … Sun; intraday: 24 hourly or 96 interval weights, or one such
+    curve per day (7, 24 | 96). Hourly weights are spread evenly over the hour."""
+    day = np.asarray(day_weights, dtype=float)
+    cur = np.asarray(intraday, dtype=float)
+    if day.shape != (len(DAYS),):
+        raise ValueError(f"Need {len(DAYS)} day weights, got {day.size}")
+    if cur.shape[-1] not in (24, PER_DAY) or cur.ndim > 2 or (cur.ndim == 2 and len(cur) != len(DAYS)):
+        raise ValueError(f"Intraday curve must be 24 hourly or {PER_DAY} interval weights (per day or shared)")
+    if (day < 0).any() or (cur < 0).any():
+        raise ValueError("Profile weights cannot be negative")
+    if cur.shape[-1] == 24:
+        cur = np.repeat(cur, PER_DAY // 24, axis=-1)
+    cur  = np.broadcast_to(cur, (len(DAYS), PER_DAY))
+    norm = cur.sum(axis=1, keepdims=True)
+    prof = (day[:, None] * np.divide(cur, norm, out=np.zeros_like(cur), where=norm > 0)).ravel()
+    if prof.sum() <= 0:
+        raise ValueError("Profile has no arrivals")
+    return prof / prof.sum()
+
+def interval_staffing(calls, aht, sl_target, sl_seconds, patience=None, table=None):
+    """Per-interval Erlang C — or Erlang A with a mean patience in seconds.
+    calls: arrivals per interval (…, INTERVALS); aht (seconds), sl_target
+    (fraction), sl_seconds and patience broadcast against it. table: an
+    ErlangTable to look Erlang C up in (ccbudget.erlang_table). Returns dict(load
+    Erlangs, agents, asa, occ %, sl, abandon) of (…, INTERVALS) arrays."""
+    calls = np.asarray(calls, dtype=float)
+    if calls.shape[-1:] != (INTERVALS,):
+        raise ValueError(f"Arrivals need {INTERVALS} intervals on the last axis, got {calls.shape[-1:]}")
+    aht  = np.broadcast_to(np.asarray(aht, dtype=float), calls.shape)
+    load = np.where(calls > 0, calls * np.where(calls > 0, aht, 0.0) / (INTERVAL_MIN * 60), 0.0)
+    if patience is None:
+        solve = table.solve_agents if table is not None else solve_agents
+        return dict(load=load, abandon=np.zeros(calls.shape), **solve(load, aht, sl_target, sl_seconds))
+    return dict(load=load, **solve_agents_a(load, aht, patience, sl_target, sl_seconds))
+
+def monthly_rollup(calls, sol, hours_per_fte, shrinkage_pct=0, pool=False):
+    """Interval results → month figures, arrays over the leading axes (…,):
+    volume (calls / month), agent_hours, productive_hc (agent hours / worked
+    hours per FTE), rostered_hc (grossed up for shrinkage, rounded up),
+    peak_agents, occ % (answered workload over staffed time), sl %, abandon %
+    and asa (call-weighted). pool=True also sums the first (queue) axis: one
+    figure per month for all queues."""
+    calls, agents = np.asarray(calls, dtype=float), sol["agents"]
+    load = sol["load"] * (1 - sol["abandon"])
+    sl_w, asa_w, ab_w = calls * sol["sl"], calls * sol["asa"], calls * sol["abandon"]
+    if pool:
+        calls, agents, load, sl_w, asa_w, ab_w = (x.sum(axis=0) for x in (calls, agents, load, sl_w, asa_w, ab_w))
+    week    = calls.sum(axis=-1)
+    staffed = agents.sum(axis=-1)
+    a_hrs   = staffed * (INTERVAL_MIN / 60) * WEEKS_PER_MONTH
+    prod    = a_hrs / hours_per_fte if hours_per_fte else np.zeros_like(a_hrs)
+    shrink  = np.clip(np.asarray(shrinkage_pct, dtype=float) / 100, 0.0, 0.99)
+    per_call = lambda x: np.divide(x.sum(axis=-1), week, out=np.zeros_like(week), where=week > 0)
+    return dict(volume=week * WEEKS_PER_MONTH, agent_hours=a_hrs, productive_hc=prod,
+                rostered_hc=np.ceil(prod / (1 - shrink)).astype(np.int64), peak_agents=agents.max(axis=-1),
+                occ=np.divide(load.sum(axis=-1), staffed, out=np.zeros_like(a_hrs), where=staffed > 0) * 100,
+                sl=per_call(sl_w) * 100, abandon=per_call(ab_w) * 100, asa=per_call(asa_w))
+
+def interval_schedule(calls, aht, sl_target, sl_seconds, hours_per_fte, shrinkage_pct=0, patience=None, table=None):
+    """(per-interval solution, monthly rollup) — see interval_staffing / monthly_rollup."""
+    sol = interval_staffing(calls, aht, sl_target, sl_seconds, patience, table)
+    return sol, monthly_rollup(calls, sol, hours_per_fte, shrinkage_pct)
+
+def schedule_rows(months, rollup, shrinkage_pct):
+    """One monthly schedule row per month (as the staffing page's other modes
+    build them) from a rollup over (months,)."""
+    shr = np.broadcast_to(np.asarray(shrinkage_pct, dtype=float), (len(months),))
+    return [{"month": m, "volume": int(round(rollup["volume"][i])), "shrink_pct": float(shr[i]),
+             "productive_hc": float(rollup["productive_hc"][i]), "rostered_hc": int(rollup["rostered_hc"][i]),
+             "peak_agents": int(rollup["peak_agents"][i]), "occ": float(rollup["occ"][i]),
+             "sl": float(rollup["sl"][i]), "abandon": float(rollup["abandon"][i]), "asa": float(rollup["asa"][i])}
+            for i, m in enumerate(months)]
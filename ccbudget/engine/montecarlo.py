@@ -0,0 +1,92 @@
+"""
+Monte Carlo risk — full-year margin distribution under joint uncertainty in
+EUR/TRY path, attrition, shrinkage and unit price.
+
+Every draw is a scenario overlay; draws are evaluated in batches of (batch, 12)
+arrays by the same _apply as year_totals, so 100k draws cost ~a hundred vector
+passes, not 100k recomputes. Block stats are reduced once and shared. With a
+seed the run is reproducible, so a cache can hold it under the budget hash,
+the risk parameters, the seed and n.
+"""
+
+import numpy as np
+from .common import MONTHS, fingerprint, _div, _norm_shrink, _norm_attrition
+from .timeline import month_globals
+from .totals import _reduce_rows, _load_block_rows, _oh_params, _params, _apply, _year_key
+
+# Defaults: annual TRY drift / volatility vs EUR, spreads around the plan
+DEFAULT_RISK = dict(
+    fx_drift     = 0.25,    # expected annual EUR/TRY change (+25% = TRY weakens)
+    fx_vol       = 0.15,    # annualised volatility of EUR/TRY
+    attrition_sd = 0.02,    # ± monthly attrition (absolute)
+    shrink_sd    = 0.03,    # ± shrinkage (absolute)
+    up_sd        = 0.03,    # ± unit price change (relative)
+)
+PERCENTILES = (5, 50, 95)
+
+def sample(n, risk=None, seed=None):
+    """n joint draws, relative to the plan: fx_mult (n, 12), att_delta / shrink_delta /
+    up_pct (n, 1). FX follows a monthly geometric random walk from the plan rate (Jan is
+    one step out); attrition and shrinkage move by normal absolute amounts."""
+    r   = {**DEFAULT_RISK, **(risk or {})}
+    rng = np.random.default_rng(seed)
+    dt  = 1 / len(MONTHS)
+    z   = rng.standard_normal((n, len(MONTHS)))
+    mu  = np.log1p(r["fx_drift"]) * dt - 0.5 * r["fx_vol"] ** 2 * dt
+    return dict(fx_mult      = np.exp(np.cumsum(mu + r["fx_vol"] * np.sqrt(dt) * z, axis=1)),
+                att_delta    = r["attrition_sd"] * rng.standard_normal((n, 1)),
+                shrink_delta = r["shrink_sd"]    * rng.standard_normal((n, 1)),
+                up_pct       = np.maximum(1 + r["up_sd"] * rng.standard_normal((n, 1)), 0.0))
+
+def _draw_lines(stats, opex, oh, settings, mg, d):
+    """Full-year rev / cost / margin (EUR) for a batch of draws."""
+    overlay = dict(fx        = mg["fx"] * d["fx_mult"],
+                   attrition = np.clip(_norm_attrition(settings["attrition_rate"]) + d["att_delta"], 0.0, 1.0),
+                   shrink    = np.clip(_norm_shrink(mg["shrink"]) + d["shrink_delta"], 0.0, 0.99),
+                   up_pct    = d["up_pct"])
+    p = _params(settings, overlay, mg)
+    p["usd_try"] = p["usd_try"] * d["fx_mult"]       # TRY moves against USD too
+    lines = _apply(stats, opex, oh, p)
+    return {k: lines[k].sum(axis=-1) for k in ("rev", "cost", "margin")}
+
+def simulate(budget, settings, n=20000, risk=None, seed=None, batch=10000, stats=None, cache=None):
+    """Monte Carlo of the full-year P&L. Returns dict(rev, cost, margin, margin_pct)
+    as arrays (n,) in EUR, plus the draws themselves. Per-block FX / attrition /
+    shrinkage overrides keep their values, as in a scenario overlay.
+    With a cache (TotalsCache) and a seed the result is keyed on the budget /
+    settings hash, the risk parameters, the seed and n; unseeded runs are not cached."""
+    if seed is None:
+        cache = None                                # a fresh random run every call
+    if cache is not None:
+        ckey = fingerprint(["montecarlo", _year_key(budget, settings)[0], {**DEFAULT_RISK, **(risk or {})},
+                            seed, n])
+        hit  = cache.get(ckey)
+        if hit is not None:
+            return hit
+    if stats is None:
+        stats = _reduce_rows(_load_block_rows(budget))
+    opex = budget.get("opex", {})
+    oh   = _oh_params(budget)
+    mg   = month_globals(settings, budget)
+    draws = sample(n, risk, seed)
+    out   = {k: np.empty(n) for k in ("rev", "cost", "margin")}
+    for i in range(0, n, batch):
+        d = {k: v[i:i + batch] for k, v in draws.items()}
+        for k, v in _draw_lines(stats, opex, oh, settings, mg, d).items():
+            out[k][i:i + batch] = v
+    out["margin_pct"] = _div(out["margin"], out["rev"])
+    out["draws"] = draws
+    if cache is not None:
+        cache.put(ckey, out)
+    return out
+
+def summarize(result, percentiles=PERCENTILES):
+    """Percentiles of margin (EUR and %), probability of loss and expected margin."""
+    m, pct = result["margin"], result["margin_pct"]
+    return dict(
+        n          = len(m),
+        margin     = dict(zip(percentiles, np.percentile(m,   percentiles).tolist())),
+        margin_pct = dict(zip(percentiles, np.percentile(pct, percentiles).tolist())),
+        p_loss     = float((m < 0).mean()) if len(m) else 0.0,
+        mean       = float(m.mean()) if len(m) else 0.0,
+    )
@@ -0,0 +1,121 @@
+"""
+Sub-month time axis — the P&L by week or by day, aggregated back to months.
+
+A period axis is a set of edges in fiscal months (Jan 1 = 0.0, as date_pos).
+Weeks run in 7-day steps from Jan 1 and are split at month ends, so every period
+sits inside one month. The monthly engine runs unchanged on the finer axis: each
+month's block rows are gathered once per period, dated changes (COLA, raises,
+hiring waves, global changes) are compiled on the period edges, and _apply
+prorates flows by each period's share of its month. A daily year of 200 blocks
+is ~73k rows — one numpy pass.
+
+The period view is a disaggregation, not a split of the monthly figures: every
+period is computed natively — a hiring wave's hires and CAPEX land on its day,
+overhead HC is ceiled per period — so lines that are not linear in time (HC
+increases, the overhead ceil, FX and salary averages within a month) need not
+add back up to year_lines. Linear lines (revenue, hours, HC) do whenever no two
+dated changes meet in one month.
+"""
+
+import calendar as _cal
+import datetime as _dt
+import numpy as np
+from .common import MONTHS, fingerprint, _div
+from .budget import OH_ROLES
+from .timeline import compile_timelines, timeline_rows
+from .totals import _raw_block_rows, _dated_rows, _reduce_rows, _oh_params, _params, _apply, _year_key
+
+GRANULARITIES = ("month", "week", "day")
+# Lines that are headcounts (averaged over a month, day-weighted), not flows
+STOCKS = ("hc", "net_hc", "attrition_hc", "backfill_hc")
+
+def period_axis(granularity="week", year=None):
+    """Period axis for one calendar year → dict(granularity, year, labels,
+    edges (n+1,) in fiscal months, month (n,) index, frac (n,) share of its month,
+    days (n,))."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}' — use one of {GRANULARITIES}")
+    year = year or _dt.date.today().year
+    segs, labels = [], []                   # (month, first day, end day) — 0-based, end exclusive
+    doy = 0
+    for mi in range(len(MONTHS)):
+        dim = _cal.monthrange(year, mi + 1)[1]
+        if granularity == "month":
+            cuts = [0, dim]
+        elif granularity == "day":
+            cuts = list(range(dim + 1))
+        else:                               # week starts inside this month, plus the month ends
+            cuts = sorted({0, dim} | {d for d in range(dim) if (doy + d) % 7 == 0})
+        for d0, d1 in zip(cuts[:-1], cuts[1:]):
+            segs.append((mi, d0, d1, dim))
+            labels.append(MONTHS[mi] if granularity == "month" else
+                          f"{MONTHS[mi]} {d0 + 1:02d}" if granularity == "day" else
+                          f"W{(doy + d0) // 7 + 1:02d}" + (f" {MONTHS[mi]}" if d1 - d0 < 7 else ""))
+        doy += dim
+    mon  = np.array([s[0] for s in segs], dtype=np.intp)
+    d0   = np.array([s[1] for s in segs], dtype=float)
+    d1   = np.array([s[2] for s in segs], dtype=float)
+    dim  = np.array([s[3] for s in segs], dtype=float)
+    return dict(granularity=granularity, year=year, labels=labels,
+                edges=np.append(mon + d0 / dim, float(len(MONTHS))),
+                month=mon, frac=(d1 - d0) / dim, days=d1 - d0)
+
+def _period_rows(raw, axis):
+    """Repeat each month's raw block rows once per period of that month (gather
+    index only, no Python loop over blocks); row "month" becomes the period."""
+    order  = np.argsort(raw["month"], kind="stable")
+    counts = np.bincount(raw["month"], minlength=len(MONTHS))
+    starts = np.cumsum(counts) - counts
+    pc     = counts[axis["month"]]                          # rows in each period
+    period = np.repeat(np.arange(len(pc)), pc)
+    offs   = np.arange(pc.sum()) - np.repeat(np.cumsum(pc) - pc, pc)
+    idx    = order[starts[axis["month"]][period] + offs]
+    rows   = {k: v[idx] for k, v in raw.items()}
+    rows["month"] = period
+    return rows
+
+def period_lines(budget, settings, axis, cache=None):
+    """Every P&L line on a period axis: {key: array (periods,)}. Flows (hours,
+    revenue, cost, hires) are per period; headcounts are the period's own
+    (a disaggregation — see the module docstring).
+    With a cache (TotalsCache) the result is keyed on the budget / settings hash."""
+    if cache is not None:
+        key = fingerprint(["periods", _year_key(budget, settings)[0], axis["granularity"], axis["year"]])
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+    tl    = compile_timelines(budget, axis["edges"])
+    raw   = _raw_block_rows(budget)
+    raw["trow"] = timeline_rows(tl, raw.pop("bid"))     # once per block-month, not per period
+    rows  = _period_rows(raw, axis)
+    stats = _reduce_rows(_dated_rows(rows, tl, rows["month"]), n=len(axis["frac"]))
+    mg    = {k: settings[k] * base_w + fixed for k, (base_w, fixed) in tl["globals"].items()}
+    oh    = {role: tuple(a[axis["month"]] for a in arrs) for role, arrs in _oh_params(budget).items()}
+    lines = _apply(stats, budget.get("opex", {}), oh, _params(settings, None, mg), frac=axis["frac"])
+    if cache is not None:
+        cache.put(key, lines)
+    return lines
+
+def to_months(lines, axis):
+    """Period lines → {key: array (12,)} in the year_lines layout: flows summed,
+    headcounts averaged over the month by days, break-even recomputed. Close to
+    year_lines, not equal to it where periods differ nonlinearly (module docstring)."""
+    return aggregate(lines, axis["month"], len(MONTHS), axis["frac"])
+
+def aggregate(lines, group, n_groups, weight):
+    """Lines (…, periods) → (…, n_groups): flows summed per group, headcounts
+    averaged with weight (each period's share of its group), break-even recomputed."""
+    agg = np.zeros((len(group), n_groups))
+    agg[np.arange(len(group)), group] = 1.0
+    avg = agg * np.asarray(weight, dtype=float)[:, None]
+    out = {k: v @ (avg if k in STOCKS else agg) for k, v in lines.items() if k != "oh"}
+    out["breakeven_up"] = _div(out["cost"], np.where(out["hrs_billable"] > 0, out["hrs_billable"], 0))
+    out["oh"] = {}
+    for role, _ in OH_ROLES:
+        r = lines["oh"][role]
+        out["oh"][role] = dict(hc=r["hc"] @ avg, salary=r["salary"] @ avg, ratio=r["ratio"] @ avg,
+                               cost_try=r["cost_try"] @ agg, cost_eur=r["cost_eur"] @ agg,
+                               manual=(r["manual"] @ agg) > 0)
+    out["oh"]["total_cost_try"] = out["oh_cost_try"]
+    out["oh"]["total_cost_eur"] = out["oh_cost_eur"]
+    return out
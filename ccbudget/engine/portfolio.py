@@ -0,0 +1,110 @@
+"""
+Portfolio consolidation — every client's full-year P&L in one batched pass.
+
+Per-client month stats are stacked into (clients, …, 12) arrays and a single
+_apply call computes all clients at once; cost grows linearly with the client
+count. Results are cached per client (same keys as year_totals), so an edit to
+one client only recomputes that client.
+
+Each client is priced under its own settings (a list, one per client), stacked
+as (clients, 1) arrays like the tornado's cases. A client not loaded yet can be
+priced from its pricing_record() — month stats, OPEX, overhead and dated-global
+timelines, none of which read settings — so a settings or FX change re-prices
+it without loading its blocks.
+"""
+
+import numpy as np
+from .common import MONTHS, _div
+from .budget import OH_ROLES
+from .timeline import timelines
+from .totals import (_reduce_rows, _load_block_rows, _oh_params, _params, _apply,
+                     _year_key, _split_row)
+
+# Ratios / prices that are not summed across clients
+NON_ADDITIVE = ("breakeven_up",)
+
+def _stack(dicts):
+    return {k: np.stack([d[k] for d in dicts]) for k in dicts[0]}
+
+def pricing_record(budget, stats):
+    """Everything portfolio_years needs to price a budget without its blocks, as
+    JSON-able lists: month stats (_reduce_rows), OPEX, overhead params and the
+    dated-global timelines. Settings-free, so it stays valid across settings."""
+    return dict(stats={k: np.asarray(v).tolist() for k, v in stats.items()},
+                opex=dict(budget.get("opex", {})),
+                oh={role: [a.tolist() for a in arrs] for role, arrs in _oh_params(budget).items()},
+                globals={k: [w.tolist(), f.tolist()] for k, (w, f) in timelines(budget)["globals"].items()})
+
+def _priced(budget, stats):
+    """A budget's pricing record with arrays (see pricing_record)."""
+    return dict(stats=stats, opex=budget.get("opex", {}), oh=_oh_params(budget),
+                globals=timelines(budget)["globals"])
+
+def _load_pricing(pr):
+    a = lambda v: np.asarray(v, dtype=float)
+    return dict(stats={k: a(v) for k, v in pr["stats"].items()}, opex=pr["opex"],
+                oh={role: tuple(a(x) for x in arrs) for role, arrs in pr["oh"].items()},
+                globals={k: (a(w), a(f)) for k, (w, f) in pr["globals"].items()})
+
+def _batch_lines(priced, settings):
+    """All P&L lines for several priced budgets, each under its own settings:
+    {key: array (clients, 12)}."""
+    opex_keys = set().union(*(p["opex"] for p in priced))
+    opex = {k: np.array([[p["opex"].get(k, 0)] for p in priced], dtype=float) for k in opex_keys}
+    oh   = {role: tuple(np.stack([p["oh"][role][i] for p in priced]) for i in range(3)) for role, _ in OH_ROLES}
+    mg   = _stack([{k: s[k] * w + f for k, (w, f) in p["globals"].items()} for p, s in zip(priced, settings)])
+    num  = [k for k, v in settings[0].items() if isinstance(v, (int, float))]
+    s_b  = {k: np.array([[s[k]] for s in settings], dtype=float) for k in num}
+    return _apply(_stack([p["stats"] for p in priced]), opex, oh, _params(s_b, None, mg))
+
+def portfolio_years(budgets, settings, cache=None, tracker=None, years=None, pricing=None):
+    """[{month: totals}] per budget, computing only the uncached ones (in one batch).
+    settings: one dict for all budgets, or a list with each budget's own.
+    years: optional known results per budget (None = compute); a budget with a
+    known year is not read beyond its name. pricing: optional pricing_record() per
+    budget (None = use the budget) — a priced budget is not read either."""
+    n        = len(budgets)
+    settings = list(settings) if isinstance(settings, (list, tuple)) else [settings] * n
+    years    = list(years) if years is not None else [None] * n
+    pricing  = list(pricing) if pricing is not None else [None] * n
+    todo     = []
+    for i, b in enumerate(budgets):
+        if years[i] is not None:
+            continue
+        if pricing[i] is not None:
+            todo.append((i, None, _load_pricing(pricing[i])))
+            continue
+        if cache is None and tracker is None:   # nothing to look up: skip hashing
+            todo.append((i, None, _priced(b, _reduce_rows(_load_block_rows(b)))))
+            continue
+        key, fps = _year_key(b, settings[i])
+        years[i] = cache.get(key) if cache is not None else None
+        if years[i] is None:
+            stats = tracker.stats(b, fps) if tracker is not None else _reduce_rows(_load_block_rows(b))
+            todo.append((i, key, _priced(b, stats)))
+    if todo:
+        lines = _batch_lines([p for _, _, p in todo], [settings[i] for i, _, _ in todo])
+        for j, (i, key, _) in enumerate(todo):
+            years[i] = _split_row(lines, j)
+            if cache is not None and key is not None:
+                cache.put(key, years[i])
+    return years
+
+def portfolio_totals(budgets, settings, cache=None, tracker=None, years=None, pricing=None):
+    """Consolidated view of several budgets (settings, years, pricing: see portfolio_years).
+    Returns dict(clients=[name], years=[{month: totals}],
+                 by_client={key: array (clients, 12)}, total={key: array (12,)})
+    for every scalar line; total sums the clients (break-even is recomputed)."""
+    years = portfolio_years(budgets, settings, cache, tracker, years, pricing)
+    keys  = [k for k in (years[0][MONTHS[0]] if years else {}) if k != "oh"]
+    by_client = {k: np.array([[y[m][k] for m in MONTHS] for y in years], dtype=float).reshape(len(years), len(MONTHS))
+                 for k in keys}
+    total = {k: v.sum(axis=0) for k, v in by_client.items() if k not in NON_ADDITIVE}
+    if total:
+        total["breakeven_up"] = _div(total["cost"], total["hrs_billable"])
+    return dict(clients=[b.get("name", f"Client {i+1}") for i, b in enumerate(budgets)],
+                years=years, by_client=by_client, total=total)
+
+def margin_pct(rev, margin):
+    """Margin as a fraction of revenue, 0 where there is no revenue (arrays)."""
+    return _div(margin, rev)
@@ -0,0 +1,263 @@
+"""
+Discrete-event queue simulation — checks Erlang staffing against conditions the
+formulas assume away: non-exponential handle times, bursty arrivals, several
+work types sharing agents with overflow.
+
+    res = simulate([dict(rate=4200, aht=240, sl_seconds=20)], [dict(agents=300)],
+                   hours=720, reps=5, seed=1, aht_dist="lognormal", aht_cv=0.8)
+    summarize(res)["sl"][5]                     # P5 of daily service level
+
+Every random number is drawn up front in vectors: arrivals as a Poisson count
+per slot (15 min; burst > 0 scales each slot's rate by a gamma factor with that
+CV) spread uniformly and sorted, handle times and patiences one array per run.
+Seeds go through np.random.SeedSequence, so each (month, replication) stream is
+fixed by the seed alone. The event loop is plain Python over a heap:
+
+- one agent pool on every queue (voice, pooled blended): FCFS needs only the
+  heap of agent free times — each caller takes the earliest-free agent or, with
+  patience, hangs up when that agent frees too late. One heapreplace per call.
+- several queues / agent groups (blended): a departure heap, a FIFO per queue
+  and idle counts per group. A caller goes to an idle agent of a group with
+  its queue as primary skill, else overflows to any group with the skill; a
+  freed agent serves its primary queue, else the longest-waiting caller across
+  its skills. Callers whose patience ran out are dropped when reached.
+
+A caller is answered within t when its wait ≤ t; SL is that share of offered
+calls (abandons count against it, as in Erlang A). ASA is the mean wait per
+offered call — answered callers until answer, abandoned ones until they hang up
+— the E[queue] / λ that erlang.erlang_a reports (with no abandonment, the plain
+mean wait). Callers arriving in the horizon are all followed to the end.
+"""
+
+import heapq
+from collections import deque
+import numpy as np
+
+AHT_DISTS   = ("exponential", "lognormal", "fixed")
+PERCENTILES = (5, 50, 95)
+SLOT        = 900                               # seconds per arrival-rate slot
+DAY         = 86400
+
+def arrival_times(rate, seconds, rng, burst=0.0, slot=SLOT):
+    """Sorted arrival times (s) over [0, seconds). rate: calls per hour, one
+    value or one per slot (cycled). burst: CV of a gamma factor on each slot's
+    rate (0 = plain Poisson)."""
+    edges = np.append(np.arange(0.0, seconds, slot), seconds)
+    width = np.diff(edges)
+    lam   = np.resize(np.asarray(rate, dtype=float), width.size) / 3600 * width
+    if burst > 0:
+        lam = lam * rng.gamma(1 / burst ** 2, burst ** 2, width.size)
+    count = rng.poisson(lam)
+    start = np.repeat(edges[:-1], count)
+    return np.sort(start + rng.random(start.size) * np.repeat(width, count))
+
+def durations(n, mean, rng, dist="exponential", cv=1.0):
+    """n handle times (s) with the given mean: exponential, lognormal with CV
+    cv, or fixed."""
+    if dist == "exponential":
+        return rng.exponential(mean, n)
+    if dist == "lognormal":
+        s2 = np.log1p(cv ** 2)
+        return rng.lognormal(np.log(mean) - s2 / 2, np.sqrt(s2), n)
+    if dist == "fixed":
+        return np.full(n, float(mean))
+    raise ValueError(f"Unknown AHT distribution '{dist}' — use one of {AHT_DISTS}")
+
+# ── Event loops ──────────────────────────────────────────────
+def _run_pool(arr, svc, pat, agents):
+    """One FCFS queue, one pool → wait per caller (NaN = abandoned)."""
+    free = [0.0] * agents                       # heap of agent free times
+    wait = []
+    push = wait.append
+    for a, s, p in zip(arr.tolist(), svc.tolist(), pat.tolist()):
+        f = free[0]
+        if f <= a:
+            heapq.heapreplace(free, a + s)
+            push(0.0)
+        elif f - a <= p:
+            heapq.heapreplace(free, f + s)
+            push(f - a)
+        else:
+            push(np.nan)
+    return np.array(wait)
+
+def _run_skills(arr, que, svc, pat, skills, primary, agents):
+    """Several queues and agent groups → wait per caller (NaN = abandoned).
+    skills[g]: queue indices group g serves; primary[g]: the one it serves
+    first (None = longest-waiting caller across its skills)."""
+    n_q   = 1 + max(max(s) for s in skills)
+    route = [sorted((primary[g] != q, g) for g, s in enumerate(skills) if q in s) for q in range(n_q)]
+    route = [[g for _, g in r] for r in route]
+    idle  = list(agents)
+    lines = [deque() for _ in range(n_q)]
+    arr, que, svc, pat = arr.tolist(), que.tolist(), svc.tolist(), pat.tolist()
+    wait  = [np.nan] * len(arr)
+    busy  = []                                  # heap of (free time, group)
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    def head(q, t):
+        """First caller in q still waiting at t (those who hung up are dropped)."""
+        line = lines[q]
+        while line and t - arr[line[0]] > pat[line[0]]:
+            line.popleft()
+        return line[0] if line else None
+
+    def free_agent(t, g):
+        p = primary[g]
+        j = head(p, t) if p is not None and lines[p] else None
+        if j is None:                           # callers are in arrival order: lowest index waited longest
+            for q in skills[g]:
+                if lines[q]:
+                    h = head(q, t)
+                    if h is not None and (j is None or h < j):
+                        j = h
+        if j is None:
+            idle[g] += 1
+            return
+        lines[que[j]].popleft()
+        wait[j] = t - arr[j]
+        heappush(busy, (t + svc[j], g))
+
+    for i, q in enumerate(que):
+        a = arr[i]
+        while busy and busy[0][0] <= a:
+            free_agent(*heappop(busy))
+        for g in route[q]:
+            if idle[g]:
+                idle[g] -= 1
+                wait[i] = 0.0
+                heappush(busy, (a + svc[i], g))
+                break
+        else:
+            lines[q].append(i)
+    while busy:
+        free_agent(*heappop(busy))
+    return np.array(wait)
+
+# ── Simulation ───────────────────────────────────────────────
+def _one_run(queues, groups, seconds, rng, burst, aht_dist, aht_cv):
+    """One replication → (arrival, queue, wait, handle time, patience) per caller."""
+    arr = [arrival_times(q["rate"], seconds, rng, burst) for q in queues]
+    que = np.repeat(np.arange(len(queues)), [a.size for a in arr])
+    svc = np.concatenate([durations(a.size, q["aht"], rng, aht_dist, aht_cv) for a, q in zip(arr, queues)])
+    pat = np.concatenate([rng.exponential(q["patience"], a.size) if q.get("patience") else np.full(a.size, np.inf)
+                          for a, q in zip(arr, queues)])
+    arr = np.concatenate(arr)
+    if len(queues) > 1:
+        order = np.argsort(arr, kind="stable")
+        arr, que, svc, pat = arr[order], que[order], svc[order], pat[order]
+    agents  = [int(g["agents"]) for g in groups]
+    skills  = [sorted(set(g.get("skills", range(len(queues))))) for g in groups]
+    primary = [g.get("primary") for g in groups]
+    if len(groups) == 1 and len(skills[0]) == len(queues):
+        wait = _run_pool(arr, svc, pat, agents[0])  # one pool on every queue: plain FCFS
+    else:
+        wait = _run_skills(arr, que, svc, pat, skills, primary, agents)
+    return arr, que, wait, svc, pat
+
+def simulate(queues, groups, hours=720, reps=10, seed=None, burst=0.0, aht_dist="exponential",
+             aht_cv=1.0, period=DAY):
+    """Simulate hours of operation, reps times. queues: [dict(rate calls/hour
+    (scalar or per 15-min slot), aht s, sl_seconds, patience s or None)];
+    groups: [dict(agents, skills=[queue index, …] (default all), primary=queue
+    served first or None)].
+    Returns arrays per replication (reps, queues): calls, sl, asa (mean wait
+    per offered call), abandon;
+    per reporting period (reps, periods, queues) period_calls / _answered and
+    period_sl / _asa (NaN where a period had no calls); occ (reps,) busy share of
+    agent time; plus hours, period and the total simulated call count."""
+    if not queues or not groups:
+        raise ValueError("Simulation needs at least one queue and one agent group")
+    if aht_dist not in AHT_DISTS:
+        raise ValueError(f"Unknown AHT distribution '{aht_dist}' — use one of {AHT_DISTS}")
+    if any(int(g["agents"]) < 1 for g in groups):
+        raise ValueError("Every agent group needs at least one agent")
+    seconds = float(hours) * 3600
+    n_q, n_p = len(queues), int(np.ceil(seconds / period))
+    t_sl     = np.array([float(q["sl_seconds"]) for q in queues])
+    out = {k: np.zeros((reps, n_q)) for k in ("calls", "sl", "asa", "abandon")}
+    out.update(period_sl=np.full((reps, n_p, n_q), np.nan), period_asa=np.full((reps, n_p, n_q), np.nan),
+               period_calls=np.zeros((reps, n_p, n_q)), period_answered=np.zeros((reps, n_p, n_q)), occ=np.zeros(reps))
+    staff = sum(int(g["agents"]) for g in groups) * seconds
+    root  = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    for r, ss in enumerate(root.spawn(reps)):
+        arr, que, wait, svc, pat = _one_run(queues, groups, seconds, np.random.default_rng(ss), burst, aht_dist, aht_cv)
+        ans  = ~np.isnan(wait)
+        hit  = ans & (np.where(ans, wait, np.inf) <= t_sl[que])
+        w    = np.where(ans, wait, pat)             # abandoned: waited their patience
+        cell = que + n_q * np.minimum((arr // period).astype(np.intp), n_p - 1)
+        tally = lambda x: np.bincount(cell, x, minlength=n_p * n_q).reshape(n_p, n_q)
+        calls, n_ans, n_hit, w_sum = tally(None), tally(ans), tally(hit), tally(w)
+        out["period_calls"][r], out["period_answered"][r] = calls, n_ans
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["period_sl"][r]  = n_hit / calls
+            out["period_asa"][r] = w_sum / calls
+        c, k = calls.sum(axis=0), n_ans.sum(axis=0)
+        out["calls"][r]   = c
+        out["sl"][r]      = np.divide(n_hit.sum(axis=0), c, out=np.ones(n_q), where=c > 0)
+        out["asa"][r]     = np.divide(w_sum.sum(axis=0), c, out=np.zeros(n_q), where=c > 0)
+        out["abandon"][r] = np.divide(c - k, c, out=np.zeros(n_q), where=c > 0)
+        start = (arr + wait)[ans]               # agent time inside the horizon
+        out["occ"][r] = (np.minimum(start + svc[ans], seconds) - np.minimum(start, seconds)).sum() / staff
+    out.update(hours=float(hours), period=period, n_calls=int(out["calls"].sum()))
+    return out
+
+def _weighted(x, n):
+    """Mean of x over the last (queue) axis weighted by n, kept as one column;
+    NaN where the weights sum to 0."""
+    tot = n.sum(axis=-1, keepdims=True)
+    return np.divide(np.nan_to_num(x * n).sum(axis=-1, keepdims=True), tot, out=np.full(tot.shape, np.nan), where=tot > 0)
+
+def pooled(result):
+    """result with its queues merged into one (call-weighted SL, ASA and
+    abandon) — e.g. a blended month as a whole."""
+    w   = _weighted
+    out = dict(result, calls=result["calls"].sum(axis=-1, keepdims=True),
+               sl=np.nan_to_num(w(result["sl"], result["calls"]), nan=1.0), asa=np.nan_to_num(w(result["asa"], result["calls"])),
+               abandon=np.nan_to_num(w(result["abandon"], result["calls"])),
+               period_sl=w(result["period_sl"], result["period_calls"]),
+               period_asa=w(result["period_asa"], result["period_calls"]))
+    out.update(period_calls=result["period_calls"].sum(axis=-1, keepdims=True),
+               period_answered=result["period_answered"].sum(axis=-1, keepdims=True))
+    return out
+
+def summarize(result, q=0, percentiles=PERCENTILES):
+    """Distributions for queue q: percentiles of period SL / ASA over every
+    replication's periods, run-level means and spread, abandon and occupancy."""
+    p_sl, p_asa = result["period_sl"][..., q], result["period_asa"][..., q]
+    pct = lambda x: dict(zip(percentiles, np.nanpercentile(x, percentiles).tolist())) if np.isfinite(x).any() \
+        else dict.fromkeys(percentiles, 0.0)
+    return dict(reps=len(result["sl"]), calls=float(result["calls"][:, q].mean()),
+                sl=pct(p_sl), asa=pct(p_asa), sl_mean=float(result["sl"][:, q].mean()),
+                sl_sd=float(result["sl"][:, q].std()), asa_mean=float(result["asa"][:, q].mean()),
+                abandon=float(result["abandon"][:, q].mean()), occ=float(result["occ"].mean()))
+
+# ── Staffing schedules ───────────────────────────────────────
+def schedule_queues(row, sl_seconds, hours=None, mix=None, routing="pooled", patience=None):
+    """(queues, groups) for one staffing-page schedule row. Voice rows: volume
+    calls per hour, aht seconds, productive_hc agents — one queue. Blended rows
+    (mix = [dict(share, aht seconds)] per work type): the month's volume over
+    hours of operation, one queue per type; agents pooled on every type, or
+    dedicated by share (rounded, ≥ 1) and overflowing to the others."""
+    agents = max(int(np.ceil(row["productive_hc"] - 1e-9)), 1)
+    if mix is None:
+        return [dict(rate=row["volume"], aht=row["aht"], sl_seconds=sl_seconds, patience=patience)], [dict(agents=agents)]
+    share  = np.array([m["share"] for m in mix], dtype=float)
+    share  = share / share.sum()
+    queues = [dict(rate=row["volume"] / hours * s, aht=m["aht"], sl_seconds=sl_seconds, patience=patience)
+              for s, m in zip(share, mix)]
+    if routing == "pooled" or len(mix) == 1:
+        return queues, [dict(agents=agents)]
+    return queues, [dict(agents=max(int(round(agents * s)), 1), primary=q) for q, s in enumerate(share)]
+
+def simulate_schedule(rows, sl_seconds, hours, mix=None, routing="pooled", patience=None, reps=10, seed=None,
+                      period=DAY, **kw):
+    """simulate() every month of a schedule with volume and agents → {month:
+    result}; see schedule_queues. Each row position gets its own seed stream,
+    so a month's result does not depend on the others."""
+    out = {}
+    for row, ss in zip(rows, np.random.SeedSequence(seed).spawn(len(rows))):
+        if row["volume"] > 0 and row["productive_hc"] > 0:
+            qs, gs = schedule_queues(row, sl_seconds, hours, mix, routing, patience)
+            out[row["month"]] = simulate(qs, gs, hours, reps, ss, period=period, **kw)
+    return out
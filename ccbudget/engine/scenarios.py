@@ -0,0 +1,79 @@
+"""
+Scenario library — any number of named what-if overlays per client.
+
+A library entry stores the Scenario Planner inputs (percent units, as on the
+sliders); make_overlay turns one into a _params overlay. scenario_years looks
+every scenario up in the result cache under the same key get_totals_scenario
+uses, and evaluates only the missing ones — stacked into one batched _apply.
+fx_projection runs any number of monthly EUR/TRY curves the same way.
+"""
+
+import numpy as np
+from .common import MONTHS, _div
+from .timeline import month_globals
+from .totals import _reduce_rows, _load_block_rows, _oh_params, _params, _apply, _year_key, _split_row
+
+# Library entry fields → default (percent units; fx 0 = keep current rates)
+SCENARIO_FIELDS = dict(name="", up_pct=0.0, sal_pct=0.0, hc_pct=0.0, fx=0.0,
+                       attrition=None, shrink=None)
+
+def make_overlay(sc):
+    """Library entry → scenario overlay (see totals._params). Attrition / shrink
+    left empty keep the plan's values."""
+    sc = {**SCENARIO_FIELDS, **sc}
+    so = {"up_pct":  1 + (sc["up_pct"]  or 0) / 100,
+          "sal_pct": 1 + (sc["sal_pct"] or 0) / 100}
+    if sc["hc_pct"]:
+        so["hc_pct"] = 1 + sc["hc_pct"] / 100
+    if sc["attrition"] is not None:
+        so["attrition"] = sc["attrition"] / 100
+    if sc["shrink"] is not None:
+        so["shrink"] = sc["shrink"] / 100
+    if sc["fx"] and sc["fx"] > 0:
+        so["fx_override"] = sc["fx"]
+    return so
+
+def _stack_overlays(overlays, settings, mg):
+    """Overlays → one overlay of (scenarios, 12) arrays, unset keys at plan values."""
+    plan = dict(up_pct=1.0, sal_pct=1.0, hc_pct=1.0, ctc_override=settings["ctc"],
+                fx=mg["fx"], fx_override=np.nan, hours=mg["hours"],
+                attrition=settings["attrition_rate"], shrink=mg["shrink"])
+    row  = lambda v: np.broadcast_to(np.asarray(v, dtype=float), (len(MONTHS),))
+    return {k: np.stack([row(o.get(k, d)) for o in overlays]) for k, d in plan.items()}
+
+def scenario_years(budget, settings, overlays, cache=None, tracker=None):
+    """[{month: totals}] per overlay. Cached results are reused; the rest are
+    computed together in one batched pass and cached individually."""
+    years = [None] * len(overlays)
+    todo  = []
+    fps   = None
+    for i, so in enumerate(overlays):
+        if cache is None and tracker is None:
+            todo.append((i, None))
+            continue
+        key, fps = _year_key(budget, settings, so)
+        years[i] = cache.get(key) if cache is not None else None
+        if years[i] is None:
+            todo.append((i, key))
+    if todo:
+        stats = tracker.stats(budget, fps) if tracker is not None else _reduce_rows(_load_block_rows(budget))
+        mg    = month_globals(settings, budget)
+        so    = _stack_overlays([overlays[i] for i, _ in todo], settings, mg)
+        lines = _apply(stats, budget.get("opex", {}), _oh_params(budget), _params(settings, so, mg))
+        for j, (i, key) in enumerate(todo):
+            years[i] = _split_row(lines, j)
+            if cache is not None:
+                cache.put(key, years[i])
+    return years
+
+def fx_projection(budget, settings, curves, stats=None):
+    """Every P&L line along month-specific EUR/TRY curves, all curves at once.
+    curves: array-like (n, 12) of rates → {key: array (n, 12)}. Blocks with their
+    own FX keep it; USD/TRY moves with EUR/TRY (EUR/USD held at today's cross)."""
+    curves = np.atleast_2d(np.asarray(curves, dtype=float))
+    if stats is None:
+        stats = _reduce_rows(_load_block_rows(budget))
+    mg = month_globals(settings, budget)
+    p  = _params(settings, dict(fx=curves), mg)
+    p["usd_try"] = p["usd_try"] * np.where(mg["fx"] != 0, _div(curves, mg["fx"]), 1.0)
+    return _apply(stats, budget.get("opex", {}), _oh_params(budget), p)
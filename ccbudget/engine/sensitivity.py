@@ -0,0 +1,159 @@
+"""
+Sensitivity — tornado (each driver ±x%) and 2-D heatmaps of FY margin.
+
+Every perturbation is one element of a batch: settings / OPEX drivers become
+(cases, 1) arrays and per-block UP / salary cases get their own stats row, so
+the whole sweep is a single _apply call over (cases, …, 12) arrays. Revenue and
+salary stats are linear in a block's UP and salary, so a block case is the plan
+plus (mult − 1) × that block's own share, and every block's share comes from
+one reduction grouped by (block, month) — linear in the row count. A heatmap is
+the same idea over a (rows, cols) grid of scenario overlays.
+"""
+
+import numpy as np
+from .common import MONTHS, fingerprint, _div, _norm_shrink
+from .budget import DEFAULT_OPEX
+from .blocks import block_labels
+from .timeline import month_globals
+from .totals import _reduce_rows, _load_block_rows, _oh_params, _params, _apply, _year_key
+
+SETTING_DRIVERS = [
+    ("hours",               "Worked hours / month"),
+    ("shrink",              "Shrinkage"),
+    ("fx",                  "EUR/TRY"),
+    ("ctc",                 "CTC multiplier"),
+    ("bonus_pct",           "Bonus %"),
+    ("meal",                "Meal card"),
+    ("attrition_rate",      "Attrition"),
+    ("backfill_efficiency", "Backfill efficiency"),
+]
+OPEX_LABELS = {
+    "training_cost_per_hire": "Training cost / hire",
+    "recruitment_fee":        "Recruitment fee",
+    "it_cost_per_seat":       "IT & telephony / seat",
+    "facilities_per_seat":    "Facilities / seat",
+    "capex_pc":               "CAPEX — PC",
+    "capex_headset":          "CAPEX — headset",
+    "capex_software":         "CAPEX — software",
+}
+# Globals with a monthly value after dated changes (see month_globals)
+_MONTHLY = ("hours", "fx", "shrink")
+
+def drivers(budget):
+    """[(kind, key, label)] — every driver tornado() perturbs for this budget.
+    Block drivers are keyed by block id."""
+    opex = budget.get("opex", {})
+    out  = [("setting", k, label) for k, label in SETTING_DRIVERS]
+    out += [("opex", k, OPEX_LABELS.get(k, k)) for k in list(DEFAULT_OPEX) + sorted(set(opex) - set(DEFAULT_OPEX))]
+    for bid, label in block_labels(budget).items():
+        out += [("up", bid, f"{label} — unit price"), ("salary", bid, f"{label} — salary")]
+    return out
+
+# Stats linear in a block's UP / salary (every other stat does not read them)
+_CASE_KEYS = {"up": ("r_eur", "r_eur_nofx", "rt_fx", "r_usd"), "salary": ("w_sal", "w_sal_nofx", "q_sal")}
+
+def _block_parts(rows, bids):
+    """Each block's own share of the plan stats, {key: array (blocks, …, 12)} for
+    the _CASE_KEYS — one _reduce_rows pass with (block, month) as the group."""
+    at  = {b: i for i, b in enumerate(bids)}
+    blk = np.fromiter((at.get(b, -1) for b in rows["bid"]), dtype=np.intp, count=len(rows["bid"]))
+    ok  = blk >= 0
+    r   = {k: v[ok] for k, v in rows.items()}
+    n   = len(MONTHS)
+    s   = _reduce_rows({**r, "month": blk[ok] * n + r["month"]}, n=len(bids) * n)
+    out = {}
+    for k in _CASE_KEYS["up"] + _CASE_KEYS["salary"]:
+        v = s[k]
+        out[k] = v.reshape(len(bids), n) if v.ndim == 1 else v.reshape(v.shape[0], len(bids), n).swapaxes(0, 1)
+    return out
+
+def tornado(budget, settings, pct=0.10, cache=None, stats=None):
+    """FY margin (EUR) with each driver at ×(1-pct) and ×(1+pct), everything else
+    at plan. Returns (base_margin, rows) with rows sorted by swing, largest first:
+    dict(kind, key, label, low, high, swing) — low / high are margin deltas vs base.
+    stats: the plan's month stats if known (e.g. from a MonthTracker). With a cache
+    (TotalsCache) the result is keyed on the budget / settings hash and pct."""
+    if cache is not None:
+        ckey = fingerprint(["tornado", _year_key(budget, settings)[0], pct])
+        hit  = cache.get(ckey)
+        if hit is not None:
+            return hit
+    drv   = drivers(budget)
+    mults = np.array([1.0] + [1 - pct, 1 + pct] * len(drv))
+    n     = len(mults)
+    col   = lambda: np.ones((n, 1))
+    # Case 0 is the plan; case 2i+1 / 2i+2 are driver i at low / high
+    set_m  = {k: col() for k, _ in SETTING_DRIVERS}
+    opex_m = {k: col() for kind, k, _ in drv if kind == "opex"}
+    rows  = _load_block_rows(budget)
+    base  = _reduce_rows(rows) if stats is None else stats
+    bids  = [key for kind, key, _ in drv if kind == "up"]
+    parts = _block_parts(rows, bids)
+    at    = {b: i for i, b in enumerate(bids)}
+    stats = {k: np.repeat(np.asarray(v)[None], n, axis=0) for k, v in base.items()}
+    for i, (kind, key, _) in enumerate(drv):
+        for j in (2 * i + 1, 2 * i + 2):
+            if kind == "setting":
+                set_m[key][j] = mults[j]
+            elif kind == "opex":
+                opex_m[key][j] = mults[j]
+            else:                           # plan + (mult − 1) × the block's own share
+                for k in _CASE_KEYS[kind]:
+                    stats[k][j] += (mults[j] - 1) * parts[k][at[key]]
+
+    mg = month_globals(settings, budget)
+    mg = {**mg, "shrink": _norm_shrink(mg["shrink"])}
+    mg_b = {k: mg[k] * set_m[k] for k in _MONTHLY}
+    s_b  = {**settings, **{k: settings[k] * set_m[k] for k, _ in SETTING_DRIVERS if k not in _MONTHLY}}
+    opex = budget.get("opex", {})
+    opex_b = {k: opex.get(k, 0) * opex_m[k] for k in opex_m}
+    lines  = _apply(stats, opex_b, _oh_params(budget), _params(s_b, None, mg_b))
+    margin = lines["margin"].sum(axis=-1)
+
+    base_margin = float(margin[0])
+    out = []
+    for i, (kind, key, label) in enumerate(drv):
+        lo, hi = margin[2 * i + 1] - base_margin, margin[2 * i + 2] - base_margin
+        out.append(dict(kind=kind, key=key, label=label, low=float(lo), high=float(hi),
+                        swing=float(abs(hi - lo))))
+    out.sort(key=lambda r: -r["swing"])
+    res = (base_margin, out)
+    if cache is not None:
+        cache.put(ckey, res)
+    return res
+
+# ── 2-D grids ───────────────────────────────────────────────
+# Axis keys are scenario overlay keys (see totals._params): up_pct / sal_pct /
+# hc_pct are multipliers, fx is the EUR/TRY rate (blocks with their own FX keep it).
+GRID_AXES = {
+    "up_pct":  "Unit price ×",
+    "sal_pct": "Salary ×",
+    "hc_pct":  "HC ×",
+    "fx":      "EUR/TRY",
+}
+
+def heatmap(budget, settings, x, y, cache=None, stats=None):
+    """FY margin % and break-even over a grid of two overlay keys.
+    x, y: (key, values). One _apply call over (len(y), len(x), 12) arrays.
+    Returns dict(x, y, margin_pct, margin, breakeven) — arrays (len(y), len(x)).
+    With a cache (TotalsCache) the grid is keyed on the budget / settings hash."""
+    (xk, xv), (yk, yv) = x, y
+    xv, yv = np.asarray(xv, dtype=float), np.asarray(yv, dtype=float)
+    if xk == yk:
+        raise ValueError(f"Both grid axes are '{xk}'")
+    if cache is not None:
+        key = fingerprint(["heatmap", _year_key(budget, settings)[0], xk, xv.tolist(), yk, yv.tolist()])
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+    if stats is None:
+        stats = _reduce_rows(_load_block_rows(budget))
+    overlay = {xk: xv[None, :, None], yk: yv[:, None, None]}
+    lines = _apply(stats, budget.get("opex", {}), _oh_params(budget),
+                   _params(settings, overlay, month_globals(settings, budget)))
+    rev, margin = lines["rev"].sum(axis=-1), lines["margin"].sum(axis=-1)
+    out = dict(x=(xk, xv), y=(yk, yv), margin=margin, margin_pct=_div(margin, rev),
+               breakeven=_div(lines["cost"].sum(axis=-1), lines["hrs_billable"].sum(axis=-1)))
+    if cache is not None:
+        cache.put(key, out)
+    return out
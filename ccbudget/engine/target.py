@@ -0,0 +1,59 @@
+"""
+Target Margin formulas — closed-form solves for unit price, HC and margin.
+
+Revenue = HC × (hours × (1−shrinkage)) × unit price.
+Cost    = HC × salary × CTC × (1+bonus) + meal cards, converted at FX, plus overhead.
+Margins are decimals (0.20 = 20%); results report margin % like the page does.
+"""
+
+import math
+
+def agent_cost(salary, ctc, bonus_pct, meal, fx):
+    """Monthly cost per agent: (TRY, EUR)."""
+    cost_try = salary * ctc * (1 + bonus_pct) + meal
+    return cost_try, (cost_try / fx if fx else 0)
+
+def effective_hours(hours, shrink):
+    return hours * (1 - shrink)
+
+def min_unit_price(hc, cost_per_agent_eur, eff_hrs, overhead_eur, target_margin):
+    """Lowest unit price that hits target_margin at hc agents (None if unsolvable)."""
+    total_cost = hc * cost_per_agent_eur + overhead_eur
+    total_hrs  = hc * eff_hrs
+    if target_margin >= 1 or total_hrs == 0:
+        return None
+    rev_needed = total_cost / (1 - target_margin)
+    return dict(total_cost=total_cost, total_hrs=total_hrs, rev_needed=rev_needed,
+                min_up=rev_needed / total_hrs, breakeven_up=total_cost / total_hrs)
+
+def margin_at(unit_price, total_hrs, total_cost):
+    """Margin % at a unit price for a fixed cost base."""
+    rev = unit_price * total_hrs
+    return (rev - total_cost) / rev * 100 if rev else 0
+
+def max_hc(unit_price, cost_per_agent_eur, eff_hrs, overhead_eur, target_margin):
+    """Most agents affordable at unit_price while keeping target_margin.
+    HC × (eff_hrs × UP × (1-m) − cost_per_agent) ≥ overhead → floor."""
+    rev_per_agent         = eff_hrs * unit_price
+    margin_pool_per_agent = rev_per_agent * (1 - target_margin)
+    denominator           = margin_pool_per_agent - cost_per_agent_eur
+    hc = math.floor((- overhead_eur) / (cost_per_agent_eur - margin_pool_per_agent)) if denominator > 0 else 0
+    hc = max(0, hc)
+    rev  = hc * eff_hrs * unit_price
+    cost = hc * cost_per_agent_eur + overhead_eur
+    return dict(max_hc=hc, rev=rev, cost=cost,
+                margin_pct=(rev - cost) / rev * 100 if rev else 0,
+                rev_per_agent=rev_per_agent, margin_pool_per_agent=margin_pool_per_agent)
+
+def margin_check(hc, unit_price, cost_per_agent_eur, eff_hrs, overhead_eur, target_margin):
+    """Current margin at hc × unit_price and the rate needed for target_margin."""
+    total_cost = hc * cost_per_agent_eur + overhead_eur
+    total_hrs  = hc * eff_hrs
+    total_rev  = total_hrs * unit_price
+    margin_eur = total_rev - total_cost
+    margin_pct = margin_eur / total_rev * 100 if total_rev else 0
+    breakeven  = total_cost / total_hrs if total_hrs else 0
+    needed_up  = total_cost / (total_hrs * (1 - target_margin)) if total_hrs and target_margin < 1 else 0
+    return dict(total_cost=total_cost, total_hrs=total_hrs, total_rev=total_rev,
+                margin_eur=margin_eur, margin_pct=margin_pct,
+                breakeven=breakeven, needed_up=needed_up)
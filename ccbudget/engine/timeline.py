@@ -0,0 +1,129 @@
+"""
+Effective-dated parameter timelines.
+
+Every dated change (COLA unit prices, salary raises, hiring waves, mid-year
+hours/FX/shrinkage) is compiled once per config edit into dense 12-column weight
+matrices. A change effective on day d of month mo weighs 0 before mo, 1 after it
+and the share of days at the new value in mo itself — so the engine only indexes
+and multiplies. The same compile works on any period edges (weeks, days).
+Per-block changes are keyed by block id; "ids" maps each id to its matrix row.
+"""
+
+import calendar as _cal
+import datetime as _dt
+import numpy as np
+from .common import MONTHS, TotalsCache, fingerprint, _norm_shrink
+
+TIMELINE_GLOBALS = ("hours", "fx", "shrink")
+# Period boundaries in fiscal months: the 12 months (see periods.period_axis for others)
+MONTH_EDGES = np.arange(len(MONTHS) + 1, dtype=float)
+
+def date_pos(date_str, start_year=None):
+    """Fiscal position of a date in months (Jan 1 = 0.0, Apr 15 = 3 + 14/30); None if invalid.
+    Without start_year the year is only used for days-in-month (the budget year runs
+    Jan … Dec); with it, positions count on from Jan 1 of start_year (multi-year horizon)."""
+    try:
+        d = _dt.date.fromisoformat(str(date_str).strip())
+    except ValueError:
+        return None
+    years = d.year - start_year if start_year is not None else 0
+    return 12 * years + d.month - 1 + (d.day - 1) / _cal.monthrange(d.year, d.month)[1]
+
+def _weights(pos, edges=MONTH_EDGES):
+    """Fraction of each period at the new value for changes at positions pos → (n, periods)."""
+    pos = np.asarray(pos, dtype=float).reshape(-1, 1)
+    return np.clip((edges[1:] - pos) / (edges[1:] - edges[:-1]), 0.0, 1.0)
+
+def _block_timeline(cfgs, value_key, ids, edges=MONTH_EDGES, start_year=None):
+    """{block id: {date, value_key}} → (weights (len(ids), periods), values (len(ids),)),
+    one row per id in ids ({id: row}). Blocks with no (valid) change get weight 0."""
+    pos = np.full(len(ids), np.inf)
+    val = np.zeros(len(ids))
+    for k, cfg in cfgs.items():
+        if not cfg or not cfg.get("date") or not cfg.get(value_key):
+            continue
+        p = date_pos(cfg["date"], start_year)
+        if p is None:
+            continue
+        pos[ids[k]], val[ids[k]] = p, float(cfg[value_key])
+    return _weights(pos, edges), val
+
+def _wave_timeline(waves, ids, edges=MONTH_EDGES, start_year=None):
+    """Hiring waves {block id: [{date, delta}]} → HC added per block (row in ids)
+    and period (len(ids), periods). A wave holds from its date on, day-prorated."""
+    out = np.zeros((len(ids), len(edges) - 1))
+    for k, chg in waves.items():
+        pts = [(p, float(c["delta"])) for c in chg or []
+               if c.get("delta") and (p := date_pos(c.get("date", ""), start_year)) is not None]
+        if pts:
+            out[ids[k]] = np.array([d for _, d in pts]) @ _weights([p for p, _ in pts], edges)
+    return out
+
+def _global_timeline(changes, norm=float, edges=MONTH_EDGES, start_year=None):
+    """Sorted [{date, value}] → (base_w, fixed): month value = g_value × base_w + fixed.
+    Day-prorated across any number of changes, including several in one month."""
+    pts = sorted((p, norm(c["value"])) for c in changes or []
+                 if c.get("value") is not None and (p := date_pos(c.get("date", ""), start_year)) is not None)
+    n = len(edges) - 1
+    if not pts:
+        return np.ones(n), np.zeros(n)
+    w = _weights([p for p, _ in pts], edges)
+    v = np.array([v for _, v in pts])
+    # value_k holds from change k until change k+1
+    held = w - np.vstack((w[1:], np.zeros((1, n))))
+    return 1 - w[0], v @ held
+
+def compile_timelines(budget, edges=MONTH_EDGES, start_year=None):
+    """All of a budget's effective-dated changes as dense (…, periods) matrices —
+    months by default, or any period edges in fiscal months (see date_pos for start_year)."""
+    cola, raises, waves = (budget.get(k) or {} for k in ("cola_configs", "salary_raises", "hc_waves"))
+    ids = {k: i for i, k in enumerate(sorted(set(cola) | set(raises) | set(waves)))}
+    cola_w, cola_up = _block_timeline(cola, "new_up", ids, edges, start_year)
+    raise_w, raise_pct = _block_timeline(raises, "pct", ids, edges, start_year)
+    gc = budget.get("global_changes", {})
+    return dict(ids=ids, cola_w=cola_w, cola_up=cola_up, raise_w=raise_w, raise_pct=raise_pct,
+                hc_wave=_wave_timeline(waves, ids, edges, start_year),
+                globals={k: _global_timeline(gc.get(k), _norm_shrink if k == "shrink" else float,
+                                             edges, start_year)
+                         for k in TIMELINE_GLOBALS})
+
+# Compiled timelines by dated-config hash (compiled once per edit, not per call)
+_TIMELINES = TotalsCache(maxsize=64)
+
+def timelines(budget):
+    """Compiled timelines for a budget, recompiled only when its dated config changes."""
+    key = fingerprint([budget.get("cola_configs"), budget.get("salary_raises"),
+                       budget.get("global_changes"), budget.get("hc_waves")])
+    tl  = _TIMELINES.get(key)
+    if tl is None:
+        tl = compile_timelines(budget)
+        _TIMELINES.put(key, tl)
+    return tl
+
+def timeline_rows(tl, bids):
+    """Each block id's row in the compiled timelines (-1 = no dated change)."""
+    ids = tl["ids"]
+    if not ids:
+        return np.full(len(bids), -1, dtype=np.intp)
+    return np.fromiter((ids.get(b, -1) for b in bids), dtype=np.intp, count=len(bids))
+
+def _block_rate(tl, w, v, mi, block_id):
+    """(weight, value) of block block_id's change (timelines w / v) in month mi; weight 0 if none."""
+    row = tl["ids"].get(block_id)
+    return (tl[w][row, mi], tl[v][row]) if row is not None else (0.0, 0.0)
+
+def effective_up(month, block_id, base_up, budget):
+    """Return effective unit price for a month, prorated if COLA date falls in it.
+    COLA date is treated as a position within the fiscal year (Jan=1 … Dec=12)."""
+    w, new_up = _block_rate(timelines(budget), "cola_w", "cola_up", MONTHS.index(month), block_id)
+    return base_up * (1 - w) + new_up * w if w else base_up
+
+def effective_salary(month, block_id, base_sal, budget):
+    """Return effective base salary for a month, prorated if a raise date falls in it."""
+    w, pct = _block_rate(timelines(budget), "raise_w", "raise_pct", MONTHS.index(month), block_id)
+    return base_sal * (1 + pct * w)
+
+def month_globals(settings, budget):
+    """hours / fx / shrink as 12-month arrays after dated global changes."""
+    tl = timelines(budget)
+    return {k: settings[k] * base_w + fixed for k, (base_w, fixed) in tl["globals"].items()}
@@ -0,0 +1,416 @@
+"""
+Vectorised full-year P&L engine.
+
+Two phases. _reduce_rows flattens every block of every month into one row per
+(month, block) and collapses the rows into per-month sums ("stats") that do not
+depend on the settings. _apply turns stats + settings into every P&L line for
+all 12 months. Settings may carry leading batch dimensions, so a scenario overlay
+(or thousands of them) costs a few vector multiplies, not a rebuild.
+"""
+
+import math
+import numpy as np
+from .common import MONTHS, fingerprint, _opt, _div, _norm_shrink, _norm_attrition
+from .budget import OH_ROLES, get_oh_cfg
+from .blocks import Block, BlockView
+from .timeline import timelines, timeline_rows, month_globals
+from .cache import budget_fps
+
+# Rows are split by which per-block overrides they carry, so hours and shrinkage
+# can be re-applied per month/scenario: class = 2 × has_hours_override + has_shrink_override
+N_CLASSES = 4
+
+_TYPED = (Block, BlockView)
+
+def _raw_block_rows(budget, months=None):
+    """Flatten budget["blocks"] into column arrays — one row per month × block,
+    before dated changes. months: optional set of month indices (default: all 12)."""
+    recs = []
+    for mi, m in enumerate(MONTHS):
+        if months is not None and mi not in months: continue
+        for blk_i, b in enumerate(budget["blocks"].get(m, [])):
+            if type(b) not in _TYPED:
+                b = Block.load(b)                               # legacy dict: typed record
+            _, hc, sal, up, up_raw, cur, shr, fx, hrs, att, ramp, bid = b.record()
+            recs.append((mi, blk_i, bid,
+                         ramp.get(m, hc) if ramp else hc,       # ramp-adjusted HC
+                         sal, up,                               # base UP (EUR)
+                         up_raw, cur == "USD",                  # raw USD value
+                         shr, fx, hrs, att))
+    cols = list(zip(*recs)) or [()] * 12
+    f    = lambda v: np.array(v, dtype=float)
+    opt  = lambda v: np.array([np.nan if x is None else x for x in v], dtype=float)
+    bids = np.empty(len(cols[2]), dtype=object)
+    bids[:] = cols[2]
+    return dict(month=np.array(cols[0], dtype=np.intp), pos=np.array(cols[1], dtype=np.intp), bid=bids,
+                hc=f(cols[3]), sal=f(cols[4]), up=f(cols[5]), up_raw=opt(cols[6]),
+                usd=np.array(cols[7], dtype=bool),
+                shr=opt(cols[8]), fx=opt(cols[9]), hrs=opt(cols[10]), att=opt(cols[11]))
+
+def _dated_rows(r, tl, col):
+    """Apply compiled timelines to raw rows. col: each row's timeline column —
+    its month, or its period on a finer axis (see periods.py). Rows may carry
+    their timeline rows already ("trow", looked up before a gather)."""
+    row = r["trow"] if "trow" in r else timeline_rows(tl, r["bid"])
+    # Dated changes by block id: COLA-adjusted UP (EUR), raised salary, hiring waves
+    up, sal, hc = r["up"], r["sal"], r["hc"]
+    up  = _timeline_rows(tl["cola_w"], tl["cola_up"], col, row, lambda w, v: up * (1 - w) + v * w, up)
+    sal = _timeline_rows(tl["raise_w"], tl["raise_pct"], col, row, lambda w, v: sal * (1 + v * w), sal)
+    has = row >= 0
+    if has.any():
+        hc = np.maximum(hc + np.where(has, tl["hc_wave"][np.where(has, row, 0), col], 0.0), 0.0)
+    up_raw = np.where(np.isnan(r["up_raw"]), up, r["up_raw"])            # raw USD defaults to UP
+    return dict(r, hc=hc, sal=sal, up=up, up_raw=up_raw)
+
+def _load_block_rows(budget, months=None):
+    """Block rows with dated changes applied — one row per month × block.
+    months: optional set of month indices to load (default: all 12)."""
+    r = _raw_block_rows(budget, months)
+    return _dated_rows(r, timelines(budget), r["month"])
+
+def _timeline_rows(w, vals, mon, row, blend, base):
+    """Apply a compiled block timeline to rows: blend(weight, value) where the row's
+    block (timeline row, -1 = none) has a change in force, base elsewhere."""
+    has = row >= 0
+    if not has.any():
+        return base
+    p  = np.where(has, row, 0)
+    rw = np.where(has, w[p, mon], 0.0)
+    return np.where(rw > 0, blend(rw, vals[p]), base)
+
+def _reduce_rows(r, n=len(MONTHS)):
+    """Collapse block rows into per-month sums. Nothing here reads g, so the
+    result is reusable across every settings change and scenario overlay."""
+    m       = r["month"]
+    hc, sal = r["hc"], r["sal"]
+    has_hrs = ~np.isnan(r["hrs"]); has_shr = ~np.isnan(r["shr"])
+    has_fx  = ~np.isnan(r["fx"]);  has_att = ~np.isnan(r["att"])
+    eur     = ~r["usd"]
+    # Override-only part of each row's effective hours: global hours / shrink are
+    # multiplied back in per class at apply time.
+    hrs_f  = np.where(has_hrs, r["hrs"], 1.0)
+    keep_f = np.where(has_shr, 1 - _norm_shrink(np.where(has_shr, r["shr"], 0)), 1.0)
+    e      = hc * hrs_f * keep_f
+    fx_b   = np.where(has_fx, r["fx"], 0.0)              # block FX (0 = no override / zero)
+    fx_ok  = fx_b != 0
+    fx_s   = np.where(fx_ok, fx_b, 1.0)
+    att_n  = _norm_attrition(np.where(has_att, r["att"], 0))
+
+    grp = lambda x: np.bincount(m, weights=x, minlength=n)
+    cls = m + n * (2 * has_hrs + has_shr)
+    grp_cls = lambda x: np.bincount(cls, weights=x, minlength=N_CLASSES * n).reshape(N_CLASSES, n)
+    return dict(
+        hc          = grp(hc),
+        hc_nofx     = grp(np.where(has_fx, 0, hc)),
+        hc_noatt    = grp(np.where(has_att, 0, hc)),
+        w_sal       = grp(hc * sal),
+        w_sal_nofx  = grp(np.where(has_fx, 0, hc * sal)),
+        q_sal       = grp(np.where(fx_ok, hc * sal / fx_s, 0)),   # TRY→EUR at block FX
+        q_hc        = grp(np.where(fx_ok, hc / fx_s, 0)),
+        w_fx        = grp(hc * fx_b),
+        w_att       = grp(np.where(has_att, hc * att_n, 0)),
+        e           = grp_cls(e),
+        r_eur       = grp_cls(np.where(eur, e * r["up"], 0)),
+        r_eur_nofx  = grp_cls(np.where(eur & ~has_fx, e * r["up"], 0)),
+        rt_fx       = grp_cls(np.where(eur, e * r["up"] * fx_b, 0)),
+        r_usd       = grp_cls(np.where(r["usd"], e * r["up_raw"], 0)),
+    )
+
+def _merge_stats(old, new, months):
+    """Take months (set of indices) from new, the rest from old."""
+    mask = np.isin(np.arange(len(MONTHS)), list(months))
+    return {k: np.where(mask, new[k], old[k]) for k in new}
+
+def _params(settings, overlay=None, mg=None):
+    """Settings + optional scenario overlay as broadcastable arrays.
+    mg: month_globals — hours/fx/shrink per month after dated changes (default: flat).
+    An overlay's hours/fx/shrink replace the whole year's value.
+    overlay keys (all optional, scalars or arrays broadcasting against 12 months):
+        up_pct      — unit price multiplier e.g. 1.10 = +10%
+        sal_pct     — salary multiplier e.g. 0.95 = -5%
+        hc_pct      — headcount multiplier
+        ctc_override— override CTC ratio
+        fx          — global EUR/TRY (blocks with their own FX keep it)
+        fx_override — EUR/TRY for every block, overriding block FX too
+        hours       — global worked hours / agent / month
+        attrition   — global attrition rate (per-block overrides still win)
+        shrink      — global shrinkage (per-block overrides still win)
+    """
+    g  = settings
+    so = overlay or {}
+    mg = mg or g
+    a  = lambda v: np.asarray(v, dtype=float)
+    shrink = a(so.get("shrink", mg["shrink"]))
+    fx     = a(so.get("fx", mg["fx"]))
+    return dict(
+        hours      = a(so.get("hours", mg["hours"])),
+        shrink     = _norm_shrink(shrink),
+        shrink_raw = shrink,
+        fx         = fx,
+        fx_all     = a(so.get("fx_override", np.nan)),
+        usd_try    = a(g.get("usd_try", mg["fx"])),
+        ctc        = a(so.get("ctc_override", g["ctc"])),
+        bonus_pct  = a(g["bonus_pct"]),
+        meal       = a(g["meal"]),
+        attrition  = _norm_attrition(so.get("attrition", g["attrition_rate"])),
+        bf_eff     = a(g["backfill_efficiency"]),
+        up_mult    = a(so.get("up_pct",  1.0)),
+        sal_mult   = a(so.get("sal_pct", 1.0)),
+        hc_mult    = a(so.get("hc_pct",  1.0)),
+    )
+
+def _oh_params(budget):
+    """Per-month overhead config as arrays: {role: (ratio, salary, hc_override|NaN)}."""
+    cfgs = [get_oh_cfg(m, budget) for m in MONTHS]
+    out = {}
+    for role, defaults in OH_ROLES:
+        role_cfgs = [c.get(role, defaults) for c in cfgs]
+        out[role] = (np.array([c.get("ratio",  defaults["ratio"])  for c in role_cfgs], dtype=float),
+                     np.array([c.get("salary", defaults["salary"]) for c in role_cfgs], dtype=float),
+                     np.array([_opt(c.get("hc_override")) for c in role_cfgs], dtype=float))
+    return out
+
+def _overhead_lines(oh_params, prod_hc, p, fx, frac=1.0):
+    """calc_overhead for every month (and batch element) at once. frac: share of a
+    month each period covers (cost is prorated, HC is a headcount)."""
+    k_sal = p["ctc"] * (1 + p["bonus_pct"])
+    out = {}
+    for role, _ in OH_ROLES:
+        ratio, sal, ovr = oh_params[role]
+        # HC: manual override wins, else ratio-based ceiling (you hire whole people)
+        ok     = (ratio > 0) & (prod_hc > 0)
+        auto   = np.where(ok, np.ceil(_div(prod_hc, ratio)), 0.0)
+        manual = ~np.isnan(ovr)
+        hc     = np.where(manual, ovr, auto)
+        cost_try = (hc * sal * k_sal + hc * p["meal"]) * frac
+        out[role] = dict(hc=hc, salary=sal, ratio=ratio, cost_try=cost_try,
+                         cost_eur=_div(cost_try, fx), manual=manual)
+    out["total_cost_try"] = sum(out[r]["cost_try"] for r, _ in OH_ROLES)
+    out["total_cost_eur"] = sum(out[r]["cost_eur"] for r, _ in OH_ROLES)
+    return out
+
+def _apply(s, opex_cfg, oh_params, p, frac=1.0):
+    """Every P&L line for all months from per-month stats + settings.
+    Returns {key: array (..., 12)} where ... are the settings' batch dimensions.
+    frac: share of a month per period on a finer axis (see periods.py) — flows
+    (hours, revenue, cost, hires) are prorated, headcounts and HC deltas are not."""
+    u, k_hc = p["up_mult"], p["hc_mult"]
+    keep    = 1 - p["shrink"]
+    H       = p["hours"]
+    # Σ over override classes: (no hrs, no shr) (no hrs, shr) (hrs, no shr) (hrs, shr)
+    # (class axis is second-to-last so stats can be stacked per client in front;
+    #  these hour-weighted sums are flows, so frac prorates them on a sub-month axis)
+    by_cls  = lambda x: (H * keep * x[..., 0, :] + H * x[..., 1, :] + keep * x[..., 2, :] + x[..., 3, :]) * frac
+
+    fx, fx_all = p["fx"], p["fx_all"]
+    all_fx  = ~np.isnan(fx_all)                     # scenario FX replaces every block's FX
+    fx_glob = np.where(all_fx, fx_all, fx)
+    usd_try = p["usd_try"]
+    # If block billed in USD, revenue path: USD × usd_try = TRY, then ÷ eur_try = EUR
+    usd_mult = np.where(fx_glob != 0, _div(usd_try, fx_glob), 1.0)
+
+    total_hc  = k_hc * s["hc"]
+    total_hrs = k_hc * by_cls(s["e"])
+    r_eur, r_usd = by_cls(s["r_eur"]), by_cls(s["r_usd"])
+    total_rev_eur = k_hc * u * (r_eur + usd_mult * r_usd)
+    total_rev_try = k_hc * u * (np.where(all_fx, fx_all * r_eur, by_cls(s["rt_fx"]) + fx * by_cls(s["r_eur_nofx"]))
+                                + usd_try * r_usd)
+
+    k_sal = p["sal_mult"] * p["ctc"] * (1 + p["bonus_pct"])
+    meal  = p["meal"]
+    total_cost_try = k_hc * (k_sal * s["w_sal"] + meal * s["hc"]) * frac
+    total_cost_eur = k_hc * frac * np.where(all_fx, _div(k_sal * s["w_sal"] + meal * s["hc"], fx_all),
+                                     k_sal * s["q_sal"] + meal * s["q_hc"]
+                                     + _div(k_sal * s["w_sal_nofx"] + meal * s["hc_nofx"], fx))
+
+    has_hc  = s["hc"] != 0
+    avg_sal = p["sal_mult"] * _div(s["w_sal"], s["hc"])
+    avg_fx  = np.where(has_hc, np.where(all_fx, fx_all, _div(s["w_fx"] + fx * s["hc_nofx"], s["hc"])), fx_glob)
+    avg_eff = np.where(has_hc, _div(total_hrs, total_hc), H * (1 - p["shrink_raw"]) * frac)
+    to_eur  = lambda v: _div(v, avg_fx)
+
+    # Per-block weighted attrition; backfill hired 1-for-1
+    attrition_hc = k_hc * (s["w_att"] + p["attrition"] * s["hc_noatt"])
+    backfill_hc  = attrition_hc
+    backfill_cost_try = (backfill_hc * avg_sal * p["ctc"] * (1 + p["bonus_pct"]) + backfill_hc * meal) * frac
+    backfill_cost_eur = to_eur(backfill_cost_try)
+    backfill_hrs      = backfill_hc * avg_eff * p["bf_eff"]
+
+    # OPEX / CAPEX — recruitment & CAPEX follow the HC delta vs prior month (Jan vs itself)
+    prior_hc    = np.concatenate((total_hc[..., :1], total_hc[..., :-1]), axis=-1)
+    hc_increase = np.maximum(0.0, total_hc - prior_hc)
+    new_hires   = backfill_hc * frac + hc_increase
+    training_cost_try    = backfill_hc * frac * opex_cfg.get("training_cost_per_hire", 0)
+    recruitment_cost_try = new_hires   * opex_cfg.get("recruitment_fee", 0)
+    it_cost_try          = total_hc    * frac * opex_cfg.get("it_cost_per_seat", 0)
+    fac_cost_try         = total_hc    * frac * opex_cfg.get("facilities_per_seat", 0)
+    capex_try = hc_increase * (
+        opex_cfg.get("capex_pc", 0) +
+        opex_cfg.get("capex_headset", 0) +
+        opex_cfg.get("capex_software", 0)
+    )
+    training_cost_eur    = to_eur(training_cost_try)
+    recruitment_cost_eur = to_eur(recruitment_cost_try)
+    it_cost_eur          = to_eur(it_cost_try)
+    fac_cost_eur         = to_eur(fac_cost_try)
+    capex_eur            = to_eur(capex_try)
+    total_opex_try = training_cost_try + recruitment_cost_try + it_cost_try + fac_cost_try
+    total_opex_eur = training_cost_eur + recruitment_cost_eur + it_cost_eur + fac_cost_eur
+
+    # Overhead roles (TM/QM/OM) — pure cost, no hours, no revenue
+    oh = _overhead_lines(oh_params, total_hc, p, fx_glob, frac)
+    oh_cost_eur = oh["total_cost_eur"]
+    oh_cost_try = oh["total_cost_try"]
+
+    grand_cost_eur = total_cost_eur + backfill_cost_eur + oh_cost_eur + total_opex_eur + capex_eur
+    grand_cost_try = total_cost_try + backfill_cost_try + oh_cost_try + total_opex_try + capex_try
+
+    lines = dict(
+        rev=total_rev_eur,              rev_try=total_rev_try,
+        cost=grand_cost_eur,            cost_try=grand_cost_try,
+        cost_excl_backfill=total_cost_eur,
+        backfill_cost_eur=backfill_cost_eur,
+        backfill_cost_try=backfill_cost_try,
+        training_cost_eur=training_cost_eur,
+        training_cost_try=training_cost_try,
+        recruitment_cost_eur=recruitment_cost_eur,
+        recruitment_cost_try=recruitment_cost_try,
+        it_cost_eur=it_cost_eur,        it_cost_try=it_cost_try,
+        fac_cost_eur=fac_cost_eur,      fac_cost_try=fac_cost_try,
+        capex_eur=capex_eur,            capex_try=capex_try,
+        hc_increase=hc_increase,        new_hires=new_hires,
+        total_opex_eur=total_opex_eur,  total_opex_try=total_opex_try,
+        total_capex_eur=capex_eur,      total_capex_try=capex_try,
+        oh_cost_eur=oh_cost_eur,        oh_cost_try=oh_cost_try,
+        margin=total_rev_eur - grand_cost_eur,
+        margin_try=total_rev_try - grand_cost_try,
+        hc=total_hc,
+        hrs=total_hrs + backfill_hrs,
+        hrs_billable=total_hrs,
+        backfill_hrs=backfill_hrs,
+        attrition_hc=attrition_hc,
+        backfill_hc=backfill_hc,
+        net_hc=total_hc - attrition_hc,
+        # Break-even: must cover all costs (prod + backfill + overhead + opex) per billable hr
+        breakeven_up=_div(grand_cost_eur, np.where(total_hrs > 0, total_hrs, 0)),
+    )
+    # Every line shares the batch shape, even ones no overlay touched
+    shape = np.broadcast_shapes(*(v.shape for v in lines.values()))
+    lines = {k: np.broadcast_to(v, shape) for k, v in lines.items()}
+    lines["oh"] = {role: {k: np.broadcast_to(v, shape) for k, v in oh[role].items()} for role, _ in OH_ROLES}
+    lines["oh"]["total_cost_try"] = lines["oh_cost_try"]
+    lines["oh"]["total_cost_eur"] = lines["oh_cost_eur"]
+    return lines
+
+def year_lines(budget, settings, overlay=None, stats=None):
+    """Every P&L line as {key: array (..., 12)}. Full pass unless per-month stats
+    (e.g. from a MonthTracker) are passed in."""
+    if stats is None:
+        stats = _reduce_rows(_load_block_rows(budget))
+    return _apply(stats, budget.get("opex", {}), _oh_params(budget),
+                  _params(settings, overlay, month_globals(settings, budget)))
+
+def split_months(lines):
+    """{key: array of 12} → {month: {key: float}} — same shape get_totals always returned."""
+    cols = {k: v.tolist() for k, v in lines.items() if k != "oh"}
+    oh   = lines["oh"]
+    oh_cols = {role: {k: v.tolist() for k, v in oh[role].items()} for role, _ in OH_ROLES}
+    out = {}
+    for mi, m in enumerate(MONTHS):
+        mt = {k: v[mi] for k, v in cols.items()}
+        mt["oh"] = {role: {k: v[mi] for k, v in oh_cols[role].items()} for role, _ in OH_ROLES}
+        mt["oh"]["total_cost_try"] = mt["oh_cost_try"]
+        mt["oh"]["total_cost_eur"] = mt["oh_cost_eur"]
+        out[m] = mt
+    return out
+
+def _split_row(lines, i):
+    """Row i of batched lines (batch, 12) → {month: totals} for that batch element."""
+    one = {k: v[i] for k, v in lines.items() if k != "oh"}
+    one["oh"] = {role: {k: v[i] for k, v in lines["oh"][role].items()} for role, _ in OH_ROLES}
+    return split_months(one)
+
+# ── Month-level dirty tracking ──────────────────────────────
+# A block edit, ramp change, copy-month or COLA edit only changes the fingerprints
+# of the months it touched. Only those months' block rows are re-reduced; the
+# apply step is cheap and always runs over all 12 months (so the prior-month HC
+# delta, settings and overlays never need their own invalidation rules).
+class MonthTracker:
+    """Per-budget month fingerprints + per-month stats for incremental recompute.
+    Stats are settings-independent, so a settings change reuses all of them."""
+    def __init__(self):
+        self._state = {}
+        self.last_dirty = []
+
+    def stats(self, budget, fps):
+        prev = self._state.get(id(budget))
+        if prev is None:
+            dirty = set(range(len(MONTHS)))
+        else:
+            dirty = {mi for mi, fp in enumerate(fps) if fp != prev["fps"][mi]}
+        if not dirty:
+            return prev["stats"]
+        self.last_dirty = [MONTHS[mi] for mi in sorted(dirty)]
+        stats = _reduce_rows(_load_block_rows(budget, months=dirty))
+        if len(dirty) < len(MONTHS):
+            stats = _merge_stats(prev["stats"], stats, dirty)
+        self._state[id(budget)] = dict(fps=list(fps), stats=stats)
+        return stats
+
+# ── Entry points ─────────────────────────────────────────────
+def _year_key(budget, settings, overlay=None):
+    """(result-cache key, month fingerprints) for one budget under settings (+ overlay)."""
+    fps, gfp = budget_fps(budget, settings)
+    return fingerprint([gfp, fps, overlay] if overlay else [gfp, fps]), fps
+
+def year_totals(budget, settings, overlay=None, cache=None, tracker=None):
+    """Full-year P&L: {month: totals}. overlay: optional scenario (see _params).
+    cache (TotalsCache) and tracker (MonthTracker) are optional; with them, an
+    unchanged budget is a lookup and an edited one only re-reduces dirty months.
+    Treat the returned dicts as read-only — they may be shared through the cache."""
+    if cache is None and tracker is None:
+        return split_months(year_lines(budget, settings, overlay))
+    key, fps = _year_key(budget, settings, overlay)
+    year     = cache.get(key) if cache is not None else None
+    if year is None:
+        if tracker is not None:
+            stats = tracker.stats(budget, fps)
+        else:
+            stats = _reduce_rows(_load_block_rows(budget))
+        year = split_months(year_lines(budget, settings, overlay, stats=stats))
+        if cache is not None:
+            cache.put(key, year)
+    return year
+
+def get_totals(month, budget, settings):
+    return year_totals(budget, settings)[month]
+
+def get_totals_scenario(month, budget, settings, scen_overrides):
+    """Like get_totals but applies scenario-level multipliers/overrides."""
+    return year_totals(budget, settings, scen_overrides)[month]
+
+def calc_overhead(month, prod_hc, g, budget):
+    """Calculate overhead cost for TM/QM/OM roles for a given month."""
+    oh     = get_oh_cfg(month, budget)
+    result = {}
+    total_cost_try = total_cost_eur = 0.0
+    for role, defaults in OH_ROLES:
+        cfg      = oh.get(role, defaults)
+        ratio    = cfg.get("ratio", defaults["ratio"])
+        sal      = cfg.get("salary", defaults["salary"])
+        override = cfg.get("hc_override")
+        # HC: manual override wins, else ratio-based ceiling (you hire whole people)
+        if override is not None:
+            hc = override
+        else:
+            hc = math.ceil(prod_hc / ratio) if (ratio > 0 and prod_hc > 0) else 0
+        cost_try = hc * sal * g["ctc"] * (1 + g["bonus_pct"]) + hc * g["meal"]
+        cost_eur = cost_try / g["fx"] if g["fx"] else 0
+        result[role] = dict(hc=hc, salary=sal, ratio=ratio,
+                            cost_try=cost_try, cost_eur=cost_eur,
+                            manual=override is not None)
+        total_cost_try += cost_try
+        total_cost_eur += cost_eur
+    result["total_cost_try"] = total_cost_try
+    result["total_cost_eur"] = total_cost_eur
+    return result
@@ -0,0 +1,183 @@
+"""
+Precomputed Erlang C table — built once, memory-mapped by every process.
+
+    python -m ccbudget.erlang_table --max-load 1000      # writes erlang_c.tbl
+    table = ErlangTable.shared()                         # None until built
+    table.solve_agents(A, aht, 0.8, 20)                  # same result as engine.solve_agents
+
+SL and ASA for N agents at A Erlangs and answer-time ratio t / aht are
+1 − C·e^(−(N−A)·t/aht) and C·aht / (N − A), so the only expensive term is
+C(N, A): the table stores log C over a grid in A × N and the ratio stays exact
+instead of being one more grid axis. Rows are A = (k·step)², uniform in √A —
+fine where C moves fastest (small loads), coarse where it is smooth — and each
+row keeps only the band of N where C is not ~0 or 1: N = ⌊A⌋ + 1 … ⌊A⌋ + width
+(C < 1e-14 above it). A lookup interpolates log C between the two rows around
+√A; the solver bisects that band (≈ 9 vectorised gathers, whatever the load).
+Loads outside the grid fall back to the exact engine solver.
+
+The file is a 256-byte JSON header plus one float32 array. It is opened with
+np.memmap, so every Streamlit session and worker process reads the same pages
+from the OS cache — no per-process copy. Path: CCBUDGET_ERLANG_TABLE, default
+erlang_c.tbl in the working directory.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import numpy as np
+
+from .engine.erlang import _warm_start, _check_inputs, erlang_c, solve_agents as _exact_solve
+
+DEFAULT_PATH = os.environ.get("CCBUDGET_ERLANG_TABLE", "erlang_c.tbl")
+MAGIC        = "ccbudget-erlang-c"
+VERSION      = 1
+HEADER       = 256
+
+def build_table(path=DEFAULT_PATH, max_load=1000.0, step=0.005):
+    """Write the table for loads up to max_load Erlangs, rows every step in √A.
+    One B recurrence walk over all rows at once. Returns the header dict."""
+    rows  = int(math.ceil(math.sqrt(max_load) / step)) + 2
+    width = int(math.ceil(8 * math.sqrt(max_load) + 10))
+    a     = (np.arange(rows) * step) ** 2
+    base  = np.floor(a)                          # band starts at N = base + 1
+    n, b  = _warm_start(a)
+    logc  = np.zeros((rows, width), dtype=np.float32)
+    for _ in range(int((base + width - n).max())):
+        n = n + 1
+        b = a * b / (n + a * b)
+        j = (n - base - 1).astype(np.intp)
+        ok = (j >= 0) & (j < width) & (a > 0)
+        c = n[ok] * b[ok] / (n[ok] - a[ok] * (1 - b[ok]))
+        with np.errstate(divide="ignore"):
+            logc[ok, j[ok]] = np.maximum(np.log(c), -745.0)
+    head = dict(magic=MAGIC, version=VERSION, rows=rows, width=width, step=step, max_load=float(a[-2]))
+    raw  = json.dumps(head).encode()
+    if len(raw) >= HEADER:
+        raise ValueError("Table header too long")
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(raw.ljust(HEADER, b" "))
+        f.write(logc.astype("<f4").tobytes())
+    os.replace(tmp, path)                       # readers never see a half-written file
+    return head
+
+class ErlangTable:
+    """A built table, memory-mapped read-only."""
+    _shared = {}
+
+    @classmethod
+    def shared(cls, path=None):
+        """The process-wide table at path (default DEFAULT_PATH), or None if it
+        has not been built (or is unreadable)."""
+        path = path or DEFAULT_PATH
+        if path not in cls._shared:
+            try:
+                cls._shared[path] = cls(path)
+            except (OSError, ValueError):
+                return None
+        return cls._shared[path]
+
+    def __init__(self, path=DEFAULT_PATH):
+        with open(path, "rb") as f:
+            head = json.loads(f.read(HEADER).decode().strip() or "{}")
+        if head.get("magic") != MAGIC or head.get("version") != VERSION:
+            raise ValueError(f"{path} is not an Erlang C table (version {VERSION})")
+        self.path, self.step, self.max_load = path, head["step"], head["max_load"]
+        self.rows, self.width = head["rows"], head["width"]
+        self.logc = np.memmap(path, dtype="<f4", mode="r", offset=HEADER, shape=(self.rows, self.width))
+
+    def _inside(self, A):
+        return (A > 0) & (A <= self.max_load)
+
+    def _logc(self, N, A):
+        """Interpolated log C for loads inside the grid (N, A flat arrays, N > A).
+        Linear in √A between the rows around A; when the upper row already has
+        N ≤ its load, towards C = 1 at A = N instead (C has a kink there)."""
+        u  = np.sqrt(A) / self.step
+        k  = np.minimum(np.floor(u).astype(np.intp), self.rows - 2)
+        lo, hi = self._row(k, N), self._row(k + 1, N)
+        u1 = np.where(np.isnan(hi), np.sqrt(N) / self.step, k + 1)
+        w  = (u - k) / np.maximum(u1 - k, 1e-12)
+        return (1 - w) * lo + w * np.nan_to_num(hi, nan=0.0)
+
+    def _row(self, r, N):
+        """Stored log C(N, A_r); NaN where N ≤ ⌊A_r⌋ (C = 1), ~0 above the band."""
+        j   = N - np.floor((r * self.step) ** 2) - 1
+        val = np.where(j < 0, np.nan, -745.0)
+        inb = (j >= 0) & (j < self.width)
+        val[inb] = self.logc[r[inb], j[inb].astype(np.intp)]
+        return val
+
+    def erlang_c(self, N, A):
+        """Erlang C probability of waiting, from the table (exact outside it)."""
+        N, A = np.broadcast_arrays(np.asarray(N, dtype=float), np.asarray(A, dtype=float))
+        out  = np.ones(N.shape)
+        inn  = self._inside(A) & (N > A)
+        out[inn] = np.exp(self._logc(N[inn], A[inn]))
+        far  = ~self._inside(A) & (N > A)
+        if far.any():
+            out[far] = erlang_c(N[far], A[far])
+        return out
+
+    def solve_agents(self, A, aht, sl_target, sl_seconds):
+        """engine.solve_agents from the table: dict(agents, asa, occ %, sl).
+        Queues outside the grid (or past the band) are solved exactly."""
+        A, aht, g, t = np.broadcast_arrays(*(np.asarray(x, dtype=float)
+                                             for x in (A, aht, sl_target, sl_seconds)))
+        _check_inputs(A, aht, g, t)
+        live = A > 0
+        if np.any(live & ((g >= 1) | ~(aht > 0))):
+            raise ValueError("Erlang C needs a service-level target below 100% and AHT above 0")
+        out = dict(agents=np.zeros(A.shape, dtype=np.int64), asa=np.zeros(A.shape),
+                   occ=np.zeros(A.shape), sl=np.zeros(A.shape))
+        inn = np.flatnonzero(self._inside(A))
+        a, h, gg, tt = (x.ravel()[inn] for x in (A, aht, g, t))
+        base = np.floor(a)
+        sl_at = lambda j, sel: 1 - np.exp(self._logc(base[sel] + j, a[sel])) * np.exp(-(base[sel] + j - a[sel]) * tt[sel] / h[sel])
+        lo, hi = np.zeros(a.size), np.full(a.size, float(self.width))
+        while True:
+            act = np.flatnonzero(hi - lo > 1)
+            if not act.size:
+                break
+            mid = (lo[act] + hi[act]) // 2
+            ok  = sl_at(mid, act) >= gg[act]
+            hi[act[ok]], lo[act[~ok]] = mid[ok], mid[~ok]
+        fit = hi < self.width                       # else past the band: exact
+        n   = (base + hi)[fit]
+        a, h, tt = a[fit], h[fit], tt[fit]
+        c   = np.exp(self._logc(n, a))
+        res = dict(agents=n, asa=c * h / (n - a), occ=a / n * 100, sl=1 - c * np.exp(-(n - a) * tt / h))
+        for k, v in res.items():
+            out[k].flat[inn[fit]] = v
+        rest = np.ones(A.size, dtype=bool)
+        rest[inn[fit]] = False
+        rest = np.flatnonzero(rest & live.ravel())
+        if rest.size:
+            ex = _exact_solve(*(x.ravel()[rest] for x in (A, aht, g, t)))
+            for k, v in ex.items():
+                out[k].flat[rest] = v
+        return out
+
+# ── CLI ──────────────────────────────────────────────────────
+def _parser():
+    ap = argparse.ArgumentParser(prog="python -m ccbudget.erlang_table", description=__doc__.split("\n\n")[0].strip())
+    ap.add_argument("-o", "--output", default=DEFAULT_PATH, help=f"table path (default: {DEFAULT_PATH})")
+    ap.add_argument("--max-load", type=float, default=1000.0, help="largest offered load in Erlangs (default: 1000)")
+    ap.add_argument("--step", type=float, default=0.005, help="row spacing in √Erlangs (default: 0.005)")
+    return ap
+
+def main(argv=None):
+    args = _parser().parse_args(argv)
+    if args.max_load <= 0 or args.step <= 0:
+        print("--max-load and --step must be positive", file=sys.stderr)
+        return 2
+    head = build_table(args.output, args.max_load, args.step)
+    size = os.path.getsize(args.output)
+    print(f"{args.output}: {head['rows']} loads x {head['width']} agent counts, "
+          f"up to {head['max_load']:.0f} Erlangs, {size / 1e6:.1f} MB", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+Budget workbook import — the rules behind the sidebar '⬆ Import Excel' and the
+batch CLI, so both read a filled template the same way.
+
+Reads the '② Budget Data' sheet written by the blank template (header on row 3,
+" *" on required headers, month label only on the first row of each group) and
+the legacy one-sheet-per-month format. Also reads forward-rate curves for the
+FX projection and weekly interval arrival profiles for voice staffing.
+"""
+
+import numpy as np
+import pandas as pd
+from .engine import MONTHS, Block, load_blocks, rekey_positions
+from .engine.intervals import DAYS, PER_DAY, INTERVALS, INTERVAL_MIN
+
+# Template header → older export header, both accepted
+COLUMN_ALIASES = {
+    "Shrinkage %":          "Shrinkage Override",
+    "FX Rate":              "FX Override",
+    "Hours/Month":          "Hours Override",
+    "COLA New UP (EUR/hr)": "COLA New UP",
+}
+
+def _num(v):
+    try: return float(v) if str(v).strip() not in ("", "nan", "NaT", "None") else None
+    except (TypeError, ValueError): return None
+
+def _text(v):
+    return str(v).strip() if pd.notna(v) else ""
+
+def _col(row, name):
+    v = row.get(name)
+    if (v is None or (not isinstance(v, str) and pd.isna(v))) and name in COLUMN_ALIASES:
+        v = row.get(COLUMN_ALIASES[name])
+    return v
+
+def _clean_columns(df):
+    df.columns = [str(c).strip().removesuffix("*").strip() for c in df.columns]
+    return df
+
+def _block(row):
+    shr = _num(_col(row, "Shrinkage %"))
+    att = _num(row.get("Attrition %"))
+    return Block({
+        "lang":               _text(row.get("Language", "")),
+        "hc":                 int(float(row["HC"])) if pd.notna(row.get("HC")) else 0,
+        "salary":             _num(row.get("Base Salary (TRY)")) or 0,
+        "unit_price":         _num(row.get("Unit Price (EUR/hr)")) or 0,
+        # Template asks for % (15); the app stores decimals (0.15)
+        "shrink_override":    shr / 100 if shr is not None and shr > 1 else shr,
+        "fx_override":        _num(_col(row, "FX Rate")),
+        "hours_override":     _num(_col(row, "Hours/Month")),
+        "attrition_override": att / 100 if att is not None and att > 1 else att,
+    })
+
+def _is_blank(b):
+    """Placeholder rows the template writes for months without blocks."""
+    return not b["lang"] and not b["hc"] and not b["salary"] and not b["unit_price"]
+
+def _cola(row):
+    date = row.get("COLA Date")
+    if date is None or (not isinstance(date, str) and pd.isna(date)) or not str(date).strip():
+        return None
+    new_up = _num(_col(row, "COLA New UP (EUR/hr)"))
+    if not new_up:
+        return None
+    return {"date": str(date).strip()[:10], "new_up": new_up}
+
+def _budget_sheet(sheet_names):
+    return next((s for s in sheet_names if s.strip().endswith("Budget Data")), None)
+
+def parse_workbook(src):
+    """Parse a filled template (path, bytes buffer or upload) into
+    dict(blocks={month: [block]}, cola_configs={str(idx): cfg}, loaded=n).
+    The Budget Data sheet covers all 12 months; the legacy format only the months
+    it has a sheet for. Raises ValueError if the workbook has neither format."""
+    xls   = pd.ExcelFile(src)
+    sheet = _budget_sheet(xls.sheet_names)
+    blocks = {}
+    cola   = {}
+    if sheet is not None:
+        blocks = {m: [] for m in MONTHS}
+        df = _clean_columns(pd.read_excel(xls, sheet_name=sheet, header=2))
+        if "Month" not in df.columns or "HC" not in df.columns:
+            raise ValueError(f"Sheet '{sheet}' has no Month / HC header on row 3")
+        # Month label is only on the first row of each group
+        df["Month"] = df["Month"].map(_text).replace("", pd.NA).ffill()
+        df = df[pd.to_numeric(df["HC"], errors="coerce").notna()]
+        for _, row in df.iterrows():
+            m = _text(row.get("Month"))
+            if m not in MONTHS: continue
+            b = _block(row)
+            if _is_blank(b): continue
+            cfg = _cola(row)
+            if cfg and str(len(blocks[m])) not in cola:
+                cola[str(len(blocks[m]))] = cfg
+            blocks[m].append(b)
+    elif any(m in xls.sheet_names for m in MONTHS):
+        # Legacy per-month sheet format
+        for m in MONTHS:
+            if m not in xls.sheet_names: continue
+            df = _clean_columns(pd.read_excel(xls, sheet_name=m))
+            if "HC" in df.columns:
+                df = df[pd.to_numeric(df["HC"], errors="coerce").notna()]
+            blocks[m] = [_block(row) for _, row in df.iterrows()]
+    else:
+        raise ValueError("No 'Budget Data' sheet or month sheets found")
+    return dict(blocks=blocks, cola_configs=cola,
+                loaded=sum(len(v) for v in blocks.values()))
+
+def apply_import(budget, parsed):
+    """Replace the imported months' blocks. The file's COLA configs (by row
+    position) go to the imported blocks at that position and win over existing ones."""
+    budget["blocks"].update(parsed["blocks"])
+    load_blocks(budget)
+    budget.setdefault("cola_configs", {}).update(
+        rekey_positions(budget, parsed["cola_configs"], list(parsed["blocks"])))
+    return budget
+
+def parse_fx_curves(src, name=""):
+    """Forward-rate curves from a CSV / Excel sheet: a Month column (Jan … Dec, or
+    twelve rows in fiscal order) and one numeric column per curve (EUR/TRY).
+    Returns {curve name: [12 rates]}. Raises ValueError on a malformed sheet."""
+    df = pd.read_csv(src) if str(name).lower().endswith(".csv") else pd.read_excel(src)
+    df = _clean_columns(df)
+    if "Month" in df.columns:
+        df["Month"] = df["Month"].map(lambda v: _text(v)[:3].title())
+        df = df[df["Month"].isin(MONTHS)].set_index("Month").reindex(MONTHS)
+    elif len(df) != len(MONTHS):
+        raise ValueError(f"Expected a Month column or {len(MONTHS)} rows, got {len(df)} rows")
+    curves = {}
+    for col in df.columns:
+        vals = pd.to_numeric(df[col], errors="coerce")
+        if vals.isna().all():
+            continue
+        if vals.isna().any() or (vals <= 0).any():
+            raise ValueError(f"Curve '{col}' needs a positive rate for every month")
+        curves[str(col)] = vals.astype(float).tolist()
+    if not curves:
+        raise ValueError("No numeric rate columns found")
+    return curves
+
+def _interval_index(df):
+    """Interval (0 … 671) of each row, from an Interval column or Day + Time (HH:MM)."""
+    if "Interval" in df.columns:
+        idx = pd.to_numeric(df["Interval"], errors="coerce")
+    elif {"Day", "Time"} <= set(df.columns):
+        day = df["Day"].map(lambda v: _text(v)[:3].title()).map({d: i for i, d in enumerate(DAYS)})
+        hm  = df["Time"].map(lambda v: _text(v).split(":")[:2])
+        mins = hm.map(lambda t: int(t[0]) * 60 + int(t[1]) if len(t) == 2 and all(x.isdigit() for x in t) else np.nan)
+        idx = day * PER_DAY + mins // INTERVAL_MIN
+    else:
+        raise ValueError("Need an Interval column (0 … 671) or Day and Time columns")
+    bad = idx.isna() | (idx < 0) | (idx >= INTERVALS)
+    if bad.any():
+        raise ValueError(f"Row {int(bad.idxmax()) + 2}: interval outside Mon 00:00 … Sun 23:45")
+    return idx.astype(int).to_numpy()
+
+def parse_interval_profile(src, name=""):
+    """Weekly arrival profiles from a CSV / Excel sheet, one row per 15-minute
+    interval of a typical week: Interval (0 … 671) or Day + Time, Calls, and
+    optionally AHT (s), Queue and Month (blank = every month; a month with rows
+    of its own uses only those). Returns {queue: dict(calls=(12, 672), aht=(12,
+    672) with NaN where not given, or None without an AHT column)}. Raises
+    ValueError on a malformed sheet."""
+    df = pd.read_csv(src) if str(name).lower().endswith(".csv") else pd.read_excel(src)
+    df = _clean_columns(df)
+    if "Calls" not in df.columns:
+        raise ValueError("No Calls column found")
+    idx   = _interval_index(df)
+    calls = pd.to_numeric(df["Calls"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    if (calls < 0).any():
+        raise ValueError("Calls cannot be negative")
+    aht   = pd.to_numeric(df["AHT"], errors="coerce").to_numpy(dtype=float) if "AHT" in df.columns else None
+    queue = df["Queue"].map(_text).replace("", "Queue 1") if "Queue" in df.columns else pd.Series("Queue 1", index=df.index)
+    month = (df["Month"].map(lambda v: MONTHS.index(_text(v)[:3].title()) if _text(v)[:3].title() in MONTHS else -1)
+             if "Month" in df.columns else pd.Series(-1, index=df.index)).to_numpy()
+    out = {}
+    for q in dict.fromkeys(queue):
+        c, a = np.zeros((len(MONTHS), INTERVALS)), np.full((len(MONTHS), INTERVALS), np.nan)
+        rows = (queue == q).to_numpy()
+        for own in (False, True):                 # every-month rows, then months with their own week
+            sel = rows & ((month >= 0) == own)
+            if own:
+                c[month[sel]], a[month[sel]] = 0.0, np.nan
+            at = (month[sel], idx[sel]) if own else (slice(None), idx[sel])
+            c[at] = calls[sel]
+            if aht is not None:
+                a[at] = aht[sel]
+        if aht is not None and (a[c > 0] <= 0).any():
+            raise ValueError(f"Queue '{q}': AHT must be positive where there are calls")
+        out[q] = dict(calls=c, aht=a if aht is not None else None)
+    if not any(v["calls"].any() for v in out.values()):
+        raise ValueError("No calls in the profile")
+    return out
@@ -0,0 +1,267 @@
+"""
+Local SQLite budget store — clients, blocks, actuals and settings survive a
+refresh or a server restart. No outside service: one file (CCBUDGET_DB, default
+ccbudget.db in the working directory).
+
+    store   = BudgetStore.shared()
+    clients = store.client_stubs() or [default_budget()]
+    budget  = open_client(clients, 0, store)      # full data, on first use
+    store.save(budget, pos=0)                     # write-behind: returns at once
+
+Client summaries (name, block count, last computed year) load eagerly; a client's
+blocks, configs and actuals only when it is opened. Until then the session holds
+a stub {client_id, name, summary, _stub}. Blocks are stored as the engine keeps
+them: one row per master, one per month entry (master id + sparse delta).
+
+save() diffs the budget against what the store last wrote — masters by version
+stamp (see engine.blocks), everything else by its JSON — and hands only the
+changed rows to a writer thread, which applies each batch in one transaction.
+Reads wait for pending writes first. A client whose last write failed (or that
+this process never loaded) is rewritten whole: its rows are deleted and written
+again in one transaction, so nothing removed meanwhile comes back.
+
+Settings (the sidebar globals) are kept per client; rows with an empty client
+id — from stores before that — are the default for clients without their own.
+"""
+
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import uuid
+
+from .engine import MONTHS, BLOCK_SCHEMA, Block, BlockView, default_budget
+
+DEFAULT_PATH = os.environ.get("CCBUDGET_DB", "ccbudget.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clients  (cid TEXT PRIMARY KEY, pos INTEGER, name TEXT, summary TEXT);
+CREATE TABLE IF NOT EXISTS config   (cid TEXT, key TEXT, value TEXT, PRIMARY KEY (cid, key));
+CREATE TABLE IF NOT EXISTS masters  (cid TEXT, bid TEXT, data TEXT, PRIMARY KEY (cid, bid));
+CREATE TABLE IF NOT EXISTS months   (cid TEXT, month TEXT, pos INTEGER, bid TEXT, delta TEXT,
+                                     PRIMARY KEY (cid, month, pos));
+CREATE TABLE IF NOT EXISTS actuals  (cid TEXT, month TEXT, data TEXT, PRIMARY KEY (cid, month));
+CREATE TABLE IF NOT EXISTS settings (cid TEXT, key TEXT, value TEXT, PRIMARY KEY (cid, key));
+"""
+# Rows of a client (the clients row itself is upserted, keeping its summary)
+_CLIENT_TABLES = ("config", "masters", "months", "actuals")
+# Budget keys stored in their own tables (everything else is a config row)
+_OWN_ROWS = ("client_id", "name", "blocks", "actuals", "block_schema")
+
+def _default(o):
+    if hasattr(o, "to_dict"):
+        return o.to_dict()
+    if hasattr(o, "tolist"):                    # numpy scalars / arrays
+        return o.tolist()
+    return str(o)
+
+def _dumps(v):
+    return json.dumps(v, sort_keys=True, separators=(",", ":"), default=_default)
+
+def is_stub(cl):
+    return bool(cl.get("_stub"))
+
+def open_client(clients, i, store=None):
+    """clients[i] with its full data, loading a stub from the store in place."""
+    if is_stub(clients[i]):
+        clients[i] = (store or BudgetStore.shared()).load(clients[i]["client_id"])
+    return clients[i]
+
+class BudgetStore:
+    """One SQLite file, write-behind. Safe to share between sessions/threads."""
+    _shared = {}
+
+    @classmethod
+    def shared(cls, path=None):
+        """The process-wide store for path (default DEFAULT_PATH)."""
+        path = path or DEFAULT_PATH
+        if path not in cls._shared:
+            cls._shared[path] = cls(path)
+        return cls._shared[path]
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path   = path
+        self.error  = None                      # last failed write, if any
+        self._saved = {}                        # cid → rows as last written
+        self._stubs = {}                        # cid → (pos, name) of a stub as last written
+        self._settings = {}
+        self._lock  = threading.Lock()
+        self._queue = queue.Queue()
+        with self._connect() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            self._migrate(con)
+            con.executescript(SCHEMA)
+        threading.Thread(target=self._write_loop, name="budget-store", daemon=True).start()
+        atexit.register(self.flush)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def _migrate(con):
+        """Global settings table (key, value) → per-client rows with cid ''."""
+        cols = [r[1] for r in con.execute("PRAGMA table_info(settings)")]
+        if cols and "cid" not in cols:
+            con.execute("ALTER TABLE settings RENAME TO settings_global")
+            con.executescript(SCHEMA)
+            con.execute("INSERT INTO settings SELECT '', key, value FROM settings_global")
+            con.execute("DROP TABLE settings_global")
+
+    # ── Reads ────────────────────────────────────────────────
+    def client_stubs(self):
+        """Every stored client as a stub, in tab order."""
+        self.flush()
+        with self._connect() as con:
+            rows = con.execute("SELECT cid, name, summary FROM clients ORDER BY pos").fetchall()
+        return [dict(client_id=cid, name=name, summary=json.loads(s) if s else {}, _stub=True)
+                for cid, name, s in rows]
+
+    def load(self, cid):
+        """A client's full budget: stored keys over default_budget, blocks as views.
+        KeyError if the store has no such client."""
+        self.flush()
+        with self._connect() as con:
+            row = con.execute("SELECT name FROM clients WHERE cid = ?", (cid,)).fetchone()
+            if row is None:
+                raise KeyError(f"No stored client '{cid}'")
+            name, = row
+            cfg     = con.execute("SELECT key, value FROM config WHERE cid = ?", (cid,)).fetchall()
+            masters = con.execute("SELECT bid, data FROM masters WHERE cid = ?", (cid,)).fetchall()
+            months  = con.execute("SELECT month, bid, delta FROM months WHERE cid = ? ORDER BY month, pos",
+                                  (cid,)).fetchall()
+            actuals = con.execute("SELECT month, data FROM actuals WHERE cid = ?", (cid,)).fetchall()
+        budget = default_budget(name)
+        budget.update({k: json.loads(v) for k, v in cfg})
+        budget.update(client_id=cid, block_schema=BLOCK_SCHEMA)
+        blocks = {bid: Block(json.loads(d)) for bid, d in masters}
+        for m, bid, delta in months:
+            budget["blocks"][m].append(BlockView(blocks[bid], json.loads(delta) if delta else None))
+        budget["actuals"].update({m: json.loads(d) for m, d in actuals})
+        with self._lock:
+            self._saved[cid] = self._rows(budget)
+        return budget
+
+    def settings(self, cid):
+        """A client's stored settings {key: value}, over the defaults (cid '')."""
+        self.flush()
+        with self._connect() as con:
+            rows = con.execute("SELECT key, value FROM settings WHERE cid IN ('', ?) ORDER BY cid = ?",
+                               (cid, cid)).fetchall()
+        return {k: json.loads(v) for k, v in rows}
+
+    # ── Writes (queued) ──────────────────────────────────────
+    def _rows(self, budget, pos=None, summary=None):
+        """What the store keeps for a budget, in comparable form."""
+        masters, months = {}, {}
+        for m in MONTHS:
+            for i, b in enumerate(budget["blocks"].get(m, [])):
+                if not isinstance(b, BlockView):
+                    b = BlockView(Block.load(b))
+                masters[b.master.id] = b.master
+                months[(m, i)] = (b.master.id, _dumps(b.delta) if b.delta else None)
+        return dict(client=(pos, budget.get("name", ""), _dumps(summary) if summary is not None else None),
+                    config={k: _dumps(v) for k, v in budget.items() if k not in _OWN_ROWS},
+                    masters={bid: b._v for bid, b in masters.items()}, master_obj=masters, months=months,
+                    actuals={m: _dumps(v) for m, v in (budget.get("actuals") or {}).items()})
+
+    def save(self, budget, pos, summary=None):
+        """Queue the rows of budget that changed since the last save / load. pos:
+        tab position; summary: JSON-able, kept with the stub (None keeps the stored one).
+        A stub only updates its position and name."""
+        cid = budget.setdefault("client_id", uuid.uuid4().hex[:12])
+        if is_stub(budget):
+            with self._lock:
+                if self._stubs.get(cid) == (pos, budget["name"]):
+                    return
+                self._stubs[cid] = (pos, budget["name"])
+            self._queue.put((cid, [("UPDATE clients SET pos = ?, name = ? WHERE cid = ?",
+                                    (pos, budget["name"], cid))]))
+            return
+        new = self._rows(budget, pos, summary)
+        with self._lock:
+            old = self._saved.get(cid)
+            if old is not None and summary is None:
+                new["client"] = new["client"][:2] + old["client"][2:]
+            ops = self._diff(cid, old, new)
+            self._saved[cid] = new
+        if ops:
+            self._queue.put((cid, ops))
+
+    @staticmethod
+    def _diff(cid, old, new):
+        ops = []
+        if old is None:                         # full rewrite: clear what is stored first
+            old = dict(client=None, config={}, masters={}, months={}, actuals={})
+            ops += [(f"DELETE FROM {t} WHERE cid = ?", (cid,)) for t in _CLIENT_TABLES]
+        if new["client"] != old["client"]:
+            pos, name, summary = new["client"]
+            ops.append(("INSERT INTO clients (cid, pos, name, summary) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (cid) DO UPDATE SET pos = excluded.pos, name = excluded.name, "
+                        "summary = COALESCE(excluded.summary, clients.summary)", (cid, pos, name, summary)))
+        for k, v in new["config"].items():
+            if old["config"].get(k) != v:
+                ops.append(("INSERT OR REPLACE INTO config VALUES (?, ?, ?)", (cid, k, v)))
+        ops += [("DELETE FROM config WHERE cid = ? AND key = ?", (cid, k)) for k in old["config"].keys() - new["config"].keys()]
+        for bid, v in new["masters"].items():
+            if old["masters"].get(bid) != v:
+                ops.append(("INSERT OR REPLACE INTO masters VALUES (?, ?, ?)",
+                            (cid, bid, _dumps(new["master_obj"][bid].to_dict()))))
+        ops += [("DELETE FROM masters WHERE cid = ? AND bid = ?", (cid, bid)) for bid in old["masters"].keys() - new["masters"].keys()]
+        for (m, i), (bid, delta) in new["months"].items():
+            if old["months"].get((m, i)) != (bid, delta):
+                ops.append(("INSERT OR REPLACE INTO months VALUES (?, ?, ?, ?, ?)", (cid, m, i, bid, delta)))
+        ops += [("DELETE FROM months WHERE cid = ? AND month = ? AND pos = ?", (cid, m, i))
+                for m, i in old["months"].keys() - new["months"].keys()]
+        for m, v in new["actuals"].items():
+            if old["actuals"].get(m) != v:
+                ops.append(("INSERT OR REPLACE INTO actuals VALUES (?, ?, ?)", (cid, m, v)))
+        return ops
+
+    def delete(self, cid):
+        """Queue removal of a client and all its rows."""
+        with self._lock:
+            self._saved.pop(cid, None)
+            self._stubs.pop(cid, None)
+        self._queue.put((cid, [(f"DELETE FROM {t} WHERE cid = ?", (cid,))
+                               for t in ("clients", "settings") + _CLIENT_TABLES]))
+
+    def save_settings(self, cid, values):
+        """Queue the client's settings {key: JSON-able} that changed."""
+        with self._lock:
+            new = {(cid, k): _dumps(v) for k, v in values.items()}
+            ops = [("INSERT OR REPLACE INTO settings VALUES (?, ?, ?)", (c, k, v))
+                   for (c, k), v in new.items() if self._settings.get((c, k)) != v]
+            self._settings.update(new)
+        if ops:
+            self._queue.put((None, ops))
+
+    def flush(self):
+        """Block until every queued write is on disk."""
+        self._queue.join()
+
+    def _write_loop(self):
+        con = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            while True:                         # everything queued so far: one transaction
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with con:
+                    for _, ops in batch:
+                        for sql, args in ops:
+                            con.execute(sql, args)
+                self.error = None
+            except sqlite3.Error as e:
+                self.error = f"{type(e).__name__}: {e}"
+                with self._lock:                # rewrite everything in the batch next time
+                    for cid, _ in batch:
+                        self._saved.pop(cid, None)
+                        self._stubs.pop(cid, None)
+                    self._settings.clear()
+            for _ in batch:
+                self._queue.task_done()
@@ -4,9 +4,17 @@ Monthly schedule per work type. Shares st.session_state with main budget app.
 """
 
 import math
+import numpy as np
 import streamlit as st
 import pandas as pd
 
+from ccbudget.engine import MONTHS, solve_agents, solve_agents_a, rostered_hc
+from ccbudget.engine import intervals as iv
+from ccbudget.engine import queuesim
+from ccbudget.importer import parse_interval_profile
+from ccbudget.erlang_table import ErlangTable
+from ccbudget.store import open_client
+
 # ── Page config ───────────────────────────────────────────────
 st.set_page_config(
     page_title="Staffing Calculator — CCBudget",
@@ -14,9 +22,6 @@ st.set_page_config(
     layout="wide",
 )
 
-MONTHS = ["Jan","Feb","Mar","Apr","May","Jun",
-          "Jul","Aug","Sep","Oct","Nov","Dec"]
-
 def get_clients():
     return st.session_state.get("clients", [])
 
@@ -35,10 +40,6 @@ html, body, [class*="css"] { font-family: 'Inter', sans-serif; }
 </style>
 """, unsafe_allow_html=True)
 
-def rostered_hc(productive_hc, shrinkage_pct):
-    shrink = max(0.0, min(0.99, shrinkage_pct / 100))
-    return productive_hc / (1 - shrink) if shrink < 1 else productive_hc
-
 def occ_status(occ_pct):
     if occ_pct > 90:   return "warn", f"Occupancy {occ_pct:.1f}% — agents overloaded."
     elif occ_pct > 85: return "warn", f"Occupancy {occ_pct:.1f}% — at the edge."
@@ -55,29 +56,6 @@ def results_row(cols_data):
     for col, (label, value, sub) in zip(cols, cols_data):
         col.markdown(metric_card(label, value, sub), unsafe_allow_html=True)
 
-def _erlang_solve(A, aht, sl_target, sl_seconds, max_agents=100):
-    if A <= 0: return 0, 0, 0
-    def erlang_c(N, A):
-        if N <= A: return 1.0
-        try:
-            log_AN = N * math.log(A) - sum(math.log(k) for k in range(1, N+1))
-            sum_t  = sum(math.exp(k * math.log(A) - sum(math.log(j) for j in range(1, k+1))) for k in range(N))
-            num = math.exp(log_AN); den = num + (1 - A/N) * sum_t
-            return num / den if den else 1.0
-        except: return 1.0
-    def service_level(N, A, aht, t):
-        if N <= A: return 0.0
-        return 1 - erlang_c(N, A) * math.exp(-(N-A) * (t/aht))
-    def asa(N, A, aht):
-        if N <= A: return float('inf')
-        return (erlang_c(N, A) * aht) / (N - A)
-    min_N = math.ceil(A) + 1; req_N = min_N
-    for n in range(min_N, max_agents + 1):
-        if service_level(n, A, aht, sl_seconds) >= sl_target:
-            req_N = n; break
-    occ = (A / req_N * 100) if req_N > 0 else 0
-    return req_N, asa(req_N, A, aht), occ
-
 def full_year_summary(schedule):
     active = [r for r in schedule if r["volume"] > 0]
     if not active:
@@ -121,6 +99,9 @@ def full_year_summary(schedule):
                    "Rostered HC": r["rostered_hc"] if r["volume"] else "—"}
             if "prod_hr" in r and r["volume"]: row["Prod/hr"] = r["prod_hr"]
             if "asa" in r and r["volume"]:     row["ASA (s)"] = f"{r['asa']:.0f}"
+            if "occ" in r and r["volume"]:     row["Occ %"]   = f"{r['occ']:.1f}"
+            if "sl" in r and r["volume"]:      row["SL %"]    = f"{r['sl']:.1f}"
+            if "abandon" in r and r["volume"]: row["Aband. %"] = f"{r['abandon']:.1f}"
             rows.append(row)
         st.dataframe(pd.DataFrame(rows).set_index("Month"), use_container_width=True)
 
@@ -135,7 +116,7 @@ def push_all_months_ui(schedule, key_prefix):
     pb1, pb2, pb3 = st.columns([2, 2, 1])
     client_idx = pb1.selectbox("Client", range(len(clients)),
         format_func=lambda i: clients[i]["name"], key=f"{key_prefix}_push_client")
-    cl = clients[client_idx]
+    cl = open_client(clients, client_idx)
     all_blocks_flat = []
     seen = set()
     for m in MONTHS:
@@ -173,6 +154,110 @@ def push_all_months_ui(schedule, key_prefix):
         else:
             st.warning("No matching blocks updated. Make sure blocks exist for these months.")
 
+@st.cache_data(show_spinner=False, max_entries=16)
+def interval_solution(calls, aht, sl_target, sl_seconds, patience=None, _table=None):
+    """Every queue x month x interval in one Erlang C / A solve (cached on the inputs)."""
+    return iv.interval_staffing(calls, aht, sl_target, sl_seconds, patience, _table)
+
+def erlang_table_note(table, erl_a):
+    """Caption: where Erlang C answers come from."""
+    if erl_a:
+        return
+    if table is not None:
+        st.caption(f"⚡ Erlang C from the precomputed table ({table.path}, loads up to {table.max_load:,.0f} Erlangs; exact beyond).")
+    else:
+        st.caption("Erlang C solved exactly. Build the lookup table once with `python -m ccbudget.erlang_table` for instant answers.")
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def schedule_simulation(rows, sl_seconds, hours, mix, routing, patience, reps, seed, aht_dist, aht_cv, burst, period):
+    """Discrete-event simulation of every active month (cached on the inputs)."""
+    return queuesim.simulate_schedule(rows, sl_seconds, hours, mix, routing, patience, reps, seed, period,
+                                      burst=burst, aht_dist=aht_dist, aht_cv=aht_cv)
+
+def simulation_ui(schedule, key_prefix, sl_seconds=None, sl_target=None, hours=None, mix=None, patience=None,
+                  period=queuesim.DAY, period_lbl="day", unit=("s", 1)):
+    """Expander: simulate the schedule and set simulated SL / ASA distributions
+    beside the planned figures. hours None asks for days simulated (24 h each);
+    sl_seconds None asks for a handling-time target. unit: (label, seconds) for waits."""
+    with st.expander("🎲 Validate by simulation", expanded=False):
+        st.caption(f"Discrete-event simulation of each month's staffing: handle-time spread, arrival bursts"
+                   f"{' and work-type routing' if mix else ''} that the formulas assume away. "
+                   f"SL / ASA percentiles are over every simulated {period_lbl} of every replication. "
+                   f"ASA here is the mean wait per offered call — abandoned callers count the time they waited — "
+                   f"the same measure as the Erlang figure.")
+        s1,s2,s3,s4,s5 = st.columns(5)
+        dist  = s1.selectbox("AHT distribution", ["Exponential", "Lognormal", "Fixed"], key=f"{key_prefix}_sim_dist",
+                             help="Erlang assumes exponential. Real handle times are closer to lognormal.")
+        cv    = s2.number_input("AHT CV", value=1.0, step=0.1, min_value=0.1, key=f"{key_prefix}_sim_cv",
+                                disabled=dist != "Lognormal", help="Std. deviation / mean of handle time.")
+        burst = s3.number_input("Arrival burstiness %", value=0, step=5, min_value=0, max_value=100,
+                                key=f"{key_prefix}_sim_burst",
+                                help="Random swing of each 15-min arrival rate around the forecast (CV). 0 = Poisson.")
+        reps  = s4.number_input("Replications", value=5, step=1, min_value=1, max_value=50, key=f"{key_prefix}_sim_reps")
+        seed  = s5.number_input("Seed", value=1, step=1, min_value=0, key=f"{key_prefix}_sim_seed",
+                                help="Same seed and inputs = same results.")
+        t1,t2,t3 = st.columns(3)
+        if hours is None:
+            days  = t1.number_input("Days per month", value=7, step=1, min_value=1, max_value=31, key=f"{key_prefix}_sim_days",
+                                    help="Simulated 24 h days at each month's rate and staffing.")
+            hours = days * 24
+        if sl_seconds is None:
+            within = t1.number_input("Handled within (h)", value=8, step=1, min_value=1, key=f"{key_prefix}_sim_within")
+            target = t2.number_input("Target %", value=90, step=1, min_value=1, max_value=100, key=f"{key_prefix}_sim_target")
+            sl_seconds, sl_target = within * 3600, (lambda r: target)
+        routing = "pooled"
+        if mix and len(mix) > 1:
+            routing = t3.radio("Routing", ["pooled", "dedicated"], key=f"{key_prefix}_sim_routing",
+                               format_func=lambda r: {"pooled": "Pooled — every agent on every type",
+                                                      "dedicated": "Dedicated by split, overflow when idle"}[r])
+        if not st.toggle("Run simulation", key=f"{key_prefix}_sim_on"):
+            return
+        rows = [{k: r[k] for k in ("month", "volume", "productive_hc", "aht") if k in r} for r in schedule]
+        with st.spinner("Simulating…"):
+            res = schedule_simulation(rows, sl_seconds, hours, mix, routing, patience, int(reps), int(seed),
+                                      dist.lower(), cv, burst / 100, period)
+        if not res:
+            st.info("No month with volume and agents to simulate.")
+            return
+        u_lbl, u_div = unit
+        out = []
+        for r in schedule:
+            if r["month"] not in res:
+                continue
+            sm = queuesim.summarize(queuesim.pooled(res[r["month"]]))
+            row = {"Month": r["month"], "Agents": int(math.ceil(r["productive_hc"] - 1e-9)),
+                   "Calls / run": f"{sm['calls']:,.0f}", "Target SL %": f"{sl_target(r):.0f}",
+                   "Sim SL %": f"{sm['sl_mean'] * 100:.1f}",
+                   f"SL P5 / P50 / P95 per {period_lbl}": " / ".join(f"{sm['sl'][q] * 100:.0f}" for q in queuesim.PERCENTILES),
+                   f"Sim ASA, offered ({u_lbl})": f"{sm['asa_mean'] / u_div:.1f}",
+                   f"ASA P95 per {period_lbl} ({u_lbl})": f"{sm['asa'][95] / u_div:.1f}"}
+            if "asa" in r:
+                row[f"Erlang ASA, offered ({u_lbl})"] = f"{r['asa'] / u_div:.1f}"
+            if patience:
+                row["Aband. %"] = f"{sm['abandon'] * 100:.1f}"
+            row["Occ %"] = f"{sm['occ'] * 100:.1f}"
+            out.append(row)
+        st.dataframe(pd.DataFrame(out).set_index("Month"), use_container_width=True)
+        n_calls = sum(v["n_calls"] for v in res.values())
+        st.caption(f"{n_calls:,} simulated {'calls' if unit[1] == 1 else 'items'} · {hours:g} h per month · "
+                   f"{int(reps)} replication(s) · seed {int(seed)}")
+        try:
+            import plotly.graph_objects as go
+            fig = go.Figure()
+            for m, rr in res.items():
+                p_sl = queuesim.pooled(rr)["period_sl"].ravel()
+                fig.add_trace(go.Box(y=p_sl[np.isfinite(p_sl)] * 100, name=m, marker_color="#3b82f6", boxpoints=False))
+            tgt = [sl_target(r) for r in schedule if r["month"] in res]
+            fig.add_trace(go.Scatter(x=list(res), y=tgt, mode="markers", name="Target",
+                                     marker=dict(color="#ef4444", symbol="line-ew-open", size=18, line=dict(width=2))))
+            fig.update_layout(title=dict(text=f"Simulated SL % per {period_lbl}", font=dict(color="#e8edf5", size=13)),
+                plot_bgcolor="#0e1420", paper_bgcolor="#0e1420", font=dict(color="#8b96b0"), showlegend=False,
+                margin=dict(l=10,r=10,t=40,b=10), height=300,
+                xaxis=dict(showgrid=False), yaxis=dict(showgrid=True, gridcolor="#1e2535", title="SL %"),
+                hoverlabel=dict(bgcolor="#1e2535", font=dict(color="#e8edf5")))
+            st.plotly_chart(fig, use_container_width=True)
+        except ImportError: pass
+
 # ═══════════════════════════════════════════════════════════════
 # HEADER & GLOBALS
 # ═══════════════════════════════════════════════════════════════
@@ -184,7 +269,7 @@ global_shrink = int(st.session_state.get("g_shrink", 0.15) * 100)
 
 st.divider()
 work_type = st.radio("Work type",
-    ["Claims / Back-office", "Inbound Voice (Erlang-C)", "Email / Async", "Blended"],
+    ["Claims / Back-office", "Inbound Voice (Erlang-C)", "Voice — 15-min Intervals", "Email / Async", "Blended"],
     horizontal=True, key="sc_work_type")
 st.divider()
 
@@ -257,9 +342,12 @@ if work_type == "Claims / Back-office":
 elif work_type == "Inbound Voice (Erlang-C)":
     st.markdown("### Inbound Voice (Erlang-C) — Monthly Schedule")
     st.info("Erlang-C works best at 15-30 min intervals. Monthly inputs are a planning approximation — treat as a floor.")
-    vc1,vc2 = st.columns(2)
+    vc1,vc2,vc3 = st.columns(3)
     v_shrink = vc1.slider("Default shrinkage %", 0, 40, global_shrink, 1, format="%d%%", key="voice_def_shrink")
-    v_max    = vc2.number_input("Max agents (solver ceiling)", value=100, step=10, min_value=10, key="voice_def_max")
+    v_model  = vc2.radio("Queue model", ["Erlang C", "Erlang A (abandonment)"], horizontal=True, key="voice_model",
+                         help="Erlang C assumes callers wait forever; Erlang A lets them hang up after a mean patience.")
+    v_pat    = vc3.number_input("Mean patience (s)", value=120, step=10, min_value=1, key="voice_patience",
+                                disabled=v_model == "Erlang C")
     st.divider()
     st.markdown("<div class='sched-hdr'>Monthly Forecast Schedule</div>", unsafe_allow_html=True)
     st.caption("Volume = peak calls per hour. Set defaults then override per month.")
@@ -279,7 +367,7 @@ elif work_type == "Inbound Voice (Erlang-C)":
     hcols = st.columns([1.2,1.4,1.4,1.2,1.2,1.2,1.2,1.2])
     for col, lbl in zip(hcols, ["Month","Calls/hr","AHT(s)","SL%","Shrink%","Prod.HC","Rostered","ASA"]):
         col.markdown(f"**{lbl}**")
-    v_schedule = []
+    v_rows = []
     for m in MONTHS:
         c_m,c_v,c_a,c_sl,c_sh,c_ph,c_rh,c_asa = st.columns([1.2,1.4,1.4,1.2,1.2,1.2,1.2,1.2])
         c_m.markdown(f"**{m}**")
@@ -287,19 +375,138 @@ elif work_type == "Inbound Voice (Erlang-C)":
         aht = c_a.number_input("",  value=int(def_aht_v), step=10, min_value=10, key=f"voice_{m}_aht", label_visibility="collapsed")
         sl  = c_sl.number_input("", value=int(def_sl_v),  step=1,  min_value=1, max_value=99, key=f"voice_{m}_sl", label_visibility="collapsed")
         shr = c_sh.number_input("", value=int(v_shrink),  step=1,  min_value=0, max_value=40, key=f"voice_{m}_shr", label_visibility="collapsed")
+        v_rows.append((m, vol, aht, sl, shr, c_ph, c_rh, c_asa))
+    # All twelve months in one solve
+    v_load = [vol / 3600 * aht for _, vol, aht, *_ in v_rows]
+    v_aht, v_sl = [r[2] for r in v_rows], [r[3] / 100 for r in v_rows]
+    v_erl_a = v_model != "Erlang C"
+    v_table = ErlangTable.shared()
+    if v_erl_a:
+        v_sol = solve_agents_a(v_load, v_aht, v_pat, v_sl, def_sls_v)
+    else:
+        v_sol = (v_table.solve_agents if v_table is not None else solve_agents)(v_load, v_aht, v_sl, def_sls_v)
+    v_schedule = []
+    for i, (m, vol, aht, sl, shr, c_ph, c_rh, c_asa) in enumerate(v_rows):
         if vol > 0:
-            A = (vol / 3600) * aht
-            req_n, asa_v, occ_v = _erlang_solve(A, aht, sl/100, def_sls_v, v_max)
+            req_n, asa_v, occ_v = int(v_sol["agents"][i]), float(v_sol["asa"][i]), float(v_sol["occ"][i])
+            ab_v = float(v_sol["abandon"][i]) * 100 if v_erl_a else 0.0
             ros = math.ceil(rostered_hc(req_n, shr))
-            c_ph.markdown(f"{req_n}"); c_rh.markdown(f"**{ros}**"); c_asa.markdown(f"{asa_v:.0f}s")
+            c_ph.markdown(f"{req_n}"); c_rh.markdown(f"**{ros}**")
+            c_asa.markdown(f"{asa_v:.0f}s" + (f" · {ab_v:.1f}% ab." if v_erl_a else ""))
         else:
-            req_n=ros=occ_v=asa_v=0
+            req_n=ros=occ_v=asa_v=ab_v=0
             c_ph.markdown("—"); c_rh.markdown("—"); c_asa.markdown("—")
-        v_schedule.append({"month":m,"volume":vol,"aht":aht,"sl_target":sl,"shrink_pct":shr,"productive_hc":req_n,"rostered_hc":ros,"asa":asa_v,"occ":occ_v})
+        row = {"month":m,"volume":vol,"aht":aht,"sl_target":sl,"shrink_pct":shr,"productive_hc":req_n,"rostered_hc":ros,"asa":asa_v,"occ":occ_v}
+        if v_erl_a:
+            row.update(sl=float(v_sol["sl"][i]) * 100 if vol else 0.0, abandon=ab_v)
+        v_schedule.append(row)
+    erlang_table_note(v_table, v_erl_a)
     st.divider()
     full_year_summary(v_schedule)
+    simulation_ui(v_schedule, "voice", def_sls_v, lambda r: r["sl_target"], patience=v_pat if v_erl_a else None)
     push_all_months_ui(v_schedule, "voice")
 
+# ═══════════════════════════════════════════════════════════════
+# 2b. VOICE — 15-MIN INTERVALS
+# ═══════════════════════════════════════════════════════════════
+elif work_type == "Voice — 15-min Intervals":
+    st.markdown("### Inbound Voice — 15-min Interval Schedule")
+    st.caption("Erlang C / A per 15-minute interval of a typical week (672 intervals) for every month and queue. "
+               f"Monthly HC = agent hours needed x {iv.WEEKS_PER_MONTH:.2f} weeks / {global_hours}h per FTE, grossed up for shrinkage.")
+    ic1,ic2,ic3 = st.columns(3)
+    i_sl  = ic1.number_input("SL %", value=80, step=1, min_value=1, max_value=99, key="iv_sl")
+    i_sls = ic2.number_input("Answer within (s)", value=20, step=5, min_value=1, key="iv_sls")
+    i_shr = ic3.slider("Shrinkage %", 0, 40, global_shrink, 1, format="%d%%", key="iv_shrink")
+    im1, im2 = st.columns(2)
+    i_model = im1.radio("Queue model", ["Erlang C", "Erlang A (abandonment)"], horizontal=True, key="iv_model")
+    i_pat   = im2.number_input("Mean patience (s)", value=120, step=10, min_value=1, key="iv_patience",
+                               disabled=i_model == "Erlang C")
+    i_src = st.radio("Arrival profile", ["Shape (day x hour)", "Upload CSV / Excel"], horizontal=True, key="iv_src")
+    st.divider()
+    if i_src == "Shape (day x hour)":
+        st.markdown("<div class='sched-hdr'>Queues</div>", unsafe_allow_html=True)
+        q_df = st.data_editor(pd.DataFrame({"Queue": ["Queue 1"], "Calls / week": [20000], "AHT (s)": [240]}),
+                              num_rows="dynamic", use_container_width=True, key="iv_queues")
+        q_df = q_df.dropna()
+        q_df = q_df[(q_df["Calls / week"] >= 0) & (q_df["AHT (s)"] > 0)]
+        st.markdown("<div class='sched-hdr'>Weekly shape</div>", unsafe_allow_html=True)
+        dcols = st.columns(len(iv.DAYS))
+        day_w = [c.number_input(d, value=1.0 if i < 5 else 0.5, step=0.1, min_value=0.0, key=f"iv_day_{d}")
+                 for i, (c, d) in enumerate(zip(dcols, iv.DAYS))]
+        sh1, sh2 = st.columns([2, 1])
+        hours = [f"{h:02d}:00" for h in range(24)]
+        base  = [0.0] * 8 + [0.6, 0.9, 1.0, 1.0, 0.9, 0.9, 1.0, 1.0, 0.9, 0.7, 0.4] + [0.0] * 5
+        h_df  = sh1.data_editor(pd.DataFrame({"Hour": hours, "Arrivals": base, "AHT x": [1.0] * 24}),
+                                disabled=["Hour"], hide_index=True, use_container_width=True, key="iv_hours")
+        s_df  = sh2.data_editor(pd.DataFrame({"Month": MONTHS, "Volume %": [100] * 12}),
+                                disabled=["Month"], hide_index=True, use_container_width=True, key="iv_season")
+        try:
+            prof = iv.weekly_profile(day_w, h_df["Arrivals"].fillna(0).to_numpy(dtype=float))
+        except ValueError as e:
+            st.error(f"Profile: {e}"); st.stop()
+        if q_df.empty:
+            st.info("Add at least one queue with calls and AHT."); st.stop()
+        season  = s_df["Volume %"].fillna(0).to_numpy(dtype=float) / 100
+        aht_k   = np.tile(np.repeat(h_df["AHT x"].fillna(1).to_numpy(dtype=float), iv.PER_DAY // 24), len(iv.DAYS))
+        q_names = [str(q) for q in q_df["Queue"]]
+        calls   = q_df["Calls / week"].to_numpy(dtype=float)[:, None, None] * season[None, :, None] * prof
+        aht     = q_df["AHT (s)"].to_numpy(dtype=float)[:, None, None] * np.broadcast_to(aht_k, calls.shape)
+    else:
+        st.caption("One row per 15-min interval of a typical week: **Day** (Mon ... Sun) + **Time** (HH:MM) "
+                   "or **Interval** (0 ... 671), **Calls** in that interval, optional **AHT** (s), **Queue** "
+                   "and **Month** (blank = every month).")
+        up1, up2 = st.columns([3, 1])
+        i_file = up1.file_uploader("Interval profile", type=["csv", "xlsx"], key="iv_file")
+        i_aht  = up2.number_input("AHT where not given (s)", value=240, step=10, min_value=10, key="iv_def_aht")
+        if i_file is None:
+            st.info("Upload an interval profile to size the queues."); st.stop()
+        try:
+            parsed = parse_interval_profile(i_file, i_file.name)
+        except ValueError as e:
+            st.error(f"Interval profile: {e}"); st.stop()
+        q_names = list(parsed)
+        calls   = np.stack([parsed[q]["calls"] for q in q_names])
+        aht     = np.stack([np.nan_to_num(parsed[q]["aht"], nan=i_aht) if parsed[q]["aht"] is not None
+                            else np.full(calls.shape[1:], float(i_aht)) for q in q_names])
+    i_erl_a = i_model != "Erlang C"
+    i_table = ErlangTable.shared()
+    try:
+        sol = interval_solution(calls, aht, i_sl / 100, i_sls, float(i_pat) if i_erl_a else None, _table=i_table)
+    except ValueError as e:
+        st.error(f"Staffing: {e}"); st.stop()
+    erlang_table_note(i_table, i_erl_a)
+    per_q  = iv.monthly_rollup(calls, sol, global_hours, i_shr)
+    pooled = iv.monthly_rollup(calls, sol, global_hours, i_shr, pool=True)
+    st.markdown("<div class='sched-hdr'>Monthly rollup</div>", unsafe_allow_html=True)
+    view = st.selectbox("Queue", ["All queues"] + q_names, key="iv_view")
+    if view == "All queues":
+        ru = pooled
+    else:
+        ru = {k: v[q_names.index(view)] for k, v in per_q.items()}
+    i_schedule = iv.schedule_rows(MONTHS, ru, i_shr)
+    st.dataframe(pd.DataFrame([{"Month": r["month"], "Calls": f"{r['volume']:,}",
+                                "Peak agents": r["peak_agents"], "Prod. HC": f"{r['productive_hc']:.1f}",
+                                "Rostered HC": r["rostered_hc"], "Occ %": f"{r['occ']:.1f}",
+                                "SL %": f"{r['sl']:.1f}", "ASA (s)": f"{r['asa']:.0f}",
+                                **({"Aband. %": f"{r['abandon']:.1f}"} if i_erl_a else {})}
+                               for r in i_schedule]).set_index("Month"), use_container_width=True)
+    try:
+        import plotly.graph_objects as go
+        i_m   = st.selectbox("Intraweek view — month", MONTHS, key="iv_month")
+        mi    = MONTHS.index(i_m)
+        need  = sol["agents"][:, mi].sum(axis=0) if view == "All queues" else sol["agents"][q_names.index(view), mi]
+        fig = go.Figure(go.Scatter(x=iv.interval_labels(), y=need, mode="lines", line=dict(color="#3b82f6", width=1.5),
+                                   hovertemplate="%{x}: %{y} agents<extra></extra>"))
+        fig.update_layout(plot_bgcolor="#0e1420", paper_bgcolor="#0e1420", font=dict(color="#8b96b0"),
+            margin=dict(l=10,r=10,t=30,b=10), height=260, title=f"Agents required — {i_m}",
+            xaxis=dict(showgrid=False, nticks=14), yaxis=dict(showgrid=True, gridcolor="#1e2535", title="Agents"),
+            hoverlabel=dict(bgcolor="#1e2535", font=dict(color="#e8edf5")))
+        st.plotly_chart(fig, use_container_width=True)
+    except ImportError: pass
+    st.divider()
+    full_year_summary(i_schedule)
+    push_all_months_ui(i_schedule, "voice_iv")
+
 # ═══════════════════════════════════════════════════════════════
 # 3. EMAIL
 # ═══════════════════════════════════════════════════════════════
@@ -408,8 +615,11 @@ elif work_type == "Blended":
         b_schedule.append({"month":m,"volume":vol,"shrink_pct":shr,"productive_hc":max_hc,"rostered_hc":ros})
     st.divider()
     full_year_summary(b_schedule)
+    if total_split > 0:
+        simulation_ui(b_schedule, "blended", hours=global_hours, period=8 * 3600, period_lbl="8-h day", unit=("min", 60),
+                      mix=[dict(share=wd["split"], aht=3600 / wd["prod_hr"]) for wd in wt_defs])
     push_all_months_ui(b_schedule, "blended")
 
 st.divider()
-st.caption(f"Models: Productivity (Claims, Email, Blended) = volume / adjusted capacity. Erlang-C (Voice) = queueing theory. Worked hours: {global_hours}h/month from budget settings.")
+st.caption(f"Models: Productivity (Claims, Email, Blended) = volume / adjusted capacity. Erlang C / A (Voice) = queueing theory, per month or per 15-min interval, checkable by discrete-event simulation. Worked hours: {global_hours}h/month from budget settings.")
 
@@ -6,6 +6,9 @@ Standalone what-if tool. Read-only — never writes to budget blocks.
 import math
 import streamlit as st
 
+from ccbudget.engine import target as tm, goalseek, make_settings, block_labels
+from ccbudget.store import open_client
+
 st.set_page_config(
     page_title="Target Margin — CCBudget",
     page_icon="🎯",
@@ -112,9 +115,8 @@ overhead_eur = ci8.number_input("Monthly overhead (EUR)", value=0, step=100, min
 
 # Derived per-agent cost
 shrink      = shrink_pct / 100
-eff_hrs     = hours * (1 - shrink)
-cost_per_agent_try = salary * ctc * (1 + bonus_pct) + meal
-cost_per_agent_eur = cost_per_agent_try / fx if fx else 0
+eff_hrs     = tm.effective_hours(hours, shrink)
+cost_per_agent_try, cost_per_agent_eur = tm.agent_cost(salary, ctc, bonus_pct, meal, fx)
 
 st.markdown(
     f"<div class='hint-box'>"
@@ -137,18 +139,19 @@ if mode.startswith("💶"):
     hc            = m1c1.number_input("Headcount (HC)", value=10, step=1, min_value=1, key="tm_hc")
     target_margin = m1c2.slider("Target margin %", 0, 60, 20, 1, format="%d%%", key="tm_target_margin")
 
-    total_cost_eur = hc * cost_per_agent_eur + overhead_eur
-    total_hrs      = hc * eff_hrs
     # Revenue needed = cost / (1 - margin%)
     target_margin_dec = target_margin / 100
+    sol = tm.min_unit_price(hc, cost_per_agent_eur, eff_hrs, overhead_eur, target_margin_dec)
     if target_margin_dec >= 1:
         st.error("Target margin must be below 100%.")
-    elif total_hrs == 0:
+    elif sol is None:
         st.error("Effective hours is 0 — check shrinkage and hours inputs.")
     else:
-        rev_needed   = total_cost_eur / (1 - target_margin_dec)
-        min_up       = rev_needed / total_hrs
-        breakeven_up = total_cost_eur / total_hrs  # at 0% margin
+        total_cost_eur = sol["total_cost"]
+        total_hrs      = sol["total_hrs"]
+        rev_needed     = sol["rev_needed"]
+        min_up         = sol["min_up"]
+        breakeven_up   = sol["breakeven_up"]  # at 0% margin
 
         r1, r2, r3, r4 = st.columns(4)
         r1.markdown(metric_card("Total Monthly Cost", f"€{total_cost_eur:,.0f}",
@@ -176,8 +179,7 @@ if mode.startswith("💶"):
         sens_cols = st.columns(6)
         for idx, delta in enumerate([-4, -2, 0, 2, 4, 6]):
             test_up  = max(0, min_up + delta)
-            test_rev = test_up * total_hrs
-            test_mgn = (test_rev - total_cost_eur) / test_rev * 100 if test_rev else 0
+            test_mgn = tm.margin_at(test_up, total_hrs, total_cost_eur)
             color    = "#10b981" if test_mgn >= target_margin else "#ef4444"
             label    = f"€{test_up:.2f}/hr"
             sens_cols[idx].markdown(
@@ -205,8 +207,9 @@ elif mode.startswith("👥"):
     # max_cost = HC × eff_hrs × UP × (1 - margin%) - overhead
     # HC × cost_per_agent_eur = HC × eff_hrs × UP × (1-m%) - overhead
     # HC × [cost_per_agent_eur - eff_hrs × UP × (1-m%)] = -overhead
-    rev_per_agent = eff_hrs * unit_price
-    margin_pool_per_agent = rev_per_agent * (1 - target_margin_dec)
+    sol = tm.max_hc(unit_price, cost_per_agent_eur, eff_hrs, overhead_eur, target_margin_dec)
+    rev_per_agent         = sol["rev_per_agent"]
+    margin_pool_per_agent = sol["margin_pool_per_agent"]
 
     if margin_pool_per_agent <= 0:
         st.error("Unit price is too low — revenue per agent can't cover costs at this margin target.")
@@ -231,17 +234,10 @@ elif mode.startswith("👥"):
             # total_rev = HC × eff_hrs × UP
             # HC × cost_per_agent + overhead ≤ HC × eff_hrs × UP × (1-m%)
             # HC × (eff_hrs × UP × (1-m%) - cost_per_agent) ≥ overhead
-            denominator = margin_pool_per_agent - cost_per_agent_eur
-            if denominator <= 0:
-                max_hc = 0
-            else:
-                max_hc = math.floor((- overhead_eur) / (cost_per_agent_eur - margin_pool_per_agent))
-
-            # Re-check with overhead
-            max_hc = max(0, max_hc)
-            actual_rev  = max_hc * eff_hrs * unit_price
-            actual_cost = max_hc * cost_per_agent_eur + overhead_eur
-            actual_mgn  = (actual_rev - actual_cost) / actual_rev * 100 if actual_rev else 0
+            max_hc      = sol["max_hc"]
+            actual_rev  = sol["rev"]
+            actual_cost = sol["cost"]
+            actual_mgn  = sol["margin_pct"]
 
             r1, r2, r3, r4 = st.columns(4)
             r1.markdown(metric_card("Max HC", str(max_hc), f"at {target_margin}% margin"), unsafe_allow_html=True)
@@ -300,12 +296,13 @@ elif mode.startswith("📊"):
     unit_price  = m3c2.number_input("Unit Price (EUR/hr)", value=15.0, step=0.5, min_value=0.0, key="tm_up3")
     target_mgn  = m3c3.slider("Target margin %", 0, 60, 20, 1, format="%d%%", key="tm_tgt3")
 
-    total_cost  = hc * cost_per_agent_eur + overhead_eur
-    total_hrs   = hc * eff_hrs
-    total_rev   = total_hrs * unit_price
-    margin_eur  = total_rev - total_cost
-    margin_pct  = margin_eur / total_rev * 100 if total_rev else 0
-    breakeven   = total_cost / total_hrs if total_hrs else 0
+    chk         = tm.margin_check(hc, unit_price, cost_per_agent_eur, eff_hrs, overhead_eur, target_mgn / 100)
+    total_cost  = chk["total_cost"]
+    total_hrs   = chk["total_hrs"]
+    total_rev   = chk["total_rev"]
+    margin_eur  = chk["margin_eur"]
+    margin_pct  = chk["margin_pct"]
+    breakeven   = chk["breakeven"]
     gap_pct     = margin_pct - target_mgn
     gap_up      = unit_price - breakeven * (1 / (1 - target_mgn/100)) if target_mgn < 100 else 0
 
@@ -322,7 +319,7 @@ elif mode.startswith("📊"):
     st.markdown("<br>", unsafe_allow_html=True)
 
     if margin_pct >= target_mgn:
-        needed_up = total_cost / (total_hrs * (1 - target_mgn/100)) if total_hrs and target_mgn < 100 else 0
+        needed_up = chk["needed_up"]
         st.markdown(
             result_box(
                 f"You're above target — {margin_pct:.1f}% vs {target_mgn}% target",
@@ -333,7 +330,7 @@ elif mode.startswith("📊"):
             ), unsafe_allow_html=True
         )
     elif margin_eur >= 0:
-        needed_up = total_cost / (total_hrs * (1 - target_mgn/100)) if total_hrs and target_mgn < 100 else 0
+        needed_up = chk["needed_up"]
         st.markdown(
             result_box(
                 f"Profitable but below target — {margin_pct:.1f}% vs {target_mgn}% target",
@@ -369,6 +366,81 @@ elif mode.startswith("📊"):
     bridge_cols[2].markdown(metric_card("-₺500 salary",      f"{impact_sal500:+.1f}pp","margin impact", "#10b981"), unsafe_allow_html=True)
     bridge_cols[3].markdown(metric_card("-2pp shrinkage",    f"{impact_shr2:+.1f}pp", "margin impact", "#10b981"), unsafe_allow_html=True)
 
+# ═══════════════════════════════════════════════════════════════
+# Goal-seek on the real budget — full engine, all blocks
+# ═══════════════════════════════════════════════════════════════
+st.divider()
+st.markdown("## 🧮 Goal-Seek on Your Budget")
+st.caption("Solves against the actual client budget — every block, COLA, overhead ceilings, "
+           "backfill, OPEX and CAPEX — using the sidebar settings from the main page.")
+
+gs_clients = st.session_state.get("clients")
+if not gs_clients or "g_settings" not in st.session_state:
+    st.info("Open the main budget page first — goal-seek reads its clients and sidebar settings.", icon="ℹ️")
+else:
+    gs_settings = make_settings(st.session_state["g_settings"],
+                                st.session_state.get("attrition_rate"),
+                                st.session_state.get("backfill_efficiency"))
+    gc1, gc2, gc3 = st.columns(3)
+    gs_idx    = gc1.selectbox("Client", range(len(gs_clients)), key="gs_client",
+                              index=min(st.session_state.get("active_client", 0), len(gs_clients) - 1),
+                              format_func=lambda i: gs_clients[i].get("name", f"Client {i+1}"))
+    gs_budget = open_client(gs_clients, gs_idx)
+    gs_target = gc2.slider("Target FY margin %", -20, 60, 20, 1, format="%d%%", key="gs_target") / 100
+    gs_mode   = gc3.radio("Solve for", ["Uniform UP uplift", "One block's UP", "Max block HC at a rate"],
+                          key="gs_mode")
+
+    gs_blocks = block_labels(gs_budget)               # block id → label
+    if not gs_blocks:
+        st.info("This client has no blocks yet.", icon="ℹ️")
+    elif gs_mode == "Uniform UP uplift":
+        sol = goalseek.up_uplift(gs_budget, gs_settings, gs_target)
+        if sol is None:
+            st.markdown(result_box("Not reachable", "—", "No uplift up to 5× the current prices hits this margin.", "red"),
+                        unsafe_allow_html=True)
+        else:
+            r1, r2, r3 = st.columns(3)
+            r1.markdown(result_box("Uniform UP change", f"{(sol['up_mult'] - 1) * 100:+.2f}%",
+                                   f"Every block's unit price × {sol['up_mult']:.4f}", "green"), unsafe_allow_html=True)
+            r2.markdown(metric_card("FY margin now", f"{sol['base_margin_pct'] * 100:.1f}%", "at plan prices"),
+                        unsafe_allow_html=True)
+            r3.markdown(metric_card("FY margin after", f"{sol['margin_pct'] * 100:.1f}%",
+                                    f"€{sol['margin']:,.0f} on €{sol['rev']:,.0f} revenue", "#10b981"),
+                        unsafe_allow_html=True)
+    else:
+        gs_b = st.selectbox("Block", list(gs_blocks), format_func=gs_blocks.get, key="gs_block")
+        if gs_mode == "One block's UP":
+            sol = goalseek.block_up(gs_budget, gs_settings, gs_b, gs_target)
+            if sol is None:
+                st.markdown(result_box("Not reachable", "—",
+                                       "Even 5× this block's price does not reach the target.", "red"),
+                            unsafe_allow_html=True)
+            else:
+                r1, r2 = st.columns(2)
+                r1.markdown(result_box(f"{gs_blocks[gs_b]} — UP change", f"{(sol['up_mult'] - 1) * 100:+.2f}%",
+                                       "Other blocks at plan prices", "green"), unsafe_allow_html=True)
+                r2.markdown(metric_card("FY margin after", f"{sol['margin_pct'] * 100:.1f}%",
+                                        f"€{sol['margin']:,.0f}", "#10b981"), unsafe_allow_html=True)
+                st.dataframe({"Month": list(sol["up"]), "Required UP (EUR/hr)": [f"€{v:.2f}" for v in sol["up"].values()]},
+                             hide_index=True, use_container_width=True)
+        else:
+            gs_rate = st.number_input("Unit price for this block (EUR/hr, 0 = keep plan)",
+                                      value=0.0, step=0.5, min_value=0.0, key="gs_rate")
+            sol = goalseek.max_block_hc(gs_budget, gs_settings, gs_b, gs_target, gs_rate or None)
+            if sol is None:
+                st.markdown(result_box("Not reachable", "—",
+                                       "The rest of the budget misses the target even without this block.", "red"),
+                            unsafe_allow_html=True)
+            else:
+                r1, r2 = st.columns(2)
+                r1.markdown(result_box(f"Max HC — {gs_blocks[gs_b]}",
+                                       f"{'≥ ' if sol['capped'] else ''}{sol['hc']:,} agents",
+                                       "Flat HC in every month the block runs"
+                                       + (" — search limit reached" if sol["capped"] else ""), "green"),
+                            unsafe_allow_html=True)
+                r2.markdown(metric_card("FY margin at that HC", f"{sol['margin_pct'] * 100:.1f}%",
+                                        f"€{sol['margin']:,.0f}", "#10b981"), unsafe_allow_html=True)
+
 st.divider()
 st.caption(
     "📐 All calculations use: Revenue = HC × (hours × (1−shrinkage)) × unit price. "
@@ -11,6 +11,11 @@ import copy
 import urllib.request
 import json
 import math
+import uuid
+
+from ccbudget import engine
+from ccbudget.importer import parse_workbook, apply_import, parse_fx_curves
+from ccbudget.store import BudgetStore, open_client, is_stub
 
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
@@ -37,49 +42,35 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-MONTHS = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
+MONTHS = engine.MONTHS
 
 # ── Multi-client state ───────────────────────────────────────
 def _default_client(name="Client A"):
-    return dict(
-        name=name,
-        blocks={m: [] for m in MONTHS},
-        cola_configs={},
-        overhead_global={
-            "TM": {"ratio": 10, "hc_override": None, "salary": 55000},
-            "QM": {"ratio": 20, "hc_override": None, "salary": 60000},
-            "OM": {"ratio": 50, "hc_override": None, "salary": 80000},
-        },
-        overhead_monthly={m: None for m in MONTHS},
-        opex={
-            "training_cost_per_hire": 5000,   # TRY — one-time per backfill hire
-            "recruitment_fee":        8000,   # TRY — one-time per any new hire (ramp-up + backfill)
-            "it_cost_per_seat":       1500,   # TRY — monthly per active HC
-            "facilities_per_seat":    2000,   # TRY — monthly per active HC
-            "capex_pc":              15000,   # TRY — one-time per new seat (HC increase only)
-            "capex_headset":          3000,   # TRY — one-time per new seat
-            "capex_software":         5000,   # TRY — one-time per new seat
-        },
-        # Actuals: {month: {rev, cost, hc, hrs_billable, margin}}
-        actuals={m: {} for m in MONTHS},
-    )
+    return engine.default_budget(name)
 
+def budget_store():
+    """Process-wide SQLite store (CCBUDGET_DB) — saved clients survive a restart."""
+    return BudgetStore.shared()
+
+# Saved clients come back as stubs (name + summary); each loads on first use
 if "clients" not in st.session_state:
-    st.session_state.clients = [_default_client("Client A")]
+    st.session_state.clients = budget_store().client_stubs() or [_default_client("Client A")]
 for _cl in st.session_state.clients:
+    if is_stub(_cl):
+        continue
     if "actuals" not in _cl:
         _cl["actuals"] = {m: {} for m in MONTHS}
-    _opex_defaults = {"training_cost_per_hire":5000,"recruitment_fee":8000,
-                      "it_cost_per_seat":1500,"facilities_per_seat":2000,
-                      "capex_pc":15000,"capex_headset":3000,"capex_software":5000}
-    for _k, _v in _opex_defaults.items():
+    _cl.setdefault("salary_raises", {})
+    _cl.setdefault("hc_waves", {})
+    _cl.setdefault("contract", dict(engine.DEFAULT_CONTRACT))
+    _cl.setdefault("global_changes", {"hours": [], "fx": [], "shrink": []})
+    _cl.setdefault("scenarios", engine.default_budget()["scenarios"])
+    for _k, _v in engine.DEFAULT_OPEX.items():
         _cl.setdefault("opex", {}).setdefault(_k, _v)
-    # Normalise shrink_override: old sessions stored 15.0 instead of 0.15
-    for _m in MONTHS:
-        for _b in _cl.get("blocks", {}).get(_m, []):
-            _sv = _b.get("shrink_override")
-            if _sv is not None and _sv > 1:
-                _b["shrink_override"] = _sv / 100
+    # Typed block records with stable ids; old sessions' dicts (and 15.0-for-0.15
+    # shrinkage) and COLA / raise / wave tables keyed by block position upgraded
+    if _cl.get("block_schema") != engine.BLOCK_SCHEMA:
+        engine.load_blocks(_cl)
 if "active_client" not in st.session_state:
     st.session_state.active_client = 0
 if "active_month" not in st.session_state:
@@ -89,15 +80,25 @@ if "attrition_rate" not in st.session_state:
 if "backfill_efficiency" not in st.session_state:
     st.session_state.backfill_efficiency = 0.50
 
+def saved_settings(cl):
+    """A client's stored sidebar settings, read once per session."""
+    cache = st.session_state.setdefault("_saved_settings", {})
+    cid   = cl.get("client_id")
+    if cid not in cache:
+        cache[cid] = budget_store().settings(cid or "")
+    return cache[cid]
+
 def client():
-    """Return current active client dict."""
-    idx = st.session_state.active_client
-    return st.session_state.clients[idx]
+    """Return current active client dict (loaded from the store on first use)."""
+    return open_client(st.session_state.clients, st.session_state.active_client, budget_store())
+
+def client_key(name):
+    """Session-state / widget key for the active client, by its stable id — a tab
+    position would hand one client's state to another after a delete or reorder."""
+    return f"{name}_{client().setdefault('client_id', uuid.uuid4().hex[:12])}"
 
 def get_oh_cfg(month, cl=None):
-    cl = cl or client()
-    mo = cl["overhead_monthly"].get(month)
-    return mo if mo is not None else cl["overhead_global"]
+    return engine.get_oh_cfg(month, cl or client())
 
 @st.cache_data(ttl=300)
 def fetch_live_fx():
@@ -115,298 +116,148 @@ def fmt_eur(v): return f"€{v:,.0f}"
 def fmt_try(v): return f"₺{v:,.0f}"
 def fmt_pct(v): return f"{v*100:.1f}%"
 
-import calendar as _cal
 import datetime as _dt
 
-def effective_hc(month, block):
-    """Return effective HC for a block in a given month.
-    Uses ramp schedule if defined, otherwise falls back to block base HC."""
-    ramp = block.get("hc_ramp", {})
-    return ramp.get(month, block.get("hc", 0))
-
-def effective_up(month, block_idx, base_up):
-    """Return effective unit price for a month, prorated if COLA date falls in it.
-    COLA date is treated as a position within the fiscal year (Jan=1 … Dec=12).
-    Year is taken from the date only to get days-in-month; comparisons use month number.
-    """
-    key = str(block_idx)
-    cfg = client().get("cola_configs", {}).get(key)
-    if not cfg or not cfg.get("date") or not cfg.get("new_up"):
-        return base_up
-    try:
-        cola_date  = _dt.date.fromisoformat(cfg["date"])
-        new_up     = float(cfg["new_up"])
-        cola_mo    = cola_date.month          # 1–12
-        budget_mo  = MONTHS.index(month) + 1  # 1–12
-
-        if budget_mo < cola_mo:
-            return base_up        # COLA hasn't happened yet this month
-        elif budget_mo > cola_mo:
-            return new_up         # COLA fully applied
-        else:
-            # Transition month — prorate by day
-            days_in_mo = _cal.monthrange(cola_date.year, cola_mo)[1]
-            days_old   = cola_date.day - 1          # days 1 … (day-1) at old UP
-            days_new   = days_in_mo - days_old      # days day … end at new UP
-            return (days_old * base_up + days_new * new_up) / days_in_mo
-    except Exception:
-        return base_up
+# ── Engine bindings ──────────────────────────────────────────
+# The maths lives in ccbudget.engine as pure functions over explicit budget /
+# settings dicts. These wrappers bind the active client and session settings.
+effective_hc = engine.effective_hc
+OH_ROLES     = engine.OH_ROLES
+_date_pos    = engine.date_pos
+
+def current_settings(g):
+    """Engine settings: the sidebar globals + session attrition / backfill."""
+    return engine.make_settings(g, st.session_state.attrition_rate,
+                                st.session_state.backfill_efficiency)
+
+def effective_up(month, block_id, base_up, cl=None):
+    return engine.effective_up(month, block_id, base_up, cl or client())
+
+def effective_salary(month, block_id, base_sal, cl=None):
+    return engine.effective_salary(month, block_id, base_sal, cl or client())
+
+def month_globals(g, cl=None):
+    return engine.month_globals(g, cl or client())
+
+@st.cache_resource
+def totals_cache():
+    """Process-wide result cache, shared by every session (keys are content hashes)."""
+    return engine.TotalsCache(maxsize=128)
+
+@st.cache_resource
+def montecarlo_cache():
+    """Process-wide Monte Carlo results — a few entries only: each holds every draw."""
+    return engine.TotalsCache(maxsize=8)
+
+def month_tracker():
+    """Per-session tracker (month results are per client, per user)."""
+    if "_month_tracker" not in st.session_state:
+        st.session_state["_month_tracker"] = engine.MonthTracker()
+    return st.session_state["_month_tracker"]
+
+def get_totals_year(g, cl=None):
+    """Full-year P&L for a client: {month: totals}. Served from the result cache when
+    the budget hasn't changed, else only the dirty months are recomputed.
+    Callers must treat the returned dicts as read-only — they are shared."""
+    return engine.year_totals(cl or client(), current_settings(g),
+                              cache=totals_cache(), tracker=month_tracker())
 
 def get_totals(month, g):
-    total_rev_eur = total_cost_eur = total_cost_try = total_rev_try = total_hc = total_hrs = 0.0
-    weighted_sal = weighted_fx = weighted_hrs = 0.0
-    cl = client()
-    for blk_i, b in enumerate(cl["blocks"].get(month, [])):
-        _shr_val   = b["shrink_override"] if b.get("shrink_override") is not None else g["shrink"]
-        raw_shrink = _shr_val / 100 if _shr_val > 1 else _shr_val   # always normalise to decimal
-        shrink = max(0.0, min(0.99, raw_shrink))
-        fx     = b["fx_override"]     if b.get("fx_override")     is not None else g["fx"]
-        hours  = b["hours_override"]  if b.get("hours_override")  is not None else g["hours"]
-        hc      = effective_hc(month, b)              # ramp-adjusted HC
-        sal     = b.get("salary", 0)
-        base_up = b.get("unit_price", 0)   # always stored in EUR
-        up      = effective_up(month, blk_i, base_up)  # COLA-adjusted UP (EUR)
-        # If block billed in USD, revenue path: USD × usd_try = TRY, then ÷ eur_try = EUR
-        up_currency = b.get("up_currency", "EUR")
-        eff          = hours * (1 - shrink)
-        if up_currency == "USD":
-            up_raw   = b.get("unit_price_raw", up)   # raw USD value
-            up_eur_via_usd = up_raw * (g.get("usd_try", g["fx"]) / g["fx"]) if g["fx"] else up_raw
-            rev_eur  = hc * eff * up_eur_via_usd
-            rev_try  = hc * eff * up_raw * g.get("usd_try", g["fx"])
-        else:
-            rev_eur  = hc * eff * up
-            rev_try  = rev_eur * fx
-        cost_try     = hc * sal * g["ctc"] * (1 + g["bonus_pct"]) + hc * g["meal"]
-        cost_eur     = cost_try / fx if fx else 0
-        total_rev_eur  += rev_eur;  total_rev_try  += rev_try
-        total_cost_eur += cost_eur; total_cost_try += cost_try
-        total_hc += hc; total_hrs += hc * eff
-        weighted_sal += hc * sal
-        weighted_fx  += hc * fx
-        weighted_hrs += hc * eff
-
-    # Per-block weighted attrition (each block can have own rate, weighted by HC)
-    bf_eff = st.session_state.backfill_efficiency
-    weighted_att = 0.0
-    for b in cl["blocks"].get(month, []):
-        hc_b = effective_hc(month, b)
-        raw  = b.get("attrition_override")
-        rate = raw if raw is not None else st.session_state.attrition_rate
-        rate = max(0.0, min(1.0, rate if rate <= 1 else rate / 100))
-        weighted_att += hc_b * rate
-    att_rate     = (weighted_att / total_hc) if total_hc else st.session_state.attrition_rate
-    attrition_hc = weighted_att               # sum of each block's attrition
-    backfill_hc  = attrition_hc
-    net_hc       = total_hc - attrition_hc
-
-    # Weighted averages for backfill costing
-    avg_sal = (weighted_sal / total_hc) if total_hc else 0
-    avg_fx  = (weighted_fx  / total_hc) if total_hc else g["fx"]
-    avg_eff = (weighted_hrs / total_hc) if total_hc else g["hours"] * (1 - g["shrink"])
-
-    # Backfill cost: full salary (they're employed), partial hours due to training efficiency
-    backfill_cost_try  = backfill_hc * avg_sal * g["ctc"] * (1 + g["bonus_pct"]) + backfill_hc * g["meal"]
-    backfill_cost_eur  = backfill_cost_try / avg_fx if avg_fx else 0
-    # Hours: backfill agents work but at reduced efficiency — counted in produced, not billed
-    backfill_hrs       = backfill_hc * avg_eff * bf_eff
-
-    total_cost_try_incl = total_cost_try + backfill_cost_try
-    total_cost_eur_incl = total_cost_eur + backfill_cost_eur
-    total_hrs_incl      = total_hrs + backfill_hrs
-
-    # OPEX: Training cost (one-time per backfill hire, in TRY)
-    opex_cfg = cl.get("opex", {})
-    training_cost_try  = backfill_hc * opex_cfg.get("training_cost_per_hire", 0)
-    training_cost_eur  = training_cost_try / avg_fx if avg_fx else 0
-
-    # OPEX: Recruitment fee (per new hire = backfill + any HC ramp-up vs prior month)
-    prior_month = MONTHS[MONTHS.index(month) - 1] if MONTHS.index(month) > 0 else None
-    prior_hc    = sum(effective_hc(prior_month, b) for b in cl["blocks"].get(prior_month, [])) if prior_month else total_hc
-    hc_increase = max(0.0, total_hc - prior_hc)   # new seats this month (ramp-up delta)
-    new_hires   = backfill_hc + hc_increase        # total new people this month
-    recruitment_cost_try = new_hires * opex_cfg.get("recruitment_fee", 0)
-    recruitment_cost_eur = recruitment_cost_try / avg_fx if avg_fx else 0
-
-    # OPEX: IT & telephony (monthly × active HC)
-    it_cost_try  = total_hc * opex_cfg.get("it_cost_per_seat", 0)
-    it_cost_eur  = it_cost_try / avg_fx if avg_fx else 0
-
-    # OPEX: Facilities / rent (monthly × active HC)
-    fac_cost_try = total_hc * opex_cfg.get("facilities_per_seat", 0)
-    fac_cost_eur = fac_cost_try / avg_fx if avg_fx else 0
-
-    # CAPEX: one-time on HC increase only (new seats, not backfill)
-    capex_try = hc_increase * (
-        opex_cfg.get("capex_pc", 0) +
-        opex_cfg.get("capex_headset", 0) +
-        opex_cfg.get("capex_software", 0)
-    )
-    capex_eur = capex_try / avg_fx if avg_fx else 0
-
-    total_opex_try = training_cost_try + recruitment_cost_try + it_cost_try + fac_cost_try
-    total_opex_eur = training_cost_eur + recruitment_cost_eur + it_cost_eur + fac_cost_eur
-    total_capex_try = capex_try
-    total_capex_eur = capex_eur
-
-    # Overhead roles (TM/QM/OM) — pure cost, no hours, no revenue
-    oh = calc_overhead(month, total_hc, g, cl)
-    oh_cost_eur = oh["total_cost_eur"]
-    oh_cost_try = oh["total_cost_try"]
-
-    grand_cost_eur = total_cost_eur_incl + oh_cost_eur + total_opex_eur + total_capex_eur
-    grand_cost_try = total_cost_try_incl + oh_cost_try + total_opex_try + total_capex_try
-
-    # Break-even: must cover all costs (prod + backfill + overhead + opex) per billable hr
-    breakeven_up = (grand_cost_eur / total_hrs) if total_hrs > 0 else 0
-
-    return dict(
-        rev=total_rev_eur,              rev_try=total_rev_try,
-        cost=grand_cost_eur,            cost_try=grand_cost_try,
-        cost_excl_backfill=total_cost_eur,
-        backfill_cost_eur=backfill_cost_eur,
-        backfill_cost_try=backfill_cost_try,
-        training_cost_eur=training_cost_eur,
-        training_cost_try=training_cost_try,
-        recruitment_cost_eur=recruitment_cost_eur,
-        recruitment_cost_try=recruitment_cost_try,
-        it_cost_eur=it_cost_eur,        it_cost_try=it_cost_try,
-        fac_cost_eur=fac_cost_eur,      fac_cost_try=fac_cost_try,
-        capex_eur=capex_eur,            capex_try=capex_try,
-        hc_increase=hc_increase,        new_hires=new_hires,
-        total_opex_eur=total_opex_eur,  total_opex_try=total_opex_try,
-        total_capex_eur=total_capex_eur,total_capex_try=total_capex_try,
-        oh_cost_eur=oh_cost_eur,        oh_cost_try=oh_cost_try,
-        oh=oh,
-        margin=total_rev_eur - grand_cost_eur,
-        margin_try=total_rev_try - grand_cost_try,
-        hc=total_hc,
-        hrs=total_hrs_incl,
-        hrs_billable=total_hrs,
-        backfill_hrs=backfill_hrs,
-        attrition_hc=attrition_hc,
-        backfill_hc=backfill_hc,
-        net_hc=net_hc,
-        breakeven_up=breakeven_up,
-    )
+    return get_totals_year(g)[month]
+
+def get_totals_scenario_year(g, scen_overrides, cl=None):
+    """Full-year P&L with a scenario overlay: {month: totals}. Same engine and
+    lines as get_totals_year; per-block shrink/attrition overrides still win over a
+    scenario's global shrink/attrition, and USD-billed blocks keep their USD path."""
+    return engine.year_totals(cl or client(), current_settings(g), scen_overrides,
+                              cache=totals_cache(), tracker=month_tracker())
 
 def get_totals_scenario(month, g, scen_overrides):
-    """Like get_totals but applies scenario-level multipliers/overrides.
-    scen_overrides keys (all optional):
-        up_pct      : float — unit price multiplier e.g. 1.10 = +10%
-        sal_pct     : float — salary multiplier e.g. 0.95 = -5%
-        ctc_override: float — override CTC ratio
-        fx_override : float — override FX rate for all blocks
-        attrition   : float — override attrition rate (0-1)
-        shrink      : float — override shrinkage (0-1)
-    """
-    so = scen_overrides
-    # Build modified g
-    sg = dict(g)
-    if "fx_override"  in so: sg["fx"]         = so["fx_override"]
-    if "ctc_override" in so: sg["ctc"]        = so["ctc_override"]
-    if "shrink"       in so: sg["shrink"]     = so["shrink"]
-    if "attrition"    in so: sg["attrition"]  = so["attrition"]
-
-    up_mult  = so.get("up_pct",  1.0)
-    sal_mult = so.get("sal_pct", 1.0)
-
-    total_rev_eur = total_cost_eur = total_cost_try = total_rev_try = total_hc = total_hrs = 0.0
-    weighted_sal = weighted_fx = weighted_hrs = 0.0
-    cl = client()
-
-    for blk_i, b in enumerate(cl["blocks"].get(month, [])):
-        _shr_val   = b["shrink_override"] if b.get("shrink_override") is not None else sg["shrink"]
-        raw_shrink = _shr_val / 100 if _shr_val > 1 else _shr_val
-        shrink = max(0.0, min(0.99, raw_shrink))
-        fx     = so.get("fx_override", b["fx_override"] if b.get("fx_override") is not None else sg["fx"])
-        hours  = b["hours_override"] if b.get("hours_override") is not None else sg["hours"]
-        hc     = effective_hc(month, b)
-        sal    = b.get("salary", 0) * sal_mult
-        base_up = b.get("unit_price", 0) * up_mult
-        up      = effective_up(month, blk_i, b.get("unit_price", 0)) * up_mult
-        eff          = hours * (1 - shrink)
-        rev_eur      = hc * eff * up
-        rev_try      = rev_eur * fx
-        cost_try     = hc * sal * sg["ctc"] * (1 + sg["bonus_pct"]) + hc * sg["meal"]
-        cost_eur     = cost_try / fx if fx else 0
-        total_rev_eur  += rev_eur;  total_rev_try  += rev_try
-        total_cost_eur += cost_eur; total_cost_try += cost_try
-        total_hc += hc; total_hrs += hc * eff
-        weighted_sal += hc * sal; weighted_fx += hc * fx; weighted_hrs += hc * eff
-
-    # Attrition & backfill
-    attrition_rate = so.get("attrition", sg.get("attrition", st.session_state.get("attrition_rate", 0.05)))
-    attrition_hc   = total_hc * attrition_rate
-    bf_eff         = st.session_state.get("backfill_efficiency", 0.5)
-    backfill_hc    = attrition_hc
-    avg_sal = (weighted_sal / total_hc) if total_hc else 0
-    avg_fx  = (weighted_fx  / total_hc) if total_hc else sg["fx"]
-    avg_eff = (weighted_hrs / total_hc) if total_hc else sg["hours"] * (1 - sg["shrink"])
-    backfill_cost_try = backfill_hc * avg_sal * sg["ctc"] * (1 + sg["bonus_pct"]) + backfill_hc * sg["meal"]
-    backfill_cost_eur = backfill_cost_try / avg_fx if avg_fx else 0
-
-    # OPEX
-    opex_cfg = cl.get("opex", {})
-    training_cost_try  = backfill_hc * opex_cfg.get("training_cost_per_hire", 0)
-    training_cost_eur  = training_cost_try / avg_fx if avg_fx else 0
-    prior_month = MONTHS[MONTHS.index(month) - 1] if MONTHS.index(month) > 0 else None
-    prior_hc    = sum(effective_hc(prior_month, b) for b in cl["blocks"].get(prior_month, [])) if prior_month else total_hc
-    hc_increase = max(0.0, total_hc - prior_hc)
-    new_hires   = backfill_hc + hc_increase
-    recruitment_cost_try = new_hires * opex_cfg.get("recruitment_fee", 0)
-    recruitment_cost_eur = recruitment_cost_try / avg_fx if avg_fx else 0
-    it_cost_try  = total_hc * opex_cfg.get("it_cost_per_seat", 0)
-    it_cost_eur  = it_cost_try / avg_fx if avg_fx else 0
-    fac_cost_try = total_hc * opex_cfg.get("facilities_per_seat", 0)
-    fac_cost_eur = fac_cost_try / avg_fx if avg_fx else 0
-    capex_try = hc_increase * (opex_cfg.get("capex_pc",0) + opex_cfg.get("capex_headset",0) + opex_cfg.get("capex_software",0))
-    capex_eur = capex_try / avg_fx if avg_fx else 0
-    total_opex_eur = training_cost_eur + recruitment_cost_eur + it_cost_eur + fac_cost_eur
-    total_capex_eur = capex_eur
-
-    oh = calc_overhead(month, total_hc, sg, cl)
-    grand_cost_eur = total_cost_eur + backfill_cost_eur + total_opex_eur + total_capex_eur + oh["total_cost_eur"]
-    grand_cost_try = total_cost_try + backfill_cost_try + (training_cost_try + recruitment_cost_try + it_cost_try + fac_cost_try + capex_try) + oh["total_cost_try"]
-    total_hrs_billable = total_hrs
-    breakeven_up = grand_cost_eur / total_hrs_billable if total_hrs_billable else 0
-
-    return dict(
-        rev=total_rev_eur, rev_try=total_rev_try,
-        cost=grand_cost_eur, cost_try=grand_cost_try,
-        margin=total_rev_eur - grand_cost_eur,
-        hc=total_hc, hrs_billable=total_hrs_billable,
-        breakeven_up=breakeven_up,
-        attrition_hc=attrition_hc, backfill_hc=backfill_hc,
-    )
+    """Like get_totals but applies scenario-level multipliers/overrides."""
+    return get_totals_scenario_year(g, scen_overrides)[month]
 
 def calc_overhead(month, prod_hc, g, cl=None):
     """Calculate overhead cost for TM/QM/OM roles for a given month."""
-    oh     = get_oh_cfg(month, cl)
-    result = {}
-    total_cost_try = total_cost_eur = 0.0
-    for role, defaults in [("TM",{"ratio":10,"salary":55000}),
-                            ("QM",{"ratio":20,"salary":60000}),
-                            ("OM",{"ratio":50,"salary":80000})]:
-        cfg      = oh.get(role, defaults)
-        ratio    = cfg.get("ratio", defaults["ratio"])
-        sal      = cfg.get("salary", defaults["salary"])
-        override = cfg.get("hc_override")
-        # HC: manual override wins, else ratio-based ceiling (you hire whole people)
-        if override is not None:
-            hc = override
-        else:
-            hc = math.ceil(prod_hc / ratio) if (ratio > 0 and prod_hc > 0) else 0
-        cost_try = hc * sal * g["ctc"] * (1 + g["bonus_pct"]) + hc * g["meal"]
-        cost_eur = cost_try / g["fx"] if g["fx"] else 0
-        result[role] = dict(hc=hc, salary=sal, ratio=ratio,
-                            cost_try=cost_try, cost_eur=cost_eur,
-                            manual=override is not None)
-        total_cost_try += cost_try
-        total_cost_eur += cost_eur
-    result["total_cost_try"] = total_cost_try
-    result["total_cost_eur"] = total_cost_eur
-    return result
+    return engine.calc_overhead(month, prod_hc, g, cl or client())
+
+def get_monte_carlo(g, n, risk, seed=0, cl=None):
+    """Monte Carlo of the active client's full year (see engine.montecarlo), cached
+    by budget hash, risk parameters, seed and n — a rerun with nothing changed
+    redraws nothing. On a miss, block stats come from the month tracker, so only
+    the draws are computed."""
+    cl = cl or client()
+    s  = current_settings(g)
+    fps, _ = engine.budget_fps(cl, s)
+    return engine.montecarlo.simulate(cl, s, n=n, risk=risk, seed=seed, cache=montecarlo_cache(),
+                                      stats=month_tracker().stats(cl, fps))
+
+def get_tornado(g, pct, cl=None):
+    """(base FY margin, drivers ranked by margin swing) for ±pct — one batched pass,
+    cached by budget hash and pct."""
+    cl = cl or client()
+    s  = current_settings(g)
+    fps, _ = engine.budget_fps(cl, s)
+    return engine.sensitivity.tornado(cl, s, pct, cache=totals_cache(),
+                                      stats=month_tracker().stats(cl, fps))
+
+def get_heatmap(g, x, y, cl=None):
+    """FY margin % / break-even over a 2-D overlay grid, cached by budget hash."""
+    cl = cl or client()
+    s  = current_settings(g)
+    fps, _ = engine.budget_fps(cl, s)
+    return engine.sensitivity.heatmap(cl, s, x, y, cache=totals_cache(),
+                                      stats=month_tracker().stats(cl, fps))
+
+def get_scenario_years(g, overlays, cl=None):
+    """[{month: totals}] per scenario overlay — only new or edited scenarios are
+    computed (together, in one batched pass); the rest come from the result cache."""
+    return engine.scenarios.scenario_years(cl or client(), current_settings(g), overlays,
+                                           cache=totals_cache(), tracker=month_tracker())
+
+def get_fx_projection(g, curves, cl=None):
+    """Every P&L line along each monthly EUR/TRY curve: {key: array (curves, 12)}."""
+    cl = cl or client()
+    s  = current_settings(g)
+    fps, _ = engine.budget_fps(cl, s)
+    return engine.scenarios.fx_projection(cl, s, curves, stats=month_tracker().stats(cl, fps))
+
+def get_period_lines(g, granularity, year, cl=None):
+    """(period axis, P&L lines per week / day) for the active client, cached by budget hash."""
+    axis = engine.periods.period_axis(granularity, year)
+    return axis, engine.periods.period_lines(cl or client(), current_settings(g), axis,
+                                             cache=totals_cache())
+
+def get_horizon(g, cl=None):
+    """(horizon axis, P&L lines per contract month) for the client's contract settings."""
+    return engine.horizon.horizon_lines(cl or client(), current_settings(g), cache=totals_cache())
+
+# Session-wide inputs every client shares (the live FX feed); the rest are per client
+SHARED_SETTINGS = ("fx", "usd_eur", "usd_try")
+
+def client_settings(cl, g):
+    """Engine settings for any client: the sidebar's for the active one, else the
+    client's own saved sidebar values with this session's shared FX."""
+    if cl is st.session_state.clients[st.session_state.active_client]:
+        return current_settings(g)
+    return engine.make_settings(dict({k: g[k] for k in SHARED_SETTINGS if k in g}, **saved_settings(cl)))
+
+def client_stats(cl, s):
+    """A loaded client's month stats (settings-free) from the month tracker."""
+    fps, _ = engine.budget_fps(cl, s)
+    return month_tracker().stats(cl, fps)
+
+def get_portfolio(g):
+    """Every client's P&L in one batched pass, plus the consolidated total — each
+    client under its own settings, as on its own tab. Shares the result cache with
+    get_totals_year, so only edited clients recompute. Unopened clients are priced
+    from the pricing record saved with their summary; only those without one load."""
+    cls = st.session_state.clients
+    s   = [client_settings(c, g) for c in cls]
+    pr  = [c["summary"].get("pricing") if is_stub(c) else None for c in cls]
+    for i, c in enumerate(cls):
+        if is_stub(c) and pr[i] is None:
+            open_client(cls, i, budget_store())
+    return engine.portfolio_totals(cls, s, cache=totals_cache(), tracker=month_tracker(), pricing=pr)
 
 # openpyxl helpers
 def bdr():
@@ -509,7 +360,6 @@ def build_template(gh, gs, gfx, gctc, gbp, gm):
 
     # Pre-fill data rows
     ri = 5
-    att = st.session_state.attrition_rate
     cola_cfgs = client().get("cola_configs", {})
     for m in MONTHS:
         blocks_m = client()["blocks"].get(m, [])
@@ -517,7 +367,7 @@ def build_template(gh, gs, gfx, gctc, gbp, gm):
                               "shrink_override":None,"fx_override":None,"hours_override":None}]
         is_first = True
         for blk_i, b in enumerate(rows):
-            cola = cola_cfgs.get(str(blk_i), {})
+            cola = cola_cfgs.get(b.get("id"), {})
             vals = [
                 m if is_first else "",   # month label only on first row of group
                 b.get("lang",""),
@@ -527,7 +377,7 @@ def build_template(gh, gs, gfx, gctc, gbp, gm):
                 (b["shrink_override"]*100 if b.get("shrink_override") is not None and b["shrink_override"] <= 1 else b.get("shrink_override","")) if b.get("shrink_override") is not None else "",
                 b["fx_override"]     if b.get("fx_override")     is not None else "",
                 b["hours_override"]  if b.get("hours_override")  is not None else "",
-                att,
+                b["attrition_override"] if b.get("attrition_override") is not None else "",
                 cola.get("date",""),
                 cola.get("new_up",""),
             ]
@@ -553,7 +403,7 @@ def build_template(gh, gs, gfx, gctc, gbp, gm):
 
     buf = BytesIO(); wb.save(buf); buf.seek(0); return buf.getvalue()
 
-# ── Export builder — 3 clean sheets ─────────────────────────
+# ── Export builder — 3 clean sheets (+ contract horizon) ────
 def build_export(g):
     wb = Workbook(); wb.remove(wb.active)
 
@@ -583,8 +433,9 @@ def build_export(g):
 
     fy = {k: 0.0 for k in ["rev","cost","margin","cost_excl_backfill",
                              "backfill_cost_eur","oh_cost_eur","hrs_billable"]}
+    year = get_totals_year(g)
     for ri, m in enumerate(MONTHS, start=3):
-        t_m = get_totals(m, g)
+        t_m = year[m]
         oh  = t_m["oh"]
         avg_up = t_m["rev"] / t_m["hrs_billable"] if t_m["hrs_billable"] else 0
         row_vals = [
@@ -654,7 +505,7 @@ def build_export(g):
             hours  = b["hours_override"] if b.get("hours_override") is not None else g["hours"]
             hc, sal = b.get("hc",0), b.get("salary",0)
             base_up = b.get("unit_price",0)
-            eff_up  = effective_up(m, blk_i, base_up)
+            eff_up  = effective_up(m, b.get("id"), base_up)
             eff_hrs = hours * (1 - shrink)
             rev     = hc * eff_hrs * eff_up
             cost    = (hc * sal * g["ctc"] * (1 + g["bonus_pct"]) + hc * g["meal"]) / fx if fx else 0
@@ -696,6 +547,38 @@ def build_export(g):
         wcell(ws3, ri3, 1, lbl)
         wcell(ws3, ri3, 2, val)
 
+    # ══ Sheet 4: CONTRACT HORIZON (multi-year contracts only) ═
+    hz_axis, hz_lines = get_horizon(g)
+    if len(hz_axis["labels"]) > len(MONTHS):
+        ws4 = wb.create_sheet("Contract Horizon")
+        HZ_COLS = ["Period", "Revenue (EUR)", "Total Cost (EUR)", "Gross Margin (EUR)", "Margin %",
+                   "Prod HC", "Break-even €/hr"]
+        set_widths(ws4, [18, 16, 16, 16, 10, 10, 14])
+        t4 = ws4.cell(row=1, column=1, value=f"CC Budget — Contract Horizon ({len(hz_axis['labels'])} months)")
+        t4.font = Font(name="Calibri", bold=True, size=13, color="FFFFFF")
+        t4.fill = PatternFill("solid", start_color="1F4E79")
+        t4.alignment = Alignment(horizontal="left", vertical="center")
+        ws4.merge_cells(f"A1:{get_column_letter(len(HZ_COLS))}1")
+        ws4.row_dimensions[1].height = 26
+        for ci, h in enumerate(HZ_COLS, 1): hdr(ws4, 2, ci, h)
+
+        hz_years = engine.horizon.by_year(hz_lines, hz_axis)
+        hz_tot   = engine.horizon.contract_total(hz_lines, hz_axis)
+        hz_rows  = [(lbl, {k: hz_lines[k][i] for k in ("rev", "cost", "margin", "hc", "breakeven_up")}, False)
+                    for i, lbl in enumerate(hz_axis["labels"])]
+        hz_rows += [(f"Year {k+1} ({hz_axis['start_year'] + k})",
+                     {kk: hz_years[kk][k] for kk in ("rev", "cost", "margin", "hc", "breakeven_up")}, True)
+                    for k in range(hz_axis["n_years"])]
+        hz_rows += [("Contract Total", hz_tot, True)]
+        for ri4, (lbl, d, total) in enumerate(hz_rows, start=3):
+            bg = "E8F0FE" if total else None
+            wcell(ws4, ri4, 1, lbl, bold=True, bg=bg)
+            for ci, k in ((2, "rev"), (3, "cost"), (4, "margin")):
+                num(ws4, ri4, ci, float(d[k]), bold=total, bg=bg)
+            num(ws4, ri4, 5, float(d["margin"] / d["rev"]) if d["rev"] else 0, fmt="0.0%", bold=total, bg=bg)
+            num(ws4, ri4, 6, float(d["hc"]), fmt="0.00", bold=total, bg=bg)
+            num(ws4, ri4, 7, float(d["breakeven_up"]), fmt='€#,##0.00"/hr"', bold=total, bg=bg)
+
     buf = BytesIO(); wb.save(buf); buf.seek(0); return buf.getvalue()
 
 # ── PDF Report builder ───────────────────────────────────────
@@ -744,7 +627,8 @@ def build_pdf(g):
     story.append(HRFlowable(width="100%", color=NAVY, thickness=1.5, spaceAfter=14))
 
     # ── KPI summary row ──────────────────────────────────────
-    all_totals = [get_totals(m, g) for m in MONTHS]
+    year       = get_totals_year(g)
+    all_totals = [year[m] for m in MONTHS]
     fy_rev    = sum(t["rev"]    for t in all_totals)
     fy_cost   = sum(t["cost"]   for t in all_totals)
     fy_margin = sum(t["margin"] for t in all_totals)
@@ -902,8 +786,14 @@ with st.sidebar:
     st.divider()
 
     st.markdown('<div class="section-title">Global Inputs</div>', unsafe_allow_html=True)
-    g_hours  = st.number_input("Worked Hours / Agent / Month", value=180, step=1, min_value=1)
-    g_shrink = st.slider("Shrinkage % (default)", 0.0, 0.5, 0.15, 0.01, format="%.0f%%")
+    # Settings are per client: each client's widgets keep their own values
+    _set_cl  = st.session_state.clients[st.session_state.active_client]
+    _sk      = _set_cl.setdefault("client_id", uuid.uuid4().hex[:12])   # id the store would give it
+    _saved   = saved_settings(_set_cl)                   # this client's last saved values
+    g_hours  = st.number_input("Worked Hours / Agent / Month", value=_saved.get("hours", 180), step=1, min_value=1,
+                               key=f"g_hours_{_sk}")
+    g_shrink = st.slider("Shrinkage % (default)", 0.0, 0.5, _saved.get("shrink", 0.15), 0.01, format="%.0f%%",
+                         key=f"g_shrink_{_sk}")
 
     live_fx, live_usd_try, fx_ok = fetch_live_fx()
     if fx_ok:
@@ -914,18 +804,53 @@ with st.sidebar:
     st.number_input("USD/TRY (reference only)", value=live_usd_try, step=0.5, min_value=0.1,
                     disabled=True, help="Live USD/TRY for reference. Budget calculations use EUR/TRY above.")
 
+    with st.expander("📅 Dated changes to hours / FX / shrinkage", expanded=False):
+        st.caption("Values above apply until the first change. Transition months are prorated by day. "
+                   "Shrinkage in % (e.g. 18).")
+        _gc_labels = {"hours": "Hours", "fx": "FX (EUR/TRY)", "shrink": "Shrinkage %"}
+        _gc_key    = client_key("_gc_rows")
+        if _gc_key not in st.session_state:
+            st.session_state[_gc_key] = pd.DataFrame(
+                [{"Setting": _gc_labels[k], "Effective date": c.get("date", ""),
+                  "Value": c["value"] * 100 if k == "shrink" and c["value"] <= 1 else c["value"]}
+                 for k, chg in client()["global_changes"].items() for c in chg],
+                columns=["Setting", "Effective date", "Value"])
+        gc_rows = st.data_editor(
+            st.session_state[_gc_key], num_rows="dynamic", hide_index=True,
+            use_container_width=True, key=client_key("gc_edit"),
+            column_config={
+                "Setting": st.column_config.SelectboxColumn(options=list(_gc_labels.values()), required=True),
+                "Effective date": st.column_config.TextColumn(help="YYYY-MM-DD"),
+                "Value": st.column_config.NumberColumn(min_value=0.0),
+            })
+        _gc_by_label = {v: k for k, v in _gc_labels.items()}
+        new_gc = {k: [] for k in _gc_labels}
+        for _, row in gc_rows.iterrows():
+            setting, date_s, val = row["Setting"], str(row["Effective date"] or "").strip(), row["Value"]
+            if setting not in _gc_by_label or not date_s or pd.isna(val):
+                continue
+            if _date_pos(date_s) is None:
+                st.warning(f"Invalid date '{date_s}' — use YYYY-MM-DD")
+                continue
+            k = _gc_by_label[setting]
+            new_gc[k].append({"date": date_s, "value": float(val) / 100 if k == "shrink" else float(val)})
+        client()["global_changes"] = new_gc
+
     st.divider()
     st.markdown('<div class="section-title">Global Cost Drivers</div>', unsafe_allow_html=True)
-    g_ctc       = st.number_input("Salary Multiplier (CTC)", value=1.70, step=0.05, min_value=1.0)
-    g_bonus_pct = st.number_input("Bonus % of Base Salary",  value=0.10, step=0.01, min_value=0.0)
-    g_meal      = st.number_input("Meal Card / Agent / Month (TRY)", value=5850, step=50, min_value=0)
+    g_ctc       = st.number_input("Salary Multiplier (CTC)", value=_saved.get("ctc", 1.70), step=0.05, min_value=1.0,
+                                  key=f"g_ctc_{_sk}")
+    g_bonus_pct = st.number_input("Bonus % of Base Salary",  value=_saved.get("bonus_pct", 0.10), step=0.01, min_value=0.0,
+                                  key=f"g_bonus_{_sk}")
+    g_meal      = st.number_input("Meal Card / Agent / Month (TRY)", value=_saved.get("meal", 5850), step=50, min_value=0,
+                                  key=f"g_meal_{_sk}")
 
     st.divider()
     st.markdown('<div class="section-title">Attrition & Backfill</div>', unsafe_allow_html=True)
-    attrition_pct = st.slider("Monthly Attrition %", 0.0, 0.30, 0.05, 0.005, format="%.1f%%",
-                               help="Fraction of HC lost per month. Backfill hired 1-for-1.")
-    bf_efficiency = st.slider("Backfill Training Efficiency %", 0.0, 1.0, 0.50, 0.05, format="%.0f%%",
-                               help="How productive backfill agents are while in training. 50% = half speed. Hours are counted but generate no revenue.")
+    attrition_pct = st.slider("Monthly Attrition %", 0.0, 0.30, _saved.get("attrition_rate", 0.05), 0.005, format="%.1f%%",
+                               key=f"g_attrition_{_sk}", help="Fraction of HC lost per month. Backfill hired 1-for-1.")
+    bf_efficiency = st.slider("Backfill Training Efficiency %", 0.0, 1.0, _saved.get("backfill_efficiency", 0.50), 0.05, format="%.0f%%",
+                               key=f"g_backfill_{_sk}", help="How productive backfill agents are while in training. 50% = half speed. Hours are counted but generate no revenue.")
     st.session_state.attrition_rate       = attrition_pct
     st.session_state.backfill_efficiency  = bf_efficiency
 
@@ -986,6 +911,7 @@ with st.sidebar:
     st.session_state["g_hours"]  = g_hours
     st.session_state["g_shrink"] = g_shrink
     st.session_state["g_fx"]     = g_fx
+    st.session_state["g_settings"] = g     # full globals for the Target Margin goal-seek
 
     st.divider()
     st.markdown('<div class="section-title">Data Import / Export</div>', unsafe_allow_html=True)
@@ -1022,53 +948,9 @@ with st.sidebar:
     uploaded = st.file_uploader("⬆ Import Excel", type=["xlsx"])
     if uploaded:
         try:
-            xls = pd.ExcelFile(uploaded)
-            def sf(v):
-                try: return float(v) if str(v).strip() not in ("","nan") else None
-                except: return None
-
-            loaded = 0
-            # Support both old multi-sheet format and new single-sheet format
-            if "Budget Data" in xls.sheet_names:
-                # New single-sheet format
-                df_all = pd.read_excel(xls, sheet_name="Budget Data", header=2)
-                df_all.columns = [str(c).strip() for c in df_all.columns]
-                df_all = df_all[pd.to_numeric(df_all.get("HC", pd.Series()), errors="coerce").notna()]
-                new_blocks = {m: [] for m in MONTHS}
-                for _, row in df_all.iterrows():
-                    m = str(row.get("Month","")).strip()
-                    if m not in MONTHS: continue
-                    new_blocks[m].append({
-                        "lang":            str(row.get("Language","")).strip() if pd.notna(row.get("Language","")) else "",
-                        "hc":              int(float(row["HC"])) if pd.notna(row.get("HC")) else 0,
-                        "salary":          float(row.get("Base Salary (TRY)",0)) if pd.notna(row.get("Base Salary (TRY)")) else 0,
-                        "unit_price":      float(row.get("Unit Price (EUR/hr)",0)) if pd.notna(row.get("Unit Price (EUR/hr)")) else 0,
-                        "shrink_override": sf(row.get("Shrinkage Override","")),
-                        "fx_override":     sf(row.get("FX Override","")),
-                        "hours_override":  sf(row.get("Hours Override","")),
-                    })
-                    loaded += 1
-                client()["blocks"] = new_blocks
-            else:
-                # Legacy per-month sheet format
-                for m in MONTHS:
-                    if m not in xls.sheet_names: continue
-                    df_m = pd.read_excel(xls, sheet_name=m)
-                    if "HC" in df_m.columns:
-                        df_m = df_m[pd.to_numeric(df_m["HC"], errors="coerce").notna()]
-                    blocks = []
-                    for _, row in df_m.iterrows():
-                        blocks.append({
-                            "lang":            str(row.get("Language","")).strip() if pd.notna(row.get("Language","")) else "",
-                            "hc":              int(float(row["HC"])) if pd.notna(row.get("HC")) else 0,
-                            "salary":          float(row.get("Base Salary (TRY)",0)) if pd.notna(row.get("Base Salary (TRY)")) else 0,
-                            "unit_price":      float(row.get("Unit Price (EUR/hr)",0)) if pd.notna(row.get("Unit Price (EUR/hr)")) else 0,
-                            "shrink_override": sf(row.get("Shrinkage Override","")),
-                            "fx_override":     sf(row.get("FX Override","")),
-                            "hours_override":  sf(row.get("Hours Override","")),
-                        })
-                    client()["blocks"][m] = blocks
-                    loaded += len(blocks)
+            parsed = parse_workbook(uploaded)
+            apply_import(client(), parsed)
+            loaded = parsed["loaded"]
             st.success(f"✅ Imported {loaded} blocks across all months!")
             st.rerun()
         except Exception as e:
@@ -1102,14 +984,16 @@ with cl_row[0]:
 
 with cl_row[1]:
     cl_name_input = st.text_input("Rename client", value=client()["name"],
-                                   key=f"cl_name_{st.session_state.active_client}",
+                                   key=client_key("cl_name"),
                                    label_visibility="collapsed", placeholder="Client name")
     if cl_name_input != client()["name"]:
         client()["name"] = cl_name_input
 
     if len(st.session_state.clients) > 1:
         if st.button("🗑 Remove this client", key="del_cl", use_container_width=True):
-            st.session_state.clients.pop(st.session_state.active_client)
+            _gone = st.session_state.clients.pop(st.session_state.active_client)
+            if "client_id" in _gone:
+                budget_store().delete(_gone["client_id"])
             st.session_state.active_client = max(0, st.session_state.active_client - 1)
             st.rerun()
 
@@ -1217,14 +1101,14 @@ with st.expander("📋 Copy Month to Multiple Months"):
             st.error("Please select at least one destination month.")
         else:
             for m in selected_targets:
-                client()["blocks"][m] = copy.deepcopy(client()["blocks"][copy_from])
+                engine.copy_month(client(), copy_from, m)    # shares block masters, no deep copy
                 # Copy per-month overhead override if source has one
                 src_oh = client()["overhead_monthly"].get(copy_from)
                 if src_oh is not None:
                     client()["overhead_monthly"][m] = copy.deepcopy(src_oh)
             targets_str = ", ".join(selected_targets)
             n_blocks = len(client()["blocks"][copy_from])
-            cola_note = " COLA schedules follow block positions." if client()["cola_configs"] else ""
+            cola_note = " COLA schedules follow the blocks." if client()["cola_configs"] else ""
             st.success(f"✅ Copied **{copy_from}** ({n_blocks} blocks) → {targets_str}.{cola_note}")
             st.rerun()
     with info_col:
@@ -1237,19 +1121,27 @@ st.markdown('<div class="section-title">Production Blocks</div>', unsafe_allow_h
 blocks = client()["blocks"][active]
 
 if st.button("+ Add Production Block", type="secondary"):
-    blocks.append({"lang":"","hc":0,"salary":0,"unit_price":0,
-                   "shrink_override":None,"fx_override":None,"hours_override":None})
+    blocks.append(engine.new_block())
     st.rerun()
 
+# This month's hours / FX / shrinkage after any dated global changes
+_mg        = month_globals(g)
+_mi        = MONTHS.index(active)
+m_hours    = float(_mg["hours"][_mi])
+m_fx       = float(_mg["fx"][_mi])
+m_shrink   = float(_mg["shrink"][_mi])
+
 blocks_to_delete = []
 for i, b in enumerate(blocks):
     # ── Read widget state first (keys may already exist from prior render) ──
     # This ensures title, warnings, and preview stats are always in sync
     # with what the user currently sees in the inputs — not one cycle behind.
-    _hc_key  = f"hc_{active}_{i}";  _sal_key = f"sal_{active}_{i}"
-    _up_key  = f"up_{active}_{i}";  _lang_key = f"lang_{active}_{i}"
-    _shr_key = f"shr_{active}_{i}"; _fx_key  = f"fx_{active}_{i}"
-    _hr_key  = f"hr_{active}_{i}"
+    # Keyed by block id, so deleting a block never hands its inputs to the next one.
+    bk = f"{active}_{b['id']}"
+    _hc_key  = f"hc_{bk}";  _sal_key = f"sal_{bk}"
+    _up_key  = f"up_{bk}";  _lang_key = f"lang_{bk}"
+    _shr_key = f"shr_{bk}"; _fx_key  = f"fx_{bk}"
+    _hr_key  = f"hr_{bk}"
 
     # Persist block widget values immediately — use session_state if key exists,
     # so any rerender (COLA, overhead, etc.) always works from current values.
@@ -1275,16 +1167,16 @@ for i, b in enumerate(blocks):
     if isinstance(_hr_raw_live, str) and _hr_raw_live.strip():
         b["hours_override"] = float(_hr_raw_live)
 
-    _shr_val   = b["shrink_override"] if b.get("shrink_override") is not None else g_shrink
+    _shr_val   = b["shrink_override"] if b.get("shrink_override") is not None else m_shrink
     raw_shrink = _shr_val / 100 if _shr_val > 1 else _shr_val
     shrink = max(0.0, min(0.99, raw_shrink))
-    fx     = b["fx_override"]     if b.get("fx_override")     is not None else g_fx
-    hours  = b["hours_override"]  if b.get("hours_override")  is not None else g_hours
+    fx     = b["fx_override"]     if b.get("fx_override")     is not None else m_fx
+    hours  = b["hours_override"]  if b.get("hours_override")  is not None else m_hours
     base_hc        = b.get("hc", 0)
     hc             = effective_hc(active, b)             # ramp-adjusted HC for display
-    salary         = b.get("salary", 0)
+    salary         = effective_salary(active, b["id"], b.get("salary", 0))   # raise-adjusted
     base_up        = b.get("unit_price", 0)
-    up             = effective_up(active, i, base_up)    # COLA-adjusted
+    up             = effective_up(active, b["id"], base_up)    # COLA-adjusted
     eff            = hours * (1 - shrink)
     rev_eur        = hc * eff * up
     rev_try        = rev_eur * fx
@@ -1303,14 +1195,14 @@ for i, b in enumerate(blocks):
             st.warning("⚠️ Base salary is 0 — cost will be understated.", icon="⚠️")
         r1c1,r1c2,r1c3,r1c4,r1c4b,r1c5 = st.columns([2,1,2,1,2,1])
         new_lang = r1c1.text_input("Language / Label", value=b.get("lang",""),
-                                    key=f"lang_{active}_{i}", placeholder="e.g. DE, EN, TR")
+                                    key=f"lang_{bk}", placeholder="e.g. DE, EN, TR")
         new_hc   = r1c2.number_input("HC", value=int(b.get("hc",0)), min_value=0, step=1,
-                                      key=f"hc_{active}_{i}")
+                                      key=f"hc_{bk}")
         new_sal  = r1c3.number_input("Base Salary (TRY/mo)", value=float(b.get("salary",0)),
-                                      min_value=0.0, step=100.0, key=f"sal_{active}_{i}")
+                                      min_value=0.0, step=100.0, key=f"sal_{bk}")
         up_currency = r1c4.radio("Currency", ["EUR","USD"],
                                   index=0 if b.get("up_currency","EUR")=="EUR" else 1,
-                                  key=f"upcur_{active}_{i}", horizontal=True,
+                                  key=f"upcur_{bk}", horizontal=True,
                                   help="USD prices are converted to EUR using the live cross rate for all P&L calculations.")
         _usd_eur = g.get("usd_eur", 0.92)
         if up_currency == "USD":
@@ -1318,7 +1210,7 @@ for i, b in enumerate(blocks):
         else:
             _up_label = "Unit Price (EUR/hr)"
         new_up_raw = r1c4b.number_input(_up_label, value=float(b.get("unit_price_raw", b.get("unit_price",0))),
-                                         min_value=0.0, step=0.1, key=f"up_{active}_{i}")
+                                         min_value=0.0, step=0.1, key=f"up_{bk}")
         # Convert to EUR for all calculations
         new_up = new_up_raw * _usd_eur if up_currency == "USD" else new_up_raw
         if up_currency == "USD":
@@ -1326,7 +1218,7 @@ for i, b in enumerate(blocks):
                 r1c4b.caption(f"≈ €{new_up:.2f}/hr  |  rate: 1 USD = €{_usd_eur:.4f}")
             else:
                 r1c4b.caption(f"Live rate: 1 USD = €{_usd_eur:.4f}")
-        if r1c5.button("🗑 Remove", key=f"del_{active}_{i}", use_container_width=True):
+        if r1c5.button("🗑 Remove", key=f"del_{bk}", use_container_width=True):
             blocks_to_delete.append(i)
 
         r2c1,r2c2,r2c3,r2c4,r2c5,r2c6 = st.columns([2,2,2,2,2,2])
@@ -1337,18 +1229,18 @@ for i, b in enumerate(blocks):
         )
         shr_raw = r2c1.text_input(f"Shrinkage Override % (global: {g_shrink*100:.0f}%)",
                                    value=_shr_display,
-                                   key=f"shr_{active}_{i}", placeholder="blank = global")
+                                   key=f"shr_{bk}", placeholder="blank = global")
         _fx_baseline = g.get("usd_try", g_fx) if up_currency == "USD" else g_fx
         _fx_label    = f"FX Override (USD/TRY global: {_fx_baseline})" if up_currency == "USD" else f"FX Override (EUR/TRY global: {g_fx})"
         fx_raw  = r2c2.text_input(_fx_label,
                                    value="" if b.get("fx_override") is None else str(b["fx_override"]),
-                                   key=f"fx_{active}_{i}", placeholder="blank = global")
+                                   key=f"fx_{bk}", placeholder="blank = global")
         hr_raw  = r2c3.text_input(f"Hours Override (global: {g_hours})",
                                    value="" if b.get("hours_override") is None else str(b["hours_override"]),
-                                   key=f"hr_{active}_{i}", placeholder="blank = global")
+                                   key=f"hr_{bk}", placeholder="blank = global")
         att_raw = r2c4.text_input(f"Attrition Override (global: {attrition_pct*100:.1f}%)",
                                    value="" if b.get("attrition_override") is None else str(b["attrition_override"]),
-                                   key=f"att_{active}_{i}", placeholder="blank = global",
+                                   key=f"att_{bk}", placeholder="blank = global",
                                    help="Override attrition rate for this block only e.g. 0.08 for 8%")
 
         # ── Cost breakdown ────────────────────────────────────
@@ -1434,6 +1326,11 @@ for i, b in enumerate(blocks):
             "hours_override":     float(hr_raw)  if hr_raw.strip()  else None,
             "attrition_override": float(att_raw) if att_raw.strip() else None,
         })
+        # Edits land on this month only; this pushes them to every month with the block
+        if isinstance(blocks[i], engine.BlockView) and st.checkbox(
+                "Apply edits to all months", key=f"allm_{bk}",
+                help="Make this month's values the block's own — every month showing this block picks them up."):
+            engine.apply_to_all(client(), blocks[i])
 
         # ── HC Ramp Schedule ─────────────────────────────────
         ramp = blocks[i].get("hc_ramp", {})
@@ -1463,17 +1360,17 @@ for i, b in enumerate(blocks):
 
             # Quick-fill helpers
             qf1, qf2, qf3 = st.columns(3)
-            if qf1.button("⬆ Linear ramp-up to base", key=f"ramp_up_{active}_{i}",
+            if qf1.button("⬆ Linear ramp-up to base", key=f"ramp_up_{bk}",
                           help="Starts at 0 in Jan, reaches base HC by Dec"):
                 new_q = {m: max(0, round(new_hc * mi / 11)) for mi, m in enumerate(MONTHS)}
                 blocks[i]["hc_ramp"] = {m: v for m, v in new_q.items() if v != new_hc}
                 st.rerun()
-            if qf2.button("⬇ Linear ramp-down to 0", key=f"ramp_dn_{active}_{i}",
+            if qf2.button("⬇ Linear ramp-down to 0", key=f"ramp_dn_{bk}",
                           help="Starts at base HC in Jan, reaches 0 by Dec"):
                 new_q = {m: max(0, round(new_hc * (1 - mi / 11))) for mi, m in enumerate(MONTHS)}
                 blocks[i]["hc_ramp"] = {m: v for m, v in new_q.items() if v != new_hc}
                 st.rerun()
-            if qf3.button("🔄 Reset to flat", key=f"ramp_reset_{active}_{i}"):
+            if qf3.button("🔄 Reset to flat", key=f"ramp_reset_{bk}"):
                 blocks[i]["hc_ramp"] = {}
                 st.rerun()
 
@@ -1487,7 +1384,7 @@ for i, b in enumerate(blocks):
                     v = st.number_input(
                         m, value=int(cur) if cur is not None else new_hc,
                         min_value=0, step=1,
-                        key=f"ramp_{active}_{i}_{m}",
+                        key=f"ramp_{bk}_{m}",
                     )
                     ramp_vals.append(v)
                     if v != new_hc:
@@ -1587,7 +1484,8 @@ else:
     for i, b in enumerate(blocks):
         label_cola = b.get("lang") or f"Block #{i+1}"
         base_up_cola = b.get("unit_price", 0)
-        cola_key = str(i)
+        cola_key = b["id"]
+        bk       = f"{active}_{cola_key}"
         cola_cfg = client()["cola_configs"].get(cola_key, {})
         has_cola = bool(cola_cfg.get("date"))
         with st.expander(
@@ -1601,20 +1499,20 @@ else:
             cola_up_val   = float(cola_cfg.get("new_up", base_up_cola)) if cola_cfg.get("new_up") else float(base_up_cola)
             new_cola_date = cc1.text_input("Effective date (YYYY-MM-DD)",
                                             value=cola_date_val,
-                                            key=f"cola_date_{active}_{i}",
+                                            key=f"cola_date_{bk}",
                                             placeholder="e.g. 2026-04-15",
                                             help="New UP applies from this date. Transition month is prorated by day.")
             new_cola_up   = cc2.number_input("New Unit Price (EUR/hr)",
                                               value=cola_up_val, step=0.1, min_value=0.0,
-                                              key=f"cola_up_{active}_{i}")
-            if cc3.button("Clear COLA", key=f"cola_clr_{active}_{i}", use_container_width=True):
+                                              key=f"cola_up_{bk}")
+            if cc3.button("Clear COLA", key=f"cola_clr_{bk}", use_container_width=True):
                 client()["cola_configs"].pop(cola_key, None)
                 st.rerun()
             if new_cola_date.strip():
                 try:
                     _dt.date.fromisoformat(new_cola_date.strip())
                     client()["cola_configs"][cola_key] = {"date": new_cola_date.strip(), "new_up": new_cola_up}
-                    eff_up = effective_up(active, i, base_up_cola)
+                    eff_up = effective_up(active, cola_key, base_up_cola)
                     cola_dt = _dt.date.fromisoformat(new_cola_date.strip())
                     m_idx   = MONTHS.index(active) + 1
                     if eff_up != base_up_cola:
@@ -1626,6 +1524,99 @@ else:
                 except ValueError:
                     st.warning("Invalid date — use YYYY-MM-DD")
 
+# ── Salary Raise Schedule ─────────────────────────────────────
+st.divider()
+st.markdown("### 💰 Salary Raise Schedule")
+st.caption("Set a dated base-salary raise per block. Like COLA, the transition month is prorated by day.")
+
+if not blocks:
+    st.info("Add production blocks above to configure salary raises.", icon="💰")
+else:
+    for i, b in enumerate(blocks):
+        label_raise = b.get("lang") or f"Block #{i+1}"
+        base_sal    = b.get("salary", 0)
+        raise_key   = b["id"]
+        bk          = f"{active}_{raise_key}"
+        raise_cfg   = client()["salary_raises"].get(raise_key, {})
+        has_raise   = bool(raise_cfg.get("date"))
+        with st.expander(
+            f"{'💰' if has_raise else '➕'} Block #{i+1} — {label_raise} "
+            f"(base salary: ₺{base_sal:,.0f})"
+            + (f" → +{raise_cfg.get('pct', 0)*100:.1f}% from {raise_cfg.get('date','')}" if has_raise else " — no raise set"),
+            expanded=has_raise
+        ):
+            rc1, rc2, rc3 = st.columns([2, 2, 1])
+            new_raise_date = rc1.text_input("Effective date (YYYY-MM-DD)",
+                                             value=raise_cfg.get("date", ""),
+                                             key=f"raise_date_{bk}",
+                                             placeholder="e.g. 2026-07-01",
+                                             help="Raised salary applies from this date. Transition month is prorated by day.")
+            new_raise_pct  = rc2.number_input("Raise %",
+                                               value=float(raise_cfg.get("pct", 0.0)) * 100,
+                                               step=1.0, min_value=-50.0, max_value=200.0,
+                                               key=f"raise_pct_{bk}")
+            if rc3.button("Clear raise", key=f"raise_clr_{bk}", use_container_width=True):
+                client()["salary_raises"].pop(raise_key, None)
+                st.rerun()
+            if new_raise_date.strip():
+                if _date_pos(new_raise_date) is None:
+                    st.warning("Invalid date — use YYYY-MM-DD")
+                else:
+                    client()["salary_raises"][raise_key] = {"date": new_raise_date.strip(),
+                                                            "pct": new_raise_pct / 100}
+                    eff_sal = effective_salary(active, raise_key, base_sal)
+                    st.caption(f"{active}: effective salary ₺{eff_sal:,.0f} "
+                               f"(₺{base_sal:,.0f} → ₺{base_sal * (1 + new_raise_pct / 100):,.0f} "
+                               f"on {new_raise_date.strip()})")
+
+# ── Hiring Waves ──────────────────────────────────────────────
+st.divider()
+st.markdown("### 👥 Hiring Waves")
+st.caption("Dated HC changes inside a month — e.g. a training class of 12 going live on the 16th. "
+           "A wave adds (or removes, if negative) agents on a block from its date on; the landing month "
+           "is prorated by day, and the 📆 Weekly / Daily view below shows it day by day.")
+
+if not blocks:
+    st.info("Add production blocks above to plan hiring waves.", icon="👥")
+else:
+    WAVE_COLS = ["Block", "Effective date", "HC change"]
+    _wave_key = client_key("_wave_rows")
+    _blk_lbl  = engine.block_labels(client())
+    if _wave_key not in st.session_state or list(st.session_state[_wave_key].columns) != WAVE_COLS:
+        st.session_state[_wave_key] = pd.DataFrame(
+            [{"Block": k, "Effective date": w.get("date", ""), "HC change": w.get("delta", 0)}
+             for k, ws in client()["hc_waves"].items() for w in ws],
+            columns=WAVE_COLS)
+    wave_edit = st.data_editor(
+        st.session_state[_wave_key], num_rows="dynamic", hide_index=True,
+        use_container_width=True, key=client_key("wave_edit"),
+        column_config={
+            "Block":          st.column_config.SelectboxColumn(options=list(_blk_lbl), required=True,
+                                                               format_func=lambda k: _blk_lbl.get(k, k),
+                                                               help="Block — # is its position in the first month it appears."),
+            "Effective date": st.column_config.TextColumn(help="YYYY-MM-DD — agents count from this day on."),
+            "HC change":      st.column_config.NumberColumn(step=1, help="Agents added (negative = released)."),
+        })
+    waves, bad = {}, []
+    for _, row in wave_edit.iterrows():
+        if pd.isna(row["Block"]) or pd.isna(row["HC change"]) or not row["HC change"]:
+            continue
+        date = str(row["Effective date"] or "").strip()
+        if _date_pos(date) is None:
+            bad.append(date or "(blank)")
+            continue
+        waves.setdefault(row["Block"], []).append({"date": date, "delta": float(row["HC change"])})
+    client()["hc_waves"] = waves
+    if bad:
+        st.warning(f"Ignored waves with invalid dates: {', '.join(bad)} — use YYYY-MM-DD")
+    _tl = engine.timelines(client())
+    for i, b in enumerate(blocks):
+        row = _tl["ids"].get(b["id"])
+        if row is not None and _tl["hc_wave"][row, MONTHS.index(active)]:
+            base_hc = effective_hc(active, b)
+            st.caption(f"Block #{i+1} — {b.get('lang') or 'Block'}: {active} HC {base_hc:,.0f} → "
+                       f"{max(base_hc + _tl['hc_wave'][row, MONTHS.index(active)], 0):,.1f} (month average, with waves)")
+
 # ── Overhead Roles ───────────────────────────────────────────
 st.divider()
 st.markdown("### 🏢 Overhead Roles")
@@ -1753,11 +1744,9 @@ st.divider()
 st.markdown("### 📉 P&L Summary — Full Year")
 
 fy = {"rev":0,"rev_try":0,"cost":0,"cost_try":0,"margin":0,"margin_try":0}
-month_data = {}
+month_data = get_totals_year(g)
 for m in MONTHS:
-    mt = get_totals(m, g)
-    month_data[m] = mt
-    for k in fy: fy[k] += mt[k]
+    for k in fy: fy[k] += month_data[m][k]
 
 LINE_ITEMS = [
     "Revenue",
@@ -1945,6 +1934,133 @@ with tab_eur:
 with tab_try:
     st.dataframe(pd.DataFrame(pnl_try).set_index("Line Item"), use_container_width=True)
 
+# ── Portfolio ────────────────────────────────────────────────
+st.markdown("### 🗂 Portfolio — All Clients")
+
+pf     = get_portfolio(g)
+pf_tot = pf["total"]
+pf_rev, pf_cost, pf_mgn = pf_tot["rev"].sum(), pf_tot["cost"].sum(), pf_tot["margin"].sum()
+p1,p2,p3,p4 = st.columns(4)
+p1.metric("Portfolio Revenue (EUR)", fmt_eur(pf_rev), delta=f"{len(pf['clients'])} clients", delta_color="off")
+p2.metric("Portfolio Cost (EUR)",    fmt_eur(pf_cost))
+p3.metric("Portfolio Margin (EUR)",  fmt_eur(pf_mgn),
+          delta=fmt_pct(pf_mgn/pf_rev) if pf_rev else "0%", delta_color="normal")
+p4.metric("Avg Portfolio HC",        f"{pf_tot['hc'].mean():,.0f} agents")
+
+PF_METRICS = {"Revenue (EUR)": "rev", "Cost (EUR)": "cost", "Margin (EUR)": "margin",
+              "Margin %": None, "HC": "hc"}
+pf_metric = st.radio("Portfolio metric", list(PF_METRICS), horizontal=True,
+                     key="pf_metric", label_visibility="collapsed")
+pf_key    = PF_METRICS[pf_metric]
+
+def _pf_row(name, by_month, rev=None, margin=None):
+    if pf_key is None:
+        pct = engine.portfolio.margin_pct(rev, margin)
+        fy_pct = margin.sum() / rev.sum() if rev.sum() else 0
+        return {"Client": name, **{m: fmt_pct(v) for m, v in zip(MONTHS, pct)}, "Full Year": fmt_pct(fy_pct)}
+    if pf_key == "hc":
+        return {"Client": name, **{m: f"{v:,.0f}" for m, v in zip(MONTHS, by_month)},
+                "Full Year": f"{by_month.mean():,.0f}"}
+    return {"Client": name, **{m: fmt_eur(v) for m, v in zip(MONTHS, by_month)},
+            "Full Year": fmt_eur(by_month.sum())}
+
+pf_rows = []
+for i, name in enumerate(pf["clients"]):
+    pf_rows.append(_pf_row(name, pf["by_client"][pf_key][i] if pf_key else None,
+                           pf["by_client"]["rev"][i], pf["by_client"]["margin"][i]))
+pf_rows.append(_pf_row("Portfolio", pf_tot[pf_key] if pf_key else None,
+                       pf_tot["rev"], pf_tot["margin"]))
+st.dataframe(pd.DataFrame(pf_rows).set_index("Client"), use_container_width=True)
+
+# ── Contract Horizon ─────────────────────────────────────────
+st.divider()
+st.markdown("### 📅 Contract Horizon")
+st.caption("Run the plan over a multi-year contract. Later years roll the block schedule forward; "
+           "COLA and salary steps apply at each anniversary, and EUR/TRY drifts monthly. "
+           "Dated changes (COLA, raises, waves, global changes) land in the year of their date here, "
+           "while the fiscal-year view above places them by month and day only — so contract year 1 "
+           "matches it only when every dated change falls in the start year.")
+
+ctr = client()["contract"]
+hz1, hz2, hz3 = st.columns(3)
+ctr["start_year"] = int(hz1.number_input("Start year", value=int(ctr.get("start_year") or _dt.date.today().year),
+                                         min_value=2000, max_value=2100, step=1, key=client_key("hz_start")))
+ctr["months"]     = int(hz2.number_input("Horizon (months)", value=int(ctr.get("months", 12)),
+                                         min_value=12, max_value=engine.horizon.MAX_MONTHS, step=12,
+                                         key=client_key("hz_months"),
+                                         help="12 = one contract year (the fiscal year above if every dated "
+                                              "change falls in the start year); 24 … 60 for multi-year contracts."))
+ctr["roll"]       = hz3.radio("Later years", list(engine.horizon.ROLL_MODES), horizontal=True,
+                              key=client_key("hz_roll"),
+                              index=list(engine.horizon.ROLL_MODES).index(ctr.get("roll", "hold")),
+                              format_func={"hold": "Hold Dec blocks", "repeat": "Repeat Jan … Dec"}.get,
+                              help="Hold: December's blocks continue (steady state after ramps). "
+                                   "Repeat: the fiscal-year schedule recurs each contract year.")
+hz4, hz5, hz6 = st.columns(3)
+ctr["cola_pct"] = hz4.number_input("COLA step / year (%)", value=float(ctr.get("cola_pct", 0)) * 100,
+                                   step=0.5, key=client_key("hz_cola"), help="Unit price increase at each anniversary.") / 100
+ctr["sal_pct"]  = hz5.number_input("Salary step / year (%)", value=float(ctr.get("sal_pct", 0)) * 100,
+                                   step=1.0, key=client_key("hz_sal"), help="Production and overhead salaries, at each anniversary.") / 100
+ctr["fx_drift"] = hz6.number_input("EUR/TRY drift / year (%)", value=float(ctr.get("fx_drift", 0)) * 100,
+                                   step=1.0, key=client_key("hz_fx"), help="Compounded monthly from the plan rate.") / 100
+
+hz_axis, hz_lines = get_horizon(g)
+hz_off = engine.horizon.off_year_changes(client(), hz_axis["start_year"])
+if hz_off:
+    st.warning(f"{len(hz_off)} dated change(s) fall outside {hz_axis['start_year']} (e.g. "
+               f"{', '.join(d for _, d in hz_off[:3])}): contract year 1 prices them by their full date, "
+               "so it differs from the fiscal-year view above.", icon="📅")
+hz_years = engine.horizon.by_year(hz_lines, hz_axis)
+hz_tot   = engine.horizon.contract_total(hz_lines, hz_axis)
+hz_year_lbl = lambda k: f"Year {k+1} ({hz_axis['start_year'] + k})"
+h1,h2,h3,h4 = st.columns(4)
+h1.metric("Contract Revenue (EUR)", fmt_eur(hz_tot["rev"]), delta=f"{ctr['months']} months", delta_color="off")
+h2.metric("Contract Cost (EUR)",    fmt_eur(hz_tot["cost"]))
+h3.metric("Contract Margin (EUR)",  fmt_eur(hz_tot["margin"]),
+          delta=fmt_pct(hz_tot["margin"]/hz_tot["rev"]) if hz_tot["rev"] else "0%", delta_color="normal")
+h4.metric("Avg Contract HC",        f"{hz_tot['hc']:,.0f} agents")
+
+hz_rows = [{"Period": hz_year_lbl(k), "Revenue (EUR)": fmt_eur(hz_years["rev"][k]),
+            "Cost (EUR)": fmt_eur(hz_years["cost"][k]), "Margin (EUR)": fmt_eur(hz_years["margin"][k]),
+            "Margin %": fmt_pct(hz_years["margin"][k]/hz_years["rev"][k]) if hz_years["rev"][k] else "0%",
+            "Avg HC": f"{hz_years['hc'][k]:,.0f}", "Break-even €/hr": f"€{hz_years['breakeven_up'][k]:.2f}"}
+           for k in range(hz_axis["n_years"])]
+hz_rows.append({"Period": "Contract Total", "Revenue (EUR)": fmt_eur(hz_tot["rev"]),
+                "Cost (EUR)": fmt_eur(hz_tot["cost"]), "Margin (EUR)": fmt_eur(hz_tot["margin"]),
+                "Margin %": fmt_pct(hz_tot["margin"]/hz_tot["rev"]) if hz_tot["rev"] else "0%",
+                "Avg HC": f"{hz_tot['hc']:,.0f}", "Break-even €/hr": f"€{hz_tot['breakeven_up']:.2f}"})
+st.dataframe(pd.DataFrame(hz_rows).set_index("Period"), use_container_width=True)
+
+if hz_axis["n_years"] > 1:
+    try:
+        import plotly.graph_objects as _hzgo
+        fig_hz = _hzgo.Figure()
+        fig_hz.add_trace(_hzgo.Bar(name="Revenue", x=hz_axis["labels"], y=hz_lines["rev"].tolist(),
+                                   marker_color="#3b82f6", opacity=0.85))
+        fig_hz.add_trace(_hzgo.Bar(name="Total Cost", x=hz_axis["labels"], y=hz_lines["cost"].tolist(),
+                                   marker_color="#ef4444", opacity=0.85))
+        fig_hz.add_trace(_hzgo.Scatter(name="Margin", x=hz_axis["labels"], y=hz_lines["margin"].tolist(),
+                                       mode="lines", line=dict(color="#10b981", width=2.5)))
+        fig_hz.update_layout(
+            barmode="group", plot_bgcolor="#0e1420", paper_bgcolor="#0e1420",
+            font=dict(color="#8b96b0"), margin=dict(l=10, r=10, t=20, b=10), height=300,
+            xaxis=dict(showgrid=False, type="category"),
+            yaxis=dict(showgrid=True, gridcolor="#1e2535", title="EUR"),
+            legend=dict(orientation="h", y=1.1),
+            hoverlabel=dict(bgcolor="#1e2535", bordercolor="#2a3347"),
+        )
+        st.plotly_chart(fig_hz, use_container_width=True)
+    except ImportError:
+        pass
+    hz_k = st.selectbox("Monthly detail for", range(hz_axis["n_years"]), format_func=hz_year_lbl, key="hz_view")
+    hz_sl, hz_lbl = engine.horizon.year_slice(hz_lines, hz_axis, hz_k)
+    st.dataframe(pd.DataFrame({"Month": hz_lbl, "HC": hz_sl["hc"], "Revenue (EUR)": hz_sl["rev"],
+                               "Cost (EUR)": hz_sl["cost"], "Margin (EUR)": hz_sl["margin"],
+                               "Break-even €/hr": hz_sl["breakeven_up"]}).set_index("Month").style.format(
+                     {"HC": "{:,.0f}", "Revenue (EUR)": "€{:,.0f}", "Cost (EUR)": "€{:,.0f}",
+                      "Margin (EUR)": "€{:,.0f}", "Break-even €/hr": "€{:.2f}"}),
+                 use_container_width=True)
+
 # ── Actual vs Budget ─────────────────────────────────────────"Enter monthly actuals to track variance against your budget. All figures in EUR.")
 
 with st.expander("✏️ Enter / Edit Actuals", expanded=False):
@@ -2077,39 +2193,41 @@ proj_bear = _interp_fx(fxp_now, fxp_bear)
 proj_base = _interp_fx(fxp_now, fxp_base)
 proj_bull = _interp_fx(fxp_now, fxp_bull)
 
-# Show projected rates table
-proj_df = pd.DataFrame({
-    "Month":      MONTHS,
-    "🐻 Bear":    proj_bear,
-    "📊 Base":    proj_base,
-    "🐂 Bull":    proj_bull,
-})
-
-# Compute cost impact: recalc total cost at each scenario FX vs current budget FX
-# Cost in EUR = cost_TRY / FX  → higher FX = lower EUR cost (TRY cheaper)
-impact_rows = []
-for mi, m in enumerate(MONTHS):
-    mt = month_data[m]
-    cost_try = mt["cost_try"]
-    bgt_fx   = _fx_anchor
-    for scen, proj in [("Bear", proj_bear), ("Base", proj_base), ("Bull", proj_bull)]:
-        scen_fx  = proj[mi]
-        scen_cost_eur = cost_try / scen_fx if scen_fx else 0
-        delta_eur     = scen_cost_eur - mt["cost"]   # vs budget cost
-        impact_rows.append({"Month": m, "Scenario": scen,
-                             "FX": scen_fx, "Cost EUR": scen_cost_eur,
-                             "Δ vs Budget": delta_eur})
+# Imported forward curves (CSV / Excel: Month column + one column per curve)
+fx_upload = st.file_uploader("Import forward-rate curves (optional)", type=["csv", "xlsx"], key="fx_curves",
+                             help="A Month column (Jan … Dec) and one column of EUR/TRY rates per curve.")
+fx_imported = {}
+if fx_upload is not None:
+    try:
+        fx_imported = parse_fx_curves(fx_upload, fx_upload.name)
+    except Exception as e:
+        st.error(f"Could not read curves: {e}")
+
+# All curves through the full engine at once: per-block FX overrides keep their
+# rate, USD-billed revenue follows the curve, OPEX / backfill use the weighted FX.
+IMPORTED_COLORS = ["#a855f7", "#06b6d4", "#ec4899", "#84cc16", "#f97316"]
+fx_curves = [
+    dict(key="Bear", label="🐻 Bear", icon="🐻", rates=proj_bear, color="#ef4444", fill="rgba(239,68,68,0.08)",
+         name="🐻 Bear — TRY weakens most", desc="TRY weakens most → lowest EUR costs → best margin", outcome="#10b981"),
+    dict(key="Base", label="📊 Base", icon="📊", rates=proj_base, color="#3b82f6", fill="rgba(59,130,246,0.12)",
+         name="📊 Base — moderate depreciation", desc="Moderate TRY depreciation → likely outcome", outcome="#3b82f6"),
+    dict(key="Bull", label="🐂 Bull", icon="🐂", rates=proj_bull, color="#10b981", fill="rgba(16,185,129,0.08)",
+         name="🐂 Bull — TRY stays strong", desc="TRY stays strong → highest EUR costs → lowest margin", outcome="#ef4444"),
+] + [dict(key=name, label=f"📥 {name}", icon="📥", rates=rates, color=IMPORTED_COLORS[i % len(IMPORTED_COLORS)],
+          fill="rgba(0,0,0,0)", name=f"📥 {name} — imported", desc="Imported forward curve",
+          outcome=IMPORTED_COLORS[i % len(IMPORTED_COLORS)])
+     for i, (name, rates) in enumerate(fx_imported.items())]
+
+fx_lines = get_fx_projection(g, [c["rates"] for c in fx_curves])      # {key: (curves, 12)}
+bgt_cost_m = [month_data[m]["cost"] for m in MONTHS]
+fx_delta   = fx_lines["cost"] - bgt_cost_m                              # cost Δ vs budget, per month
 
 try:
     import plotly.graph_objects as _fxgo
     fig_fx = _fxgo.Figure()
 
-    _scenarios = [
-        ("🐻 Bear", proj_bear, "#ef4444", "rgba(239,68,68,0.08)"),
-        ("📊 Base", proj_base, "#3b82f6", "rgba(59,130,246,0.12)"),
-        ("🐂 Bull", proj_bull, "#10b981", "rgba(16,185,129,0.08)"),
-    ]
-    for label, proj, color, fill in _scenarios:
+    for c in fx_curves:
+        label, proj, color, fill = c["label"], c["rates"], c["color"], c["fill"]
         fig_fx.add_trace(_fxgo.Scatter(
             name=label, x=MONTHS, y=proj,
             mode="lines+markers",
@@ -2146,13 +2264,11 @@ try:
         "Since you pay salaries in TRY but bill in EUR, a weaker TRY always helps your margin."
     )
     fig_imp = _fxgo.Figure()
-    for scen, color in [("Bear","#ef4444"),("Base","#3b82f6"),("Bull","#10b981")]:
-        rows = [r for r in impact_rows if r["Scenario"] == scen]
-        deltas = [r["Δ vs Budget"] for r in rows]
+    for ci, c in enumerate(fx_curves):
         fig_imp.add_trace(_fxgo.Bar(
-            name=f"{'🐻 Bear — TRY weakens most' if scen=='Bear' else '📊 Base — moderate depreciation' if scen=='Base' else '🐂 Bull — TRY stays strong'}",
-            x=MONTHS, y=deltas,
-            marker_color=color,
+            name=c["name"],
+            x=MONTHS, y=fx_delta[ci],
+            marker_color=c["color"],
             opacity=0.85,
             hovertemplate=(
                 "<b>%{x}</b><br>"
@@ -2188,66 +2304,52 @@ try:
 
     # Summary table: full-year cost impact per scenario
     st.markdown("**📊 Full-year cost summary by FX scenario**")
-    st.caption("Revenue fixed in EUR. Lower TRY = cheaper costs = higher margin. Bear = best for your margins.")
+    st.caption("EUR-billed revenue is fixed; USD-billed revenue follows the curve. "
+               "Lower TRY = cheaper costs = higher margin. Bear = best for your margins.")
 
-    fy_impact = {}
-    fy_rev = sum(month_data[m]["rev"] for m in MONTHS)
+    fy_rev   = sum(month_data[m]["rev"] for m in MONTHS)
     bgt_cost = sum(month_data[m]["cost"] for m in MONTHS)
     bgt_margin_pct = (fy_rev - bgt_cost) / fy_rev * 100 if fy_rev else 0
-
-    for scen in ["Bear","Base","Bull"]:
-        rows    = [r for r in impact_rows if r["Scenario"] == scen]
-        fy_cost = sum(r["Cost EUR"] for r in rows)
-        fy_impact[scen] = {
-            "FY Cost EUR":  fy_cost,
-            "Cost Saving":  bgt_cost - fy_cost,   # positive = cheaper than budget
-            "FY Margin":    fy_rev - fy_cost,
-            "Margin %":     (fy_rev - fy_cost) / fy_rev * 100 if fy_rev else 0,
-        }
-
-    yr_ends  = {"Bear": proj_bear[-1], "Base": proj_base[-1], "Bull": proj_bull[-1]}
-    # Colour by outcome quality — Bear is best margin outcome (green), Bull is worst (red)
-    outcome_colors = {"Bear": "#10b981", "Base": "#3b82f6", "Bull": "#ef4444"}
-    icons = {"Bear": "🐻", "Base": "📊", "Bull": "🐂"}
-    scen_desc = {
-        "Bear": "TRY weakens most → lowest EUR costs → best margin",
-        "Base": "Moderate TRY depreciation → likely outcome",
-        "Bull": "TRY stays strong → highest EUR costs → lowest margin",
-    }
-
-    imp_cols = st.columns(3)
-    for col, scen in zip(imp_cols, ["Bear", "Base", "Bull"]):
-        d = fy_impact[scen]
-        saving   = d["Cost Saving"]          # positive = you save vs budget
-        mgn_diff = d["Margin %"] - bgt_margin_pct
-        color    = outcome_colors[scen]
-        save_arrow = "↑" if saving >= 0 else "↓"
-        save_color = "#10b981" if saving >= 0 else "#ef4444"
-        mgn_arrow  = "↑" if mgn_diff >= 0 else "↓"
-        mgn_color  = "#10b981" if mgn_diff >= 0 else "#ef4444"
-        col.markdown(
-            f"<div style='background:#1e2535;border:1px solid {color}44;"
-            f"border-radius:8px;padding:16px;text-align:center'>"
-            # Title row
-            f"<div style='color:{color};font-weight:700;font-size:13px'>"
-            f"{icons[scen]} {scen} Case · yr-end ₺{yr_ends[scen]:,.1f}</div>"
-            f"<div style='color:#5a6480;font-size:11px;margin-bottom:10px'>{scen_desc[scen]}</div>"
-            # FY Cost
-            f"<div style='color:#e8edf5;font-size:20px;font-weight:700'>€{d['FY Cost EUR']:,.0f}</div>"
-            f"<div style='color:#8b96b0;font-size:11px'>Full-year total cost</div>"
-            # Divider
-            f"<div style='border-top:1px solid #2a3347;margin:10px 0'></div>"
-            # Cost saving vs budget
-            f"<div style='color:#8b96b0;font-size:11px'>Cost saving vs budget FX</div>"
-            f"<div style='color:{save_color};font-size:15px;font-weight:700'>"
-            f"{save_arrow} €{abs(saving):,.0f}</div>"
-            # Margin
-            f"<div style='color:#8b96b0;font-size:11px;margin-top:6px'>"
-            f"Margin: <b style='color:{mgn_color}'>{d['Margin %']:.1f}%</b>"
-            f" <span style='color:{mgn_color};font-size:10px'>({mgn_arrow}{abs(mgn_diff):.1f}pp vs budget)</span>"
-            f"</div></div>",
-            unsafe_allow_html=True
-        )
+    fy_cost_c = fx_lines["cost"].sum(axis=-1)
+    fy_rev_c  = fx_lines["rev"].sum(axis=-1)                # moves with USD-billed blocks
+    fy_mgn_c  = fx_lines["margin"].sum(axis=-1)
+
+    for row0 in range(0, len(fx_curves), 3):
+        imp_cols = st.columns(3)
+        for col, ci in zip(imp_cols, range(row0, min(row0 + 3, len(fx_curves)))):
+            c = fx_curves[ci]
+            d = {"FY Cost EUR": fy_cost_c[ci], "Cost Saving": bgt_cost - fy_cost_c[ci],
+                 "Margin %":    fy_mgn_c[ci] / fy_rev_c[ci] * 100 if fy_rev_c[ci] else 0}
+            saving   = d["Cost Saving"]          # positive = you save vs budget
+            mgn_diff = d["Margin %"] - bgt_margin_pct
+            color    = c["outcome"]
+            save_arrow = "↑" if saving >= 0 else "↓"
+            save_color = "#10b981" if saving >= 0 else "#ef4444"
+            mgn_arrow  = "↑" if mgn_diff >= 0 else "↓"
+            mgn_color  = "#10b981" if mgn_diff >= 0 else "#ef4444"
+            col.markdown(
+                f"<div style='background:#1e2535;border:1px solid {color}44;"
+                f"border-radius:8px;padding:16px;text-align:center'>"
+                # Title row
+                f"<div style='color:{color};font-weight:700;font-size:13px'>"
+                f"{c['icon']} {c['key']} Case · yr-end ₺{c['rates'][-1]:,.1f}</div>"
+                f"<div style='color:#5a6480;font-size:11px;margin-bottom:10px'>{c['desc']}</div>"
+                # FY Cost
+                f"<div style='color:#e8edf5;font-size:20px;font-weight:700'>€{d['FY Cost EUR']:,.0f}</div>"
+                f"<div style='color:#8b96b0;font-size:11px'>Full-year total cost</div>"
+                # Divider
+                f"<div style='border-top:1px solid #2a3347;margin:10px 0'></div>"
+                # Cost saving vs budget
+                f"<div style='color:#8b96b0;font-size:11px'>Cost saving vs budget FX</div>"
+                f"<div style='color:{save_color};font-size:15px;font-weight:700'>"
+                f"{save_arrow} €{abs(saving):,.0f}</div>"
+                # Margin
+                f"<div style='color:#8b96b0;font-size:11px;margin-top:6px'>"
+                f"Margin: <b style='color:{mgn_color}'>{d['Margin %']:.1f}%</b>"
+                f" <span style='color:{mgn_color};font-size:10px'>({mgn_arrow}{abs(mgn_diff):.1f}pp vs budget)</span>"
+                f"</div></div>",
+                unsafe_allow_html=True
+            )
 
 except ImportError:
     st.info("Install plotly to see FX projection charts.")
@@ -2255,122 +2357,73 @@ except ImportError:
 # ── Scenario Planner ─────────────────────────────────────────
 st.divider()
 st.markdown("### 🎯 Scenario Planner")
-st.caption("Compare your current plan against two alternative scenarios. "
-           "Adjustments are applied on top of the current plan — no need to re-enter everything.")
-
-# ── Scenario inputs ──────────────────────────────────────────
-sp_col1, sp_col2 = st.columns(2)
-
-with sp_col1:
-    st.markdown("**📋 Scenario A**")
-    spa_name    = st.text_input("Name", value="Optimistic", key="spa_name")
-    spa_up_pct  = st.slider("Unit Price change %", -30, 30, 5, 1,
-                             key="spa_up", format="%d%%",
-                             help="Applies to all blocks. +5% = UP × 1.05")
-    spa_sal_pct = st.slider("Salary change %", -20, 50, 0, 1,
-                             key="spa_sal", format="%d%%",
-                             help="Salary cost multiplier across all blocks.")
-    spa_fx      = st.number_input("FX Rate override (0 = use current)",
-                                   value=0.0, step=0.5, min_value=0.0, key="spa_fx")
-    spa_att     = st.slider("Attrition rate %", 0, 30,
-                             int(st.session_state.get("attrition_rate", 0.05) * 100), 1,
-                             key="spa_att", format="%d%%")
-    spa_shrink  = st.slider("Shrinkage %", 0, 40,
-                             int(g["shrink"] * 100), 1,
-                             key="spa_shrink", format="%d%%")
-
-with sp_col2:
-    st.markdown("**📋 Scenario B**")
-    spb_name    = st.text_input("Name", value="Conservative", key="spb_name")
-    spb_up_pct  = st.slider("Unit Price change %", -30, 30, -5, 1,
-                             key="spb_up", format="%d%%")
-    spb_sal_pct = st.slider("Salary change %", -20, 50, 10, 1,
-                             key="spb_sal", format="%d%%")
-    spb_fx      = st.number_input("FX Rate override (0 = use current)",
-                                   value=0.0, step=0.5, min_value=0.0, key="spb_fx")
-    spb_att     = st.slider("Attrition rate %", 0, 30,
-                             int(st.session_state.get("attrition_rate", 0.05) * 100), 1,
-                             key="spb_att", format="%d%%")
-    spb_shrink  = st.slider("Shrinkage %", 0, 40,
-                             int(g["shrink"] * 100), 1,
-                             key="spb_shrink", format="%d%%")
-
-# Build override dicts
-def _make_so(up_pct, sal_pct, fx_val, att_pct, shrink_pct):
-    so = {
-        "up_pct":  1 + up_pct / 100,
-        "sal_pct": 1 + sal_pct / 100,
-        "attrition": att_pct / 100,
-        "shrink":    shrink_pct / 100,
-    }
-    if fx_val > 0:
-        so["fx_override"] = fx_val
-    return so
-
-so_a = _make_so(spa_up_pct, spa_sal_pct, spa_fx, spa_att, spa_shrink)
-so_b = _make_so(spb_up_pct, spb_sal_pct, spb_fx, spb_att, spb_shrink)
-
-# Compute scenario month data
-scen_a = {m: get_totals_scenario(m, g, so_a) for m in MONTHS}
-scen_b = {m: get_totals_scenario(m, g, so_b) for m in MONTHS}
-
-# ── Full-year summary cards ───────────────────────────────────
+st.caption("Compare your current plan against any number of named scenarios. "
+           "Adjustments are applied on top of the current plan — no need to re-enter everything. "
+           "Add a row per commercial option; blank attrition / shrinkage keeps the plan's value.")
+
+# ── Scenario library ─────────────────────────────────────────
+# Any number of named scenarios per client, stored on the client. Results are
+# cached per (budget, scenario) — editing one row recomputes only that scenario.
+SCEN_COLORS = ["#3b82f6", "#f59e0b", "#10b981", "#a855f7", "#ef4444", "#06b6d4", "#ec4899", "#84cc16"]
+SCEN_COLS = {"Scenario": "name", "UP %": "up_pct", "Salary %": "sal_pct", "HC %": "hc_pct",
+             "FX (0 = current)": "fx", "Attrition %": "attrition", "Shrinkage %": "shrink"}
+_sc_key = client_key("_sc_rows")
+if _sc_key not in st.session_state:
+    st.session_state[_sc_key] = pd.DataFrame(
+        [{col: sc.get(f) for col, f in SCEN_COLS.items()} for sc in client()["scenarios"]],
+        columns=list(SCEN_COLS))
+sc_rows = st.data_editor(
+    st.session_state[_sc_key], num_rows="dynamic", hide_index=True,
+    use_container_width=True, key=client_key("sc_edit"),
+    column_config={
+        "Scenario":         st.column_config.TextColumn(required=True),
+        "UP %":             st.column_config.NumberColumn(help="Unit price change on all blocks. +5 = UP × 1.05"),
+        "Salary %":         st.column_config.NumberColumn(help="Salary cost change across all blocks."),
+        "HC %":             st.column_config.NumberColumn(help="Headcount change across all blocks."),
+        "FX (0 = current)": st.column_config.NumberColumn(min_value=0.0, help="EUR/TRY for every block."),
+        "Attrition %":      st.column_config.NumberColumn(min_value=0.0, max_value=100.0,
+                                                          help="Blank = sidebar attrition."),
+        "Shrinkage %":      st.column_config.NumberColumn(min_value=0.0, max_value=99.0,
+                                                          help="Blank = current shrinkage."),
+    })
+library = []
+for _, row in sc_rows.iterrows():
+    name = str(row["Scenario"] or "").strip() if pd.notna(row["Scenario"]) else ""
+    if not name:
+        continue
+    sc = {"name": name}
+    for col, f in list(SCEN_COLS.items())[1:]:
+        v = row[col]
+        sc[f] = None if pd.isna(v) else float(v)
+        if f in ("up_pct", "sal_pct", "hc_pct", "fx") and sc[f] is None:
+            sc[f] = 0.0
+    library.append(sc)
+client()["scenarios"] = library
+
+scen_years = get_scenario_years(g, [engine.scenarios.make_overlay(sc) for sc in library])
+scen_names = [sc["name"] for sc in library]
+scen_color = lambda i: SCEN_COLORS[i % len(SCEN_COLORS)]
+
+# ── Full-year summary ─────────────────────────────────────────
 st.markdown("#### Full-Year Summary")
-fy_base = {k: sum(month_data[m].get(k,0) for m in MONTHS)
-           for k in ["rev","cost","margin","hc","hrs_billable"]}
-fy_a    = {k: sum(scen_a[m].get(k,0)     for m in MONTHS)
-           for k in ["rev","cost","margin","hc","hrs_billable"]}
-fy_b    = {k: sum(scen_b[m].get(k,0)     for m in MONTHS)
-           for k in ["rev","cost","margin","hc","hrs_billable"]}
-
+_fy_of = lambda year: {k: sum(year[m].get(k, 0) for m in MONTHS) for k in ["rev","cost","margin","hc","hrs_billable"]}
 def _mgn_pct(d): return d["margin"]/d["rev"]*100 if d["rev"] else 0
 
-def _scen_card(col, label, d, base_d, color):
-    mgn  = _mgn_pct(d)
-    b_mgn = _mgn_pct(base_d)
-    rev_delta  = d["rev"]    - base_d["rev"]
-    mgn_delta  = mgn - b_mgn
-    cost_delta = d["cost"]   - base_d["cost"]
-    rc = "#10b981" if rev_delta  >= 0 else "#ef4444"
-    mc = "#10b981" if mgn_delta  >= 0 else "#ef4444"
-    cc = "#10b981" if cost_delta <= 0 else "#ef4444"
-    col.markdown(
-        f"<div style='background:#1e2535;border:1px solid {color}55;"
-        f"border-radius:8px;padding:16px;text-align:center'>"
-        f"<div style='color:{color};font-weight:700;font-size:14px;margin-bottom:10px'>{label}</div>"
-        f"<div style='display:grid;grid-template-columns:1fr 1fr;gap:8px'>"
-        f"<div><div style='color:#8b96b0;font-size:10px'>Revenue</div>"
-        f"<div style='color:#e8edf5;font-size:15px;font-weight:700'>€{d['rev']:,.0f}</div>"
-        f"<div style='color:{rc};font-size:11px'>{'↑' if rev_delta>=0 else '↓'} €{abs(rev_delta):,.0f}</div></div>"
-        f"<div><div style='color:#8b96b0;font-size:10px'>Total Cost</div>"
-        f"<div style='color:#e8edf5;font-size:15px;font-weight:700'>€{d['cost']:,.0f}</div>"
-        f"<div style='color:{cc};font-size:11px'>{'↑' if cost_delta>=0 else '↓'} €{abs(cost_delta):,.0f}</div></div>"
-        f"<div><div style='color:#8b96b0;font-size:10px'>Gross Margin</div>"
-        f"<div style='color:#e8edf5;font-size:15px;font-weight:700'>€{d['margin']:,.0f}</div>"
-        f"<div style='color:{mc};font-size:11px'>{'↑' if mgn_delta>=0 else '↓'} {abs(mgn_delta):.1f}pp</div></div>"
-        f"<div><div style='color:#8b96b0;font-size:10px'>Margin %</div>"
-        f"<div style='color:{mc};font-size:18px;font-weight:700'>{mgn:.1f}%</div>"
-        f"<div style='color:#8b96b0;font-size:11px'>base: {b_mgn:.1f}%</div></div>"
-        f"</div></div>", unsafe_allow_html=True
-    )
-
-sc1, sc2, sc3 = st.columns(3)
-sc1.markdown("<div style='background:#1e2535;border:1px solid #5a648055;border-radius:8px;"
-             "padding:16px;text-align:center'>"
-             "<div style='color:#8b96b0;font-weight:700;font-size:14px;margin-bottom:10px'>"
-             "📌 Base Plan</div>"
-             f"<div style='display:grid;grid-template-columns:1fr 1fr;gap:8px'>"
-             f"<div><div style='color:#8b96b0;font-size:10px'>Revenue</div>"
-             f"<div style='color:#e8edf5;font-size:15px;font-weight:700'>€{fy_base['rev']:,.0f}</div></div>"
-             f"<div><div style='color:#8b96b0;font-size:10px'>Total Cost</div>"
-             f"<div style='color:#e8edf5;font-size:15px;font-weight:700'>€{fy_base['cost']:,.0f}</div></div>"
-             f"<div><div style='color:#8b96b0;font-size:10px'>Gross Margin</div>"
-             f"<div style='color:#e8edf5;font-size:15px;font-weight:700'>€{fy_base['margin']:,.0f}</div></div>"
-             f"<div><div style='color:#8b96b0;font-size:10px'>Margin %</div>"
-             f"<div style='color:#e8edf5;font-size:18px;font-weight:700'>{_mgn_pct(fy_base):.1f}%</div></div>"
-             f"</div></div>", unsafe_allow_html=True)
-_scen_card(sc2, f"🅰 {spa_name}", fy_a, fy_base, "#3b82f6")
-_scen_card(sc3, f"🅱 {spb_name}", fy_b, fy_base, "#f59e0b")
+fy_base = _fy_of(month_data)
+fy_scen = [_fy_of(y) for y in scen_years]
+sum_rows = [{"Scenario": "📌 Base Plan", "Revenue": fmt_eur(fy_base["rev"]), "Total Cost": fmt_eur(fy_base["cost"]),
+             "Gross Margin": fmt_eur(fy_base["margin"]), "Margin %": f"{_mgn_pct(fy_base):.1f}%",
+             "Δ Margin": "—", "Δ pp": "—"}]
+for name, d in zip(scen_names, fy_scen):
+    sum_rows.append({"Scenario": name, "Revenue": fmt_eur(d["rev"]), "Total Cost": fmt_eur(d["cost"]),
+                     "Gross Margin": fmt_eur(d["margin"]), "Margin %": f"{_mgn_pct(d):.1f}%",
+                     "Δ Margin": f"{'+' if d['margin'] >= fy_base['margin'] else '−'}€{abs(d['margin'] - fy_base['margin']):,.0f}",
+                     "Δ pp": f"{_mgn_pct(d) - _mgn_pct(fy_base):+.1f}pp"})
+st.dataframe(pd.DataFrame(sum_rows).set_index("Scenario"), use_container_width=True)
+if fy_scen:
+    best = max(range(len(fy_scen)), key=lambda i: fy_scen[i]["margin"])
+    st.caption(f"Best margin: **{scen_names[best]}** — €{fy_scen[best]['margin']:,.0f} "
+               f"({_mgn_pct(fy_scen[best]):.1f}%)")
 
 # ── Month-by-month comparison table ──────────────────────────
 st.markdown("#### Month-by-Month Comparison")
@@ -2395,8 +2448,6 @@ try:
         return data[m].get(_metric_key, 0)
 
     base_vals = [_get_val(month_data, m) for m in MONTHS]
-    a_vals    = [_get_val(scen_a, m)     for m in MONTHS]
-    b_vals    = [_get_val(scen_b, m)     for m in MONTHS]
 
     fig_sp = _spgo.Figure()
     fig_sp.add_trace(_spgo.Scatter(
@@ -2404,19 +2455,13 @@ try:
         mode="lines+markers", line=dict(color="#5a6480", width=2, dash="dot"),
         marker=dict(size=5), hovertemplate=f"Base<br>%{{x}}: %{{y:,.1f}}<extra></extra>",
     ))
-    fig_sp.add_trace(_spgo.Scatter(
-        name=f"🅰 {spa_name}", x=MONTHS, y=a_vals,
-        mode="lines+markers", line=dict(color="#3b82f6", width=2.5),
-        marker=dict(size=6),
-        fill="tonexty", fillcolor="rgba(59,130,246,0.06)",
-        hovertemplate=f"{spa_name}<br>%{{x}}: %{{y:,.1f}}<extra></extra>",
-    ))
-    fig_sp.add_trace(_spgo.Scatter(
-        name=f"🅱 {spb_name}", x=MONTHS, y=b_vals,
-        mode="lines+markers", line=dict(color="#f59e0b", width=2.5),
-        marker=dict(size=6),
-        hovertemplate=f"{spb_name}<br>%{{x}}: %{{y:,.1f}}<extra></extra>",
-    ))
+    for i, (name, year) in enumerate(zip(scen_names, scen_years)):
+        fig_sp.add_trace(_spgo.Scatter(
+            name=name, x=MONTHS, y=[_get_val(year, m) for m in MONTHS],
+            mode="lines+markers", line=dict(color=scen_color(i), width=2.5),
+            marker=dict(size=6),
+            hovertemplate=f"{name}<br>%{{x}}: %{{y:,.1f}}<extra></extra>",
+        ))
     fig_sp.update_layout(
         plot_bgcolor="#0e1420", paper_bgcolor="#0e1420",
         font=dict(color="#8b96b0", family="Inter, sans-serif"),
@@ -2435,27 +2480,154 @@ try:
 
     # Detailed monthly table
     with st.expander("📋 Full monthly breakdown table", expanded=False):
-        import pandas as _sppd
+        fmt = lambda v: f"{v:,.1f}%" if "%" in _metric else f"€{v:,.0f}"
         rows_sp = []
         for m in MONTHS:
             bv = _get_val(month_data, m)
-            av = _get_val(scen_a, m)
-            bv2= _get_val(scen_b, m)
-            fmt = lambda v: f"{v:,.1f}%" if "%" in _metric else f"€{v:,.0f}"
-            rows_sp.append({
-                "Month":          m,
-                "📌 Base":        fmt(bv),
-                f"🅰 {spa_name}": fmt(av),
-                f"Δ A vs Base":   f"{'+'if av>=bv else ''}{av-bv:,.1f}{'%' if '%' in _metric else '€'}",
-                f"🅱 {spb_name}": fmt(bv2),
-                f"Δ B vs Base":   f"{'+'if bv2>=bv else ''}{bv2-bv:,.1f}{'%' if '%' in _metric else '€'}",
-            })
-        st.dataframe(_sppd.DataFrame(rows_sp).set_index("Month"),
+            r  = {"Month": m, "📌 Base": fmt(bv)}
+            for name, year in zip(scen_names, scen_years):
+                av = _get_val(year, m)
+                r[name]            = fmt(av)
+                r[f"Δ {name}"]     = f"{'+'if av>=bv else ''}{av-bv:,.1f}{'%' if '%' in _metric else '€'}"
+            rows_sp.append(r)
+        st.dataframe(pd.DataFrame(rows_sp).set_index("Month"),
                      use_container_width=True)
 
 except ImportError:
     st.info("Install plotly to see scenario charts.")
 
+# ── Monte Carlo risk ─────────────────────────────────────────
+st.markdown("#### 🎲 Monte Carlo Risk")
+st.caption("Thousands of joint draws of the EUR/TRY path, attrition, shrinkage and unit price "
+           "around the current plan. Per-block FX / attrition / shrinkage overrides are kept.")
+
+_rk = engine.montecarlo.DEFAULT_RISK
+mc1, mc2, mc3, mc4, mc5, mc6 = st.columns(6)
+mc_n      = mc1.select_slider("Draws", [10_000, 20_000, 50_000, 100_000], value=20_000, key="mc_n")
+mc_drift  = mc2.number_input("FX drift %/yr", value=_rk["fx_drift"] * 100, step=5.0, key="mc_drift",
+                             help="Expected EUR/TRY change over the year. +25% = TRY weakens 25%.")
+mc_vol    = mc3.number_input("FX volatility %/yr", value=_rk["fx_vol"] * 100, step=1.0, min_value=0.0,
+                             key="mc_vol", help="Annualised volatility of the monthly EUR/TRY path.")
+mc_att_sd = mc4.number_input("Attrition ± pts", value=_rk["attrition_sd"] * 100, step=0.5, min_value=0.0,
+                             key="mc_att_sd", help="Std. deviation of the monthly attrition rate.")
+mc_shr_sd = mc5.number_input("Shrinkage ± pts", value=_rk["shrink_sd"] * 100, step=0.5, min_value=0.0,
+                             key="mc_shr_sd", help="Std. deviation of shrinkage.")
+mc_up_sd  = mc6.number_input("Unit price ± %", value=_rk["up_sd"] * 100, step=0.5, min_value=0.0,
+                             key="mc_up_sd", help="Std. deviation of the unit price change.")
+
+mc_res = get_monte_carlo(g, mc_n, dict(fx_drift=mc_drift / 100, fx_vol=mc_vol / 100,
+                                      attrition_sd=mc_att_sd / 100, shrink_sd=mc_shr_sd / 100,
+                                      up_sd=mc_up_sd / 100))
+mc_sum = engine.montecarlo.summarize(mc_res)
+mcm1, mcm2, mcm3, mcm4 = st.columns(4)
+for col, q, label in [(mcm1, 5, "P5 margin (bad case)"), (mcm2, 50, "P50 margin"), (mcm3, 95, "P95 margin (good case)")]:
+    col.metric(label, fmt_eur(mc_sum["margin"][q]), delta=fmt_pct(mc_sum["margin_pct"][q]), delta_color="off")
+mcm4.metric("Probability of loss", fmt_pct(mc_sum["p_loss"]),
+            delta=f"{mc_sum['n']:,} draws", delta_color="off")
+
+try:
+    import plotly.graph_objects as _mcgo
+    fig_mc = _mcgo.Figure()
+    fig_mc.add_trace(_mcgo.Histogram(x=mc_res["margin"], nbinsx=60, marker_color="#3b82f6", opacity=0.85,
+                                     hovertemplate="Margin €%{x:,.0f}<br>%{y} draws<extra></extra>"))
+    fig_mc.add_vline(x=0, line_color="#ef4444", line_width=1.5)
+    for q, dash in [(5, "dot"), (50, "dash"), (95, "dot")]:
+        fig_mc.add_vline(x=mc_sum["margin"][q], line_dash=dash, line_color="#8b96b0",
+                         annotation_text=f"P{q}", annotation_font_color="#8b96b0")
+    fig_mc.update_layout(
+        title=dict(text="Full-year gross margin distribution (EUR)", font=dict(color="#e8edf5", size=13)),
+        plot_bgcolor="#0e1420", paper_bgcolor="#0e1420", font=dict(color="#8b96b0"),
+        margin=dict(l=10, r=10, t=50, b=10), height=300, bargap=0.02, showlegend=False,
+        xaxis=dict(showgrid=False, tickprefix="€"),
+        yaxis=dict(showgrid=True, gridcolor="#1e2535", title=dict(text="Draws", font=dict(size=10))),
+        hoverlabel=dict(bgcolor="#1e2535", bordercolor="#2a3347", font=dict(color="#e8edf5")),
+    )
+    st.plotly_chart(fig_mc, use_container_width=True)
+except ImportError:
+    pass
+
+# ── Sensitivity tornado ──────────────────────────────────────
+st.markdown("#### 🌪 Sensitivity — Which Driver Matters Most")
+st.caption("Each driver moved down and up by the same %, everything else at plan. "
+           "Bars show the full-year margin change; drivers ranked by total swing.")
+tn1, tn2 = st.columns(2)
+tn_pct = tn1.slider("Move each driver by ±", 1, 50, 10, 1, format="%d%%", key="tn_pct")
+tn_top = tn2.slider("Drivers shown", 5, 40, 15, 1, key="tn_top")
+tn_base, tn_rows = get_tornado(g, tn_pct / 100)
+tn_rows = [r for r in tn_rows if r["swing"] > 0][:tn_top]
+
+if tn_rows:
+    try:
+        import plotly.graph_objects as _tngo
+        tn_labels = [r["label"] for r in tn_rows][::-1]
+        fig_tn = _tngo.Figure()
+        for side, color, name in [("low", "#ef4444", f"−{tn_pct}%"), ("high", "#10b981", f"+{tn_pct}%")]:
+            fig_tn.add_trace(_tngo.Bar(
+                name=name, y=tn_labels, x=[r[side] for r in tn_rows][::-1], orientation="h",
+                marker_color=color, opacity=0.85,
+                hovertemplate=f"%{{y}} {name}<br>Margin Δ <b>€%{{x:+,.0f}}</b><extra></extra>"))
+        fig_tn.add_vline(x=0, line_color="#5a6480", line_width=1)
+        fig_tn.update_layout(
+            title=dict(text=f"FY margin impact vs plan (€{tn_base:,.0f})", font=dict(color="#e8edf5", size=13)),
+            barmode="overlay", plot_bgcolor="#0e1420", paper_bgcolor="#0e1420",
+            font=dict(color="#8b96b0"), legend=dict(orientation="h", y=1.08, bgcolor="rgba(0,0,0,0)"),
+            margin=dict(l=10, r=10, t=50, b=10), height=max(300, 26 * len(tn_rows) + 80),
+            xaxis=dict(showgrid=True, gridcolor="#1e2535", tickprefix="€", zeroline=False),
+            yaxis=dict(showgrid=False),
+            hoverlabel=dict(bgcolor="#1e2535", bordercolor="#2a3347", font=dict(color="#e8edf5")),
+        )
+        st.plotly_chart(fig_tn, use_container_width=True)
+    except ImportError:
+        st.dataframe(pd.DataFrame([{"Driver": r["label"], f"−{tn_pct}%": fmt_eur(r["low"]),
+                                    f"+{tn_pct}%": fmt_eur(r["high"])} for r in tn_rows]).set_index("Driver"),
+                     use_container_width=True)
+else:
+    st.info("Add blocks to see which drivers move the margin.", icon="ℹ️")
+
+# ── Sensitivity heatmap ──────────────────────────────────────
+st.markdown("#### 🗺 Sensitivity Heatmap")
+st.caption("Full-year result for every combination of two drivers (40 × 40 grid), "
+           "computed in one pass over the whole budget.")
+hm1, hm2, hm3 = st.columns(3)
+hm_grid   = hm1.radio("Grid", ["Unit price × EUR/TRY", "HC × salary"], horizontal=True, key="hm_grid")
+hm_metric = hm2.radio("Show", ["FY margin %", "Break-even €/hr"], horizontal=True, key="hm_metric")
+hm_range  = hm3.slider("Range ±", 5, 50, 30, 5, format="%d%%", key="hm_range") / 100
+HM_N = 40
+_hm_lin = lambda a, b: [a + (b - a) * i / (HM_N - 1) for i in range(HM_N)]
+if hm_grid.startswith("Unit"):
+    hm_x = ("up_pct", _hm_lin(1 - hm_range, 1 + hm_range))
+    hm_y = ("fx",     _hm_lin(g["fx"] * (1 - hm_range), g["fx"] * (1 + hm_range)))
+    hm_xl, hm_yl = "Unit price change", "EUR/TRY"
+else:
+    hm_x = ("hc_pct",  _hm_lin(1 - hm_range, 1 + hm_range))
+    hm_y = ("sal_pct", _hm_lin(1 - hm_range, 1 + hm_range))
+    hm_xl, hm_yl = "HC change", "Salary change"
+hm = get_heatmap(g, hm_x, hm_y)
+
+try:
+    import plotly.graph_objects as _hmgo
+    pct_axis = lambda v: [f"{(x - 1) * 100:+.0f}%" for x in v]
+    hm_xs = pct_axis(hm_x[1])
+    hm_ys = [f"₺{v:,.1f}" for v in hm_y[1]] if hm_y[0] == "fx" else pct_axis(hm_y[1])
+    if hm_metric.startswith("FY"):
+        hm_z, hm_fmt, hm_scale = hm["margin_pct"] * 100, "%{z:.1f}%", "RdYlGn"
+    else:
+        hm_z, hm_fmt, hm_scale = hm["breakeven"], "€%{z:.2f}/hr", "RdYlGn_r"
+    fig_hm = _hmgo.Figure(_hmgo.Heatmap(
+        z=hm_z, x=hm_xs, y=hm_ys, colorscale=hm_scale,
+        zmid=0 if hm_metric.startswith("FY") else None,
+        hovertemplate=f"{hm_xl} %{{x}}<br>{hm_yl} %{{y}}<br>{hm_metric}: <b>{hm_fmt}</b><extra></extra>"))
+    fig_hm.update_layout(
+        plot_bgcolor="#0e1420", paper_bgcolor="#0e1420", font=dict(color="#8b96b0"),
+        margin=dict(l=10, r=10, t=30, b=10), height=460,
+        xaxis=dict(title=dict(text=hm_xl, font=dict(size=11)), showgrid=False),
+        yaxis=dict(title=dict(text=hm_yl, font=dict(size=11)), showgrid=False),
+        hoverlabel=dict(bgcolor="#1e2535", bordercolor="#2a3347", font=dict(color="#e8edf5")),
+    )
+    st.plotly_chart(fig_hm, use_container_width=True)
+except ImportError:
+    st.info("Install plotly to see the sensitivity heatmap.")
+
 # ── Charts ───────────────────────────────────────────────────
 st.divider()
 st.markdown("### 📊 Performance Charts")
@@ -2617,6 +2789,47 @@ else:
         )
         st.plotly_chart(fig_hc, use_container_width=True)
 
+    # ── Weekly / daily view ──────────────────────────────────
+    st.markdown("#### 📆 Weekly / Daily View")
+    st.caption("The P&L computed on a finer time axis (a disaggregation, not a split of the monthly "
+               "figures). Weeks run from Jan 1 and are split at month ends. Hiring waves and dated changes "
+               "land on their day and overhead HC is ceiled per period, so hires, CAPEX and overhead "
+               "may not add up exactly to the monthly P&L.")
+    pv1, pv2, pv3 = st.columns([1, 2, 1])
+    pv_gran   = pv1.radio("Granularity", ["week", "day"], horizontal=True, key="pv_gran",
+                          format_func=str.title)
+    PV_METRICS = {"Revenue (EUR)": "rev", "Cost (EUR)": "cost", "Margin (EUR)": "margin",
+                  "HC": "hc", "Billable hrs": "hrs_billable"}
+    pv_metric = pv2.radio("Metric", list(PV_METRICS), horizontal=True, key="pv_metric")
+    pv_year   = pv3.number_input("Calendar year", value=_dt.date.today().year, step=1,
+                                 min_value=2000, max_value=2100, key="pv_year")
+    pv_axis, pv_lines = get_period_lines(g, pv_gran, int(pv_year))
+    pv_key = PV_METRICS[pv_metric]
+    pv_y   = pv_lines[pv_key].tolist()
+    fig_pv = go.Figure(go.Bar(
+        x=pv_axis["labels"], y=pv_y,
+        marker_color=["#ef4444" if (pv_key == "margin" and v < 0) else "#3b82f6" for v in pv_y],
+        hovertemplate="%{x}: %{y:,.0f}<extra></extra>",
+    ))
+    fig_pv.update_layout(
+        plot_bgcolor="#0e1420", paper_bgcolor="#0e1420",
+        font=dict(color="#8b96b0"),
+        margin=dict(l=10, r=10, t=20, b=10), height=280, bargap=0.1,
+        xaxis=dict(showgrid=False, type="category", tickangle=-45,
+                   nticks=min(len(pv_y), 60)),
+        yaxis=dict(showgrid=True, gridcolor="#1e2535", title=""),
+        showlegend=False,
+        hoverlabel=dict(bgcolor="#1e2535", bordercolor="#2a3347"),
+    )
+    st.plotly_chart(fig_pv, use_container_width=True)
+    pv_df = pd.DataFrame({"Period": pv_axis["labels"], "Days": pv_axis["days"].astype(int),
+                          "HC": pv_lines["hc"], "Revenue (EUR)": pv_lines["rev"],
+                          "Cost (EUR)": pv_lines["cost"], "Margin (EUR)": pv_lines["margin"]})
+    with st.expander(f"📋 {'Weekly' if pv_gran == 'week' else 'Daily'} table ({len(pv_df)} periods)", expanded=False):
+        st.dataframe(pv_df.set_index("Period").style.format(
+            {"HC": "{:,.1f}", "Revenue (EUR)": "€{:,.0f}", "Cost (EUR)": "€{:,.0f}", "Margin (EUR)": "€{:,.0f}"}),
+            use_container_width=True)
+
 st.divider()
 
 # ── Formula Reference ─────────────────────────────────────────
@@ -2659,7 +2872,7 @@ with st.expander("📐 Formula Reference — How Calculations Work", expanded=Fa
     with col_a:
         section("⏱ Hours & Productivity")
         row("Gross hours / agent",    "hours_per_month",
-            "Global setting. Default 160 hrs/mo.")
+            "Global setting. Default 160 hrs/mo. Dated changes to hours / FX / shrinkage are prorated by day.")
         row("Shrinkage",              "shrink %  (global or per-block override)",
             "Accounts for breaks, sick leave, training, etc.")
         row("Effective hours / agent","gross_hours × (1 − shrink)",
@@ -2668,6 +2881,8 @@ with st.expander("📐 Formula Reference — How Calculations Work", expanded=Fa
             "Sum across all production blocks for the month.")
         row("COLA-adjusted UP",       "base_UP  if month < COLA date",
             "Prorated in transition month: (days_old×old_UP + days_new×new_UP) ÷ days_in_month")
+        row("Raise-adjusted salary",  "base_salary × (1 + raise %)  from raise date",
+            "Prorated by day in the transition month, like COLA.")
         row("HC ramp",                "hc_ramp[month]  if set,  else block base HC",
             "Per-block monthly override. Blank = use base HC.")
 
@@ -2766,3 +2981,25 @@ with st.expander("📐 Formula Reference — How Calculations Work", expanded=Fa
             "Revenue stays fixed in EUR. Only cost base shifts with FX movement.")
 
 st.caption("CC Budget Tool · Streamlit · openpyxl · plotly")
+_cs = totals_cache().stats()
+st.caption(f"Engine cache: {_cs['hits']} hits · {_cs['misses']} misses "
+           f"({_cs['hit_rate']*100:.0f}% hit rate) · {_cs['size']}/{_cs['maxsize']} entries · "
+           f"last recompute: {', '.join(month_tracker().last_dirty) or 'none'}")
+
+# ── Persist (write-behind) ───────────────────────────────────
+# Only rows that changed since the last save are queued; the writer thread does the I/O.
+# A loaded client's summary carries its pricing record, so the portfolio can price
+# it under any settings next session without loading its blocks.
+_store = budget_store()
+for _i, _cl in enumerate(st.session_state.clients):
+    _store.save(_cl, pos=_i, summary=None if is_stub(_cl) else dict(
+        n_blocks=sum(len(v) for v in _cl["blocks"].values()),
+        pricing=engine.pricing_record(_cl, client_stats(_cl, client_settings(_cl, g)))))
+# Sidebar settings belong to the client the sidebar was drawn for
+_cl  = _set_cl
+_set = dict(hours=g_hours, shrink=g_shrink, ctc=g_ctc, bonus_pct=g_bonus_pct, meal=g_meal,
+            attrition_rate=attrition_pct, backfill_efficiency=bf_efficiency)
+_store.save_settings(_cl["client_id"], _set)
+st.session_state["_saved_settings"][_cl["client_id"]] = _set
+if _store.error:
+    st.sidebar.warning(f"Saving failed — changes are kept in this session only. ({_store.error})")
@@ -0,0 +1,36 @@
+"""Batch CLI: a folder of filled templates → one long CSV, failures reported."""
+
+import csv
+import pandas as pd
+import pytest
+
+from ccbudget import batch
+from ccbudget.engine import DEFAULT_SETTINGS, default_budget, make_settings, year_totals
+from ccbudget.importer import parse_workbook, apply_import
+
+def _template(path, rows):
+    cols = ["Month", "Language", "HC *", "Base Salary (TRY) *", "Unit Price (EUR/hr) *", "COLA Date",
+            "COLA New UP (EUR/hr)"]
+    pd.DataFrame(rows, columns=cols).to_excel(path, sheet_name="② Budget Data", startrow=2, index=False)
+
+def test_folder_to_long_csv(tmp_path):
+    _template(tmp_path / "alpha.xlsx", [["Jan", "DE", 30, 42000, 22.0, "2026-04-15", 24.0],
+                                        ["",    "EN", 10, 30000, 14.0, None, None],
+                                        ["Feb", "DE", 32, 42000, 22.0, None, None]])
+    _template(tmp_path / "beta.xlsx", [["Mar", "TR", 8, 25000, 11.0, None, None]])
+    (tmp_path / "broken.xlsx").write_bytes(b"not a workbook")
+    out = tmp_path / "out.csv"
+    assert batch.main([str(tmp_path), "-o", str(out), "-j", "2", "--fx", "40"]) == 1     # broken.xlsx
+    rows = list(csv.DictReader(open(out)))
+    assert {r["client"] for r in rows} == {"alpha", "beta"}
+    s    = make_settings(dict(DEFAULT_SETTINGS, fx=40.0))
+    want = year_totals(apply_import(default_budget("alpha"), parse_workbook(tmp_path / "alpha.xlsx")), s)
+    got  = {(r["month"], r["line"]): float(r["value"]) for r in rows if r["client"] == "alpha"}
+    for m in ("Jan", "Apr", "Dec"):
+        for line in ("rev", "cost", "margin", "hc"):
+            assert got[(m, line)] == pytest.approx(want[m][line]), (m, line)
+    assert got[("Feb", "oh_TM_hc")] == 4
+
+def test_empty_folder_is_an_error(tmp_path):
+    assert batch.main([str(tmp_path)]) == 1
+    assert batch.main([str(tmp_path / "missing")]) == 1
@@ -0,0 +1,112 @@
+"""Typed block records: dict compatibility, versions, masters with monthly deltas,
+stable ids and schema upgrades."""
+
+import copy
+import pytest
+
+from ccbudget.engine import (MONTHS, BLOCK_SCHEMA, BLOCK_FIELDS, Block, BlockView, default_budget, load_blocks,
+                             copy_month, apply_to_all, rekey_positions)
+
+def test_block_reads_and_writes_like_a_dict():
+    b = Block(lang="DE", hc=30, salary=42000, note="night shift")
+    assert not hasattr(b, "__dict__")
+    assert (b["hc"], b.get("fx_override"), b.get("fx_override", 38.0), b["note"]) == (30, None, 38.0, "night shift")
+    with pytest.raises(KeyError):
+        b["fx_override"]
+    assert "fx_override" not in b and "hc" in b
+    b.update(hc=35, fx_override=40.0)
+    del b["note"]
+    assert dict(b) == dict(lang="DE", hc=35, salary=42000, unit_price=0, fx_override=40.0, id=b.id)
+    assert b.to_dict().keys() == {f for f, _ in BLOCK_FIELDS}
+    assert b.record()[:3] == ("DE", 35, 42000)
+
+def test_every_write_stamps_a_new_version():
+    b  = Block(lang="DE", hc=30)
+    k0 = b.key()
+    b["hc"] = 30
+    k1 = b.key()
+    del b["hc"]
+    assert len({k0, k1, b.key()}) == 3 and k0[0] == k1[0] == b.id
+
+def test_copies_are_independent():
+    b = Block(lang="DE", hc=30, hc_ramp={"Mar": 5}, extra={"x": 1})
+    c = copy.deepcopy(b)
+    c["hc_ramp"]["Mar"] = 9
+    c["extra"]["x"] = 2
+    assert (b["hc_ramp"], b["extra"], c.id) == ({"Mar": 5}, {"x": 1}, b.id)
+
+def test_schema_0_dict_loads_with_percent_shrink_normalised():
+    b = Block.load(dict(lang="EN", hc=10, shrink_override=15.0, fx_override=None))
+    assert isinstance(b, Block) and b.id
+    assert b["shrink_override"] == pytest.approx(0.15)
+    assert Block.load(b) is b
+
+# ── Masters and monthly deltas ──
+def _schema0():
+    """Twelve months of plain dicts: DE steady with one HC bump, EN from April."""
+    de = dict(lang="DE", hc=30, salary=42000, unit_price=22.0)
+    en = dict(lang="EN", hc=10, salary=30000, unit_price=14.0, shrink_override=12.0)
+    blocks = {m: [dict(de)] + ([dict(en)] if i >= 3 else []) for i, m in enumerate(MONTHS)}
+    blocks["May"][0]["hc"] = 36
+    return dict(default_budget(), blocks=blocks, block_schema=0)
+
+def test_schema_0_round_trips_through_masters_and_deltas():
+    legacy = _schema0()
+    b = load_blocks(copy.deepcopy(legacy))
+    assert b["block_schema"] == BLOCK_SCHEMA
+    for m in MONTHS:
+        want = [Block.load(x).to_dict() for x in legacy["blocks"][m]]
+        assert [{**v.to_dict(), "id": None} for v in b["blocks"][m]] == [{**w, "id": None} for w in want], m
+    views = [v for m in MONTHS for v in b["blocks"][m]]
+    assert len({id(v.master) for v in views}) == 2                  # one master per block, not per month
+    assert [m for m in MONTHS if b["blocks"][m][0].delta] == ["May"]
+    assert b["blocks"]["May"][0].delta == {"hc": 36}
+    assert load_blocks(b)["blocks"]["May"][0] is b["blocks"]["May"][0]   # idempotent
+
+def test_schema_1_blocks_per_month_share_a_master():
+    legacy = _schema0()
+    legacy["blocks"] = {m: [Block.load(x) for x in blks] for m, blks in legacy["blocks"].items()}
+    b = load_blocks(legacy)
+    assert b["blocks"]["Jan"][0].master is b["blocks"]["Dec"][0].master
+    assert b["blocks"]["May"][0]["hc"] == 36 and b["blocks"]["Jun"][0]["hc"] == 30
+
+def test_views_write_copy_on_write():
+    b = load_blocks(_schema0())
+    jan, feb = b["blocks"]["Jan"][0], b["blocks"]["Feb"][0]
+    feb["hc"] = 31
+    assert (jan["hc"], feb["hc"], feb.delta) == (30, 31, {"hc": 31})
+    feb["hc"] = 30                                                  # back to the master's value
+    assert feb.delta is None
+    copy_month(b, "May", "Jun")
+    b["blocks"]["Jun"][0]["salary"] = 45000
+    assert b["blocks"]["May"][0]["salary"] == 42000 and b["blocks"]["Jun"][0]["hc"] == 36
+    may = b["blocks"]["May"][0]
+    apply_to_all(b, may)
+    assert [b["blocks"][m][0]["hc"] for m in MONTHS] == [36] * 12
+    assert b["blocks"]["Jun"][0]["salary"] == 45000                 # other fields keep their override
+
+# ── Stable ids: side tables move from positions to block ids ──
+def test_rekey_positions_follows_each_block_at_a_position():
+    b = load_blocks(_schema0())
+    b["blocks"]["Jul"][1] = BlockView(Block(lang="FR", hc=4))       # position 1 holds EN, then FR in July
+    de, en, fr = (b["blocks"][m][i]["id"] for m, i in (("Jan", 0), ("Apr", 1), ("Jul", 1)))
+    table = {"0": dict(date="2026-04-15", new_up=24.0), "1": dict(date="2026-09-01", new_up=15.0),
+             "7": dict(date="2026-01-01", new_up=1.0), fr: dict(date="2026-10-01", new_up=9.0)}
+    out = rekey_positions(b, table)
+    assert set(out) == {de, en, fr}                                 # nothing at position 7: dropped
+    assert out[de] == table["0"] and out[en] == table["1"]
+    assert out[fr] == table[fr]                                     # an id key wins over its position
+    out[en]["new_up"] = 0.0
+    assert table["1"]["new_up"] == 15.0                             # each block gets its own copy
+
+def test_schema_2_side_tables_upgrade_to_ids():
+    legacy = _schema0()
+    legacy["cola_configs"]  = {"1": dict(date="2026-06-01", new_up=15.5)}
+    legacy["salary_raises"] = {"0": dict(date="2026-07-01", pct=0.1)}
+    legacy["hc_waves"]      = {"1": [dict(date="2026-05-11", delta=4)]}
+    b = load_blocks(legacy)
+    de, en = b["blocks"]["Apr"][0]["id"], b["blocks"]["Apr"][1]["id"]
+    assert (list(b["cola_configs"]), list(b["salary_raises"]), list(b["hc_waves"])) == ([en], [de], [en])
+    cola = copy.deepcopy(b["cola_configs"])
+    b["blocks"]["Dec"].reverse()                                    # reordering no longer re-points them
+    assert b["blocks"]["Dec"][0]["id"] == en and load_blocks(b)["cola_configs"] == cola
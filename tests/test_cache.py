@@ -0,0 +1,69 @@
+"""Result cache and month fingerprints: memoised on block stamps, invalidated by
+every kind of edit."""
+
+import pytest
+
+from ccbudget.engine import (MONTHS, DEFAULT_SETTINGS, TotalsCache, default_budget, load_blocks, new_block,
+                             copy_month, apply_to_all, month_fingerprints, budget_hash, year_totals)
+
+def _budget():
+    b = default_budget()
+    b["blocks"] = {m: [dict(lang="DE", hc=30, salary=42000, unit_price=22.0),
+                       dict(lang="EN", hc=10, salary=30000, unit_price=14.0)] for m in MONTHS}
+    return load_blocks(b)
+
+def _changed(b, edit):
+    before = month_fingerprints(b)
+    edit(b)
+    after  = month_fingerprints(b)
+    return [m for m, x, y in zip(MONTHS, before, after) if x != y]
+
+def test_unchanged_budget_keeps_its_fingerprints():
+    b = _budget()
+    assert month_fingerprints(b) == month_fingerprints(b)
+    new_block(lang="FR")                                    # a stamp drawn elsewhere
+    assert _changed(b, lambda b: None) == []
+
+@pytest.mark.parametrize("edit, months", [
+    (lambda b: b["blocks"]["Mar"][0].__setitem__("hc", 31),           ["Mar"]),
+    (lambda b: b["blocks"]["Mar"][0].master.__setitem__("salary", 1), MONTHS),
+    (lambda b: b["blocks"]["May"].pop(1),                             ["May"]),
+    (lambda b: b["blocks"]["Jun"].reverse(),                          ["Jun"]),
+    (lambda b: b["blocks"]["Jul"].append(new_block(lang="FR")),       ["Jul"]),
+    (lambda b: copy_month(b, "Jan", "Feb"),                           ["Feb"]),  # fresh views
+])
+def test_every_edit_moves_exactly_its_months(edit, months):
+    assert _changed(_budget(), edit) == months
+
+def test_apply_to_all_moves_every_month():
+    b = _budget()
+    b["blocks"]["Apr"][1]["hc"] = 12
+    b["blocks"]["Sep"][1]["hc"] = 14
+    v = b["blocks"]["Apr"][1]
+    assert _changed(b, lambda b: apply_to_all(b, v)) == MONTHS
+
+def test_side_tables_still_reach_their_months():
+    b = _budget()
+    bid = b["blocks"]["Jan"][0]["id"]
+    assert _changed(b, lambda b: b["cola_configs"].update({bid: dict(date="2026-10-01", new_up=25.0)})) \
+        == MONTHS[9:]
+
+def test_lru_evicts_the_least_recently_used():
+    c = TotalsCache(maxsize=2)
+    c.put("a", 1)
+    c.put("b", 2)
+    c.get("a")
+    c.put("c", 3)
+    assert (c.get("a"), c.get("b"), c.get("c")) == (1, None, 3)
+    assert c.stats()["size"] == 2
+
+def test_year_totals_hit_until_the_budget_or_settings_change():
+    b, g, c = _budget(), dict(DEFAULT_SETTINGS), TotalsCache()
+    first = year_totals(b, g, cache=c)
+    assert year_totals(b, g, cache=c) is first
+    assert year_totals(b, dict(g, fx=40.0), cache=c) is not first
+    b["name"] = "Renamed"                                   # the name is not priced
+    assert year_totals(b, g, cache=c) is first
+    b["blocks"]["Mar"][0]["hc"] = 31
+    assert year_totals(b, g, cache=c)["Mar"]["hc"] == 41
+    assert budget_hash(b, g) != budget_hash(_budget(), g)
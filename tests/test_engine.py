@@ -0,0 +1,27 @@
+"""The engine package is headless and its functions leave their inputs alone."""
+
+import copy
+import subprocess
+import sys
+
+from ccbudget.engine import MONTHS, DEFAULT_SETTINGS, default_budget, load_blocks, make_settings, year_totals
+
+def test_engine_imports_without_streamlit():
+    code = "import sys, ccbudget.engine, ccbudget.batch; sys.exit('streamlit' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+def test_make_settings_fills_defaults_without_mutating():
+    g = dict(fx=41.0)
+    s = make_settings(g, attrition_rate=0.07, meal=6000)
+    assert g == dict(fx=41.0)
+    assert s == dict(DEFAULT_SETTINGS, fx=41.0, attrition_rate=0.07, meal=6000)
+
+def test_year_totals_is_pure():
+    b = default_budget()
+    b["blocks"] = {m: [dict(lang="DE", hc=30, salary=42000, unit_price=22.0)] for m in MONTHS}
+    load_blocks(b)
+    g = dict(DEFAULT_SETTINGS)
+    before = copy.deepcopy((b, g))
+    first  = year_totals(b, g)
+    assert (b, g) == before
+    assert year_totals(b, g) == first
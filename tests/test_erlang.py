@@ -0,0 +1,68 @@
+"""Erlang B / C / A engine against exact references."""
+
+import math
+import numpy as np
+import pytest
+
+from ccbudget.engine import erlang_b, erlang_c, erlang_a, service_level, solve_agents, solve_agents_a
+
+def _exact_b(N, A):
+    """Erlang B from its definition, (A^N / N!) / Σ_k A^k / k!, in log space."""
+    k = np.arange(N + 1)
+    logt = k * math.log(A) - np.array([math.lgamma(i + 1) for i in k])
+    return math.exp(logt[-1] - np.logaddexp.reduce(logt))
+
+@pytest.mark.parametrize("N, A", [(1, 0.5), (10, 7.3), (60, 201.4), (509, 788.5), (300, 290.1),
+                                  (790, 788.5), (1600, 2500.0), (2000, 1500.3)])
+def test_erlang_b_matches_definition(N, A):
+    assert float(erlang_b(N, A)) == pytest.approx(_exact_b(N, A), rel=1e-9)
+
+def test_erlang_b_just_above_warm_start():
+    A = 788.5
+    n0 = int(A - 10 * math.sqrt(A))
+    got = erlang_b(np.arange(n0, n0 + 5), A)
+    assert got == pytest.approx([_exact_b(n, A) for n in range(n0, n0 + 5)], rel=1e-9)
+
+@pytest.mark.parametrize("bad", [dict(A=np.nan), dict(A=np.inf), dict(target=np.nan), dict(aht=np.nan),
+                                 dict(t=np.inf), dict(t=-1.0)])
+def test_solvers_reject_non_finite_inputs(bad):
+    x = dict(A=10.0, aht=240.0, target=0.8, t=20.0)
+    x.update(bad)
+    with pytest.raises(ValueError):
+        solve_agents(x["A"], x["aht"], x["target"], x["t"])
+    with pytest.raises(ValueError):
+        solve_agents_a(x["A"], x["aht"], 120.0, x["target"], x["t"])
+
+def test_idle_queues_ignore_their_other_inputs():
+    r = solve_agents([0.0, 10.0], [np.nan, 240.0], 0.8, 20)
+    assert r["agents"].tolist() == [0, 14]
+
+# ── Erlang A ──
+def _mmnm(N, A, aht, patience, K=4000):
+    """M/M/N+M by its truncated birth-death chain → (P(wait), abandon share)."""
+    lam, mu, th = A / aht, 1 / aht, 1 / patience
+    k = np.arange(1, K)
+    logp = np.r_[0.0, np.cumsum(np.log(lam) - np.log(mu * np.minimum(k, N) + th * np.maximum(k - N, 0)))]
+    p = np.exp(logp - np.logaddexp.reduce(logp))
+    q = np.maximum(np.arange(K) - N, 0)
+    return p[N:].sum(), th * (p * q).sum() / lam
+
+@pytest.mark.parametrize("N, A, patience", [(12, 10.0, 60.0), (9, 10.0, 180.0), (110, 100.0, 30.0),
+                                            (480, 500.0, 120.0)])
+def test_erlang_a_matches_the_birth_death_chain(N, A, patience):
+    r = erlang_a(N, A, 240.0, patience, 20.0)
+    wait, abandon = _mmnm(N, A, 240.0, patience)
+    assert float(r["wait"]) == pytest.approx(wait, rel=1e-8)
+    assert float(r["abandon"]) == pytest.approx(abandon, rel=1e-8)
+
+def test_erlang_a_tends_to_erlang_c_with_endless_patience():
+    r = erlang_a(14, 10.0, 240.0, 1e9, 20.0)
+    assert float(r["sl"]) == pytest.approx(float(service_level(14, 10.0, 240.0, 20.0)), rel=1e-6)
+    assert float(r["wait"]) == pytest.approx(float(erlang_c(14, 10.0)), rel=1e-6)
+
+@pytest.mark.parametrize("A, patience", [(3.2, 90.0), (25.0, 45.0), (400.0, 200.0), (900.0, 20.0)])
+def test_solve_agents_a_is_the_smallest_n_on_target(A, patience):
+    r = solve_agents_a(A, 240.0, patience, 0.8, 20)
+    n = int(r["agents"])
+    assert float(erlang_a(n, A, 240.0, patience, 20)["sl"]) >= 0.8 > float(erlang_a(n - 1, A, 240.0, patience, 20)["sl"])
+    assert n <= int(solve_agents(A, 240.0, 0.8, 20)["agents"])          # abandoners shorten the queue
@@ -0,0 +1,36 @@
+"""Memory-mapped Erlang C table against the exact engine solver."""
+
+import numpy as np
+import pytest
+
+from ccbudget import erlang_table
+from ccbudget.erlang_table import ErlangTable, build_table
+from ccbudget.engine import erlang_c, solve_agents
+
+@pytest.fixture(scope="module")
+def table(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("erlang") / "erlang_c.tbl")
+    build_table(path, max_load=300.0)
+    return ErlangTable(path)
+
+def test_table_solves_like_the_engine(table):
+    rng = np.random.default_rng(0)
+    A   = np.r_[0.0, rng.uniform(0.05, 300, 3000), 450.0, 1200.0]          # idle, inside, past the grid
+    aht, g, t = rng.uniform(120, 600, A.size), rng.uniform(0.5, 0.95, A.size), rng.uniform(5, 60, A.size)
+    got, want = table.solve_agents(A, aht, g, t), solve_agents(A, aht, g, t)
+    assert (got["agents"] == want["agents"]).all()
+    assert got["sl"] == pytest.approx(want["sl"], abs=1e-3)
+    assert got["asa"] == pytest.approx(want["asa"], rel=1e-3, abs=1e-6)
+
+def test_table_erlang_c_is_close_to_exact(table):
+    A = np.array([0.3, 7.7, 42.0, 150.5, 299.0, 800.0])
+    N = np.floor(A) + np.array([1, 3, 8, 12, 20, 30])
+    assert table.erlang_c(N, A) == pytest.approx(erlang_c(N, A), rel=1e-3)
+    assert table.erlang_c([5, 40], [5.5, 40.0]).tolist() == [1.0, 1.0]  # N ≤ A: every call waits
+
+def test_missing_or_foreign_files(tmp_path):
+    assert ErlangTable.shared(str(tmp_path / "none.tbl")) is None
+    (tmp_path / "junk.tbl").write_bytes(b"{}" + b" " * 300)
+    with pytest.raises(ValueError):
+        ErlangTable(str(tmp_path / "junk.tbl"))
+    assert erlang_table.main(["-o", str(tmp_path / "x.tbl"), "--max-load", "0"]) == 2
@@ -0,0 +1,72 @@
+"""Goal-seek and tornado address blocks by id, wherever they sit in a month."""
+
+import copy
+import pytest
+
+from ccbudget.engine import MONTHS, DEFAULT_SETTINGS, default_budget, year_lines, goalseek, sensitivity
+
+def _budget():
+    """Blocks a and b swap places from July on."""
+    b = default_budget()
+    a_, b_ = (dict(id="a", lang="DE", hc=30, salary=42000, unit_price=22.0),
+              dict(id="b", lang="EN", hc=10, salary=30000, unit_price=14.0))
+    b["blocks"] = {m: [dict(a_), dict(b_)] if i < 6 else [dict(b_), dict(a_)] for i, m in enumerate(MONTHS)}
+    return b
+
+def _margin(budget):
+    return float(year_lines(budget, dict(DEFAULT_SETTINGS))["margin"].sum())
+
+def test_block_up_follows_the_block():
+    b   = _budget()
+    sol = goalseek.block_up(b, dict(DEFAULT_SETTINGS), "a", 0.25)
+    assert list(sol["up"]) == MONTHS
+    assert list(sol["up"].values()) == pytest.approx([22.0 * sol["up_mult"]] * 12)
+    with pytest.raises(ValueError):
+        goalseek.block_up(b, dict(DEFAULT_SETTINGS), "zz", 0.25)
+
+def test_max_block_hc_keeps_the_other_block():
+    b   = _budget()
+    sol = goalseek.max_block_hc(b, dict(DEFAULT_SETTINGS), "b", -1.0, cap=50)
+    flat = copy.deepcopy(b)
+    for m in MONTHS:
+        for x in flat["blocks"][m]:
+            if x["id"] == "b":
+                x["hc"] = sol["hc"]
+    assert sol["margin"] == pytest.approx(_margin(flat))
+
+def test_tornado_block_drivers_by_id():
+    b = _budget()
+    base, rows = sensitivity.tornado(b, dict(DEFAULT_SETTINGS), 0.1)
+    up = {r["key"]: r for r in rows if r["kind"] == "up"}
+    assert set(up) == {"a", "b"}
+    hi = copy.deepcopy(b)
+    for m in MONTHS:
+        for x in hi["blocks"][m]:
+            if x["id"] == "a":
+                x["unit_price"] *= 1.1
+    assert up["a"]["high"] == pytest.approx(_margin(hi) - base)
+
+def _margin_pct(budget, overlay=None):
+    lines = year_lines(budget, dict(DEFAULT_SETTINGS), overlay)
+    return float(lines["margin"].sum() / lines["rev"].sum())
+
+def test_up_uplift_is_the_smallest_multiplier_on_target():
+    b   = _budget()
+    sol = goalseek.up_uplift(b, dict(DEFAULT_SETTINGS), 0.30)
+    assert sol["margin_pct"] == pytest.approx(_margin_pct(b, dict(up_pct=sol["up_mult"])))
+    assert sol["margin_pct"] >= 0.30 > _margin_pct(b, dict(up_pct=sol["up_mult"] * (1 - 1e-4)))
+    assert sol["base_margin_pct"] == pytest.approx(_margin_pct(b))
+    assert goalseek.up_uplift(b, dict(DEFAULT_SETTINGS), 0.99) is None
+
+def test_max_block_hc_is_the_last_hc_on_target():
+    b   = _budget()
+    sol = goalseek.max_block_hc(b, dict(DEFAULT_SETTINGS), "b", 0.0, cap=200)     # b bills below cost
+    def at(hc):
+        x = copy.deepcopy(b)
+        for m in MONTHS:
+            for blk in x["blocks"][m]:
+                if blk["id"] == "b":
+                    blk["hc"] = hc
+        return _margin_pct(x)
+    assert not sol["capped"]
+    assert at(sol["hc"]) >= 0.0 > at(sol["hc"] + 1)
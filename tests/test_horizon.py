@@ -0,0 +1,57 @@
+"""Contract horizon against the fiscal-year engine."""
+
+import pytest
+
+from ccbudget.engine import MONTHS, DEFAULT_SETTINGS, default_budget, year_lines
+from ccbudget.engine import horizon
+
+def _budget(cola_date, months=12):
+    b = default_budget()
+    blocks = [dict(id="a", lang="DE", hc=30, salary=42000, unit_price=22.0),
+              dict(id="b", lang="EN", hc=12, salary=30000, unit_price=15.0, up_currency="USD", unit_price_raw=16.0)]
+    b["blocks"] = {m: [dict(x) for x in blocks] for m in MONTHS}
+    b["cola_configs"] = {"a": dict(date=cola_date, new_up=24.0)}
+    b["hc_waves"] = {"b": [dict(date="2026-06-08", delta=5)]}
+    b["global_changes"] = {"hours": [], "fx": [dict(date="2026-09-01", value=41.0)], "shrink": []}
+    b["contract"] = dict(b["contract"], start_year=2026, months=months)
+    return b
+
+@pytest.mark.parametrize("months", [12, 36])
+def test_year_one_matches_fiscal_year_when_dates_are_in_start_year(months):
+    b, g  = _budget("2026-04-15", months), dict(DEFAULT_SETTINGS)
+    assert horizon.off_year_changes(b, 2026) == []
+    axis, lines = horizon.horizon_lines(b, g)
+    y1, _ = horizon.year_slice(lines, axis, 0)
+    want  = year_lines(b, g)
+    for k in ("rev", "cost", "margin", "hc", "hc_increase"):
+        assert y1[k] == pytest.approx(want[k], rel=1e-12), k
+
+def test_off_year_dates_are_flagged_and_priced_by_full_date():
+    b, g  = _budget("2025-04-15"), dict(DEFAULT_SETTINGS)
+    assert horizon.off_year_changes(b, 2026) == [("cola_configs", "2025-04-15")]
+    axis, lines = horizon.horizon_lines(b, g)
+    fy = year_lines(b, g)
+    assert (lines["rev"][:3] > fy["rev"][:3]).all()         # already at the new price from January
+    assert lines["rev"][4:] == pytest.approx(fy["rev"][4:])
+
+@pytest.mark.parametrize("roll", ["hold", "repeat"])
+def test_later_years_roll_and_escalate(roll):
+    b, g = _budget("2026-04-15", 36), dict(DEFAULT_SETTINGS)
+    b["blocks"]["Dec"][0]["hc"] = 40                       # December differs from the rest of the year
+    b["contract"].update(roll=roll, cola_pct=0.05)
+    axis, lines = horizon.horizon_lines(b, g)
+    y2, y3 = lines["rev"][12:24], lines["rev"][24:]          # every dated change is in force by year 2
+    assert y3 == pytest.approx(y2 * 1.05)
+    if roll == "hold":
+        assert y3 == pytest.approx([y3[0]] * 12)
+    else:
+        assert y3[11] > y3[10] == pytest.approx(y3[0])
+    yr = horizon.by_year(lines, axis)
+    assert yr["rev"] == pytest.approx([lines["rev"][12 * k:12 * (k + 1)].sum() for k in range(3)])
+    assert yr["hc"][0] == pytest.approx(lines["hc"][:12].mean())
+    assert horizon.contract_total(lines, axis)["rev"] == pytest.approx(lines["rev"].sum())
+
+def test_horizon_axis_rejects_bad_contracts():
+    for bad in (dict(months=0), dict(months=61), dict(roll="loop")):
+        with pytest.raises(ValueError):
+            horizon.horizon_axis(dict(start_year=2026, **bad))
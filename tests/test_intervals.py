@@ -0,0 +1,45 @@
+"""Interval staffing: weekly profiles, batched interval solves and the monthly rollup."""
+
+import numpy as np
+import pytest
+
+from ccbudget.engine import solve_agents
+from ccbudget.engine.intervals import (INTERVALS, PER_DAY, WEEKS_PER_MONTH, weekly_profile, interval_staffing,
+                                       monthly_rollup, interval_labels)
+
+def _calls(months=2):
+    hours = np.r_[np.zeros(8), np.full(10, 3.0), np.full(6, 1.0)]          # 08:00–18:00 peak
+    prof  = weekly_profile([1, 1, 1, 1, 1.2, 0.5, 0], hours)
+    return np.array([4000.0, 5200.0][:months])[:, None] * prof
+
+def test_profile_spreads_hours_and_sums_to_one():
+    prof = weekly_profile([1, 1, 1, 1, 1, 0, 0], np.r_[np.zeros(9), np.ones(8), np.zeros(7)])
+    assert prof.shape == (INTERVALS,) and prof.sum() == pytest.approx(1.0)
+    mon = prof[:PER_DAY]
+    assert (mon[36:68] == mon[36]).all() and not mon[:36].any() and not prof[5 * PER_DAY:].any()
+    assert interval_labels()[37] == "Mon 09:15"
+    for bad in (([1] * 6, np.ones(24)), ([1] * 7, np.ones(25)), ([1] * 7, -np.ones(24)), ([0] * 7, np.ones(24))):
+        with pytest.raises(ValueError):
+            weekly_profile(*bad)
+
+def test_intervals_solve_like_one_queue_each():
+    calls = _calls()
+    sol   = interval_staffing(calls, 300.0, 0.8, 20)
+    busy  = calls > 0
+    one   = solve_agents(calls[busy] * 300.0 / 900, 300.0, 0.8, 20)
+    assert (sol["agents"][busy] == one["agents"]).all()
+    assert not sol["agents"][~busy].any() and (sol["sl"][busy] >= 0.8).all()
+    with pytest.raises(ValueError):
+        interval_staffing(calls[:, :-1], 300.0, 0.8, 20)
+
+def test_monthly_rollup():
+    calls = _calls()
+    sol   = interval_staffing(calls, 300.0, 0.8, 20)
+    r     = monthly_rollup(calls, sol, hours_per_fte=160, shrinkage_pct=20)
+    hrs   = sol["agents"].sum(axis=-1) * 0.25 * WEEKS_PER_MONTH
+    assert r["agent_hours"] == pytest.approx(hrs)
+    assert r["rostered_hc"].tolist() == np.ceil(hrs / 160 / 0.8).astype(int).tolist()
+    assert r["volume"] == pytest.approx(calls.sum(axis=-1) * WEEKS_PER_MONTH)
+    assert ((r["sl"] >= 80) & (r["occ"] < 100)).all()
+    pooled = monthly_rollup(calls, sol, 160, 20, pool=True)
+    assert pooled["agent_hours"] == pytest.approx(hrs.sum())
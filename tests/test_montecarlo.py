@@ -0,0 +1,28 @@
+"""Monte Carlo: draws against the plan, and seeded runs cached by budget and risk."""
+
+import pytest
+
+from ccbudget.engine import MONTHS, DEFAULT_SETTINGS, TotalsCache, default_budget, year_lines, montecarlo
+
+def _budget():
+    b = default_budget()
+    b["blocks"] = {m: [dict(id="a", lang="DE", hc=30, salary=42000, unit_price=22.0),
+                       dict(id="b", lang="EN", hc=10, salary=30000, unit_price=14.0, fx_override=40.0)]
+                   for m in MONTHS}
+    return b
+
+def test_zero_risk_reproduces_the_plan():
+    b, g = _budget(), dict(DEFAULT_SETTINGS)
+    none = dict(fx_drift=0.0, fx_vol=0.0, attrition_sd=0.0, shrink_sd=0.0, up_sd=0.0)
+    res  = montecarlo.simulate(b, g, n=50, risk=none, seed=1)
+    assert res["margin"] == pytest.approx([year_lines(b, g)["margin"].sum()] * 50)
+
+def test_seeded_runs_are_cached_by_budget_risk_seed_and_n():
+    b, g, c = _budget(), dict(DEFAULT_SETTINGS), TotalsCache()
+    first = montecarlo.simulate(b, g, n=2000, seed=7, cache=c)
+    assert montecarlo.simulate(b, g, n=2000, seed=7, cache=c) is first
+    assert montecarlo.simulate(b, g, n=2000, seed=8, cache=c) is not first
+    assert montecarlo.simulate(b, g, n=2000, seed=7, risk=dict(fx_vol=0.3), cache=c) is not first
+    assert montecarlo.simulate(b, g, n=2000, seed=None, cache=c) is not montecarlo.simulate(b, g, n=2000, cache=c)
+    b["blocks"]["Jan"][0]["hc"] = 31
+    assert montecarlo.simulate(b, g, n=2000, seed=7, cache=c) is not first
@@ -0,0 +1,45 @@
+"""Period axis: native per-period lines, linear ones adding back up to the months."""
+
+import numpy as np
+import pytest
+
+from ccbudget.engine import MONTHS, DEFAULT_SETTINGS, default_budget, year_lines
+from ccbudget.engine import periods
+
+def _budget():
+    b = default_budget()
+    blocks = [dict(id="a", lang="DE", hc=40, salary=42000, unit_price=21.5),
+              dict(id="b", lang="EN", hc=12, salary=30000, unit_price=14.0, fx_override=40.0),
+              dict(id="c", lang="TR", hc=7, salary=25000, unit_price=9.0, up_currency="USD", unit_price_raw=10.0)]
+    b["blocks"] = {m: [dict(x) for x in blocks] for m in MONTHS}
+    b["hc_waves"] = {"a": [dict(date="2026-03-17", delta=25), dict(date="2026-08-04", delta=-10)],
+                     "b": [dict(date="2026-05-21", delta=9)]}
+    b["salary_raises"] = {"a": dict(date="2026-06-10", pct=0.08)}
+    b["cola_configs"] = {"b": dict(date="2026-04-15", new_up=15.5)}
+    b["global_changes"] = {"hours": [dict(date="2026-02-11", value=172)],
+                           "fx": [dict(date="2026-07-09", value=41.5)],
+                           "shrink": [dict(date="2026-10-22", value=0.2)]}
+    return b
+
+@pytest.mark.parametrize("granularity", ["week", "day"])
+def test_linear_lines_add_up_to_year_lines(granularity):
+    b, g = _budget(), dict(DEFAULT_SETTINGS)
+    axis = periods.period_axis(granularity, 2026)
+    got  = periods.to_months(periods.period_lines(b, g, axis), axis)
+    want = year_lines(b, g)
+    for k in ("rev", "rev_try", "hrs_billable", "hc"):
+        assert got[k] == pytest.approx(want[k], rel=1e-9), k
+
+def test_periods_are_computed_natively():
+    b, g  = _budget(), dict(DEFAULT_SETTINGS)
+    axis  = periods.period_axis("day", 2026)
+    lines = periods.period_lines(b, g, axis)
+    mar, apr = axis["month"] == 2, axis["month"] == 3
+    hc    = lines["hc"][mar]
+    assert hc[:16].max() < hc[16:].min()                    # the wave lands on Mar 17
+    assert lines["hc_increase"][mar].tolist() == [0.0] * 16 + [25.0] + [0.0] * 14
+    assert not lines["hc_increase"][apr].any() and not lines["capex_try"][apr].any()
+    for role in ("TM", "QM", "OM"):
+        hc = lines["oh"][role]["hc"]
+        assert (hc == np.round(hc)).all(), role             # overhead HC is a ceil, per period
+    assert lines["margin"] == pytest.approx(lines["rev"] - lines["cost"])
@@ -0,0 +1,49 @@
+"""Portfolio: every client as on its own tab, loaded or priced from its record."""
+
+import json
+import pytest
+
+from ccbudget.engine import (MONTHS, DEFAULT_SETTINGS, default_budget, make_settings, year_totals,
+                             portfolio_totals, pricing_record)
+from ccbudget.engine.totals import _reduce_rows, _load_block_rows
+
+def _client(name, hc, up, fx_date):
+    b = default_budget(name)
+    blocks = [dict(id=f"{name}1", lang="DE", hc=hc, salary=42000, unit_price=up),
+              dict(id=f"{name}2", lang="EN", hc=hc // 2, salary=30000, unit_price=up - 6, fx_override=40.0)]
+    b["blocks"] = {m: [dict(x) for x in blocks] for m in MONTHS}
+    b["global_changes"] = {"hours": [], "fx": [dict(date=fx_date, value=44.0)], "shrink": []}
+    b["hc_waves"] = {f"{name}1": [dict(date="2026-04-09", delta=6)]}
+    return b
+
+def _years_equal(a, b):
+    for m in MONTHS:
+        for k in ("rev", "cost", "margin", "hc", "oh_cost_eur"):
+            assert a[m][k] == pytest.approx(b[m][k], rel=1e-12), (m, k)
+
+def test_each_client_priced_under_its_own_settings():
+    cls = [_client("A", 30, 22.0, "2026-05-01"), _client("B", 18, 19.0, "2026-09-15")]
+    own = [make_settings(DEFAULT_SETTINGS), make_settings(DEFAULT_SETTINGS, hours=160, ctc=1.9, meal=6000,
+                                                          attrition_rate=0.08)]
+    pf  = portfolio_totals(cls, own)
+    for c, s, y in zip(cls, own, pf["years"]):
+        _years_equal(y, year_totals(c, s))
+
+def test_pricing_record_round_trips_through_json():
+    c  = _client("A", 30, 22.0, "2026-05-01")
+    pr = json.loads(json.dumps(pricing_record(c, _reduce_rows(_load_block_rows(c)))))
+    for fx in (38.0, 41.3):                                 # re-priced under a new FX, blocks unread
+        s  = make_settings(DEFAULT_SETTINGS, fx=fx)
+        pf = portfolio_totals([dict(name="A")], [s], pricing=[pr])
+        _years_equal(pf["years"][0], year_totals(c, s))
+
+def test_total_sums_the_clients_and_recomputes_break_even():
+    cls = [_client("A", 30, 22.0, "2026-05-01"), _client("B", 18, 19.0, "2026-09-15"), default_budget("Empty")]
+    s   = make_settings(DEFAULT_SETTINGS)
+    pf  = portfolio_totals(cls, [s] * 3)
+    assert pf["clients"] == ["A", "B", "Empty"]
+    for k in ("rev", "cost", "margin", "hc", "hrs_billable"):
+        want = [sum(year_totals(c, s)[m][k] for c in cls) for m in MONTHS]
+        assert pf["total"][k] == pytest.approx(want, rel=1e-12), k
+    assert pf["total"]["breakeven_up"] == pytest.approx(pf["total"]["cost"] / pf["total"]["hrs_billable"])
+    assert not pf["by_client"]["rev"][2].any()
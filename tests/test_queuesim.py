@@ -0,0 +1,22 @@
+"""Queue simulator against Erlang C / A."""
+
+import numpy as np
+import pytest
+
+from ccbudget.engine import queuesim, erlang_a, service_level
+
+def test_asa_is_mean_wait_per_offered_call_as_erlang_a():
+    A, n, aht, pat = 60.0, 62, 240.0, 120.0
+    res = queuesim.simulate([dict(rate=A * 3600 / aht, aht=aht, sl_seconds=20, patience=pat)], [dict(agents=n)],
+                            hours=400, reps=3, seed=7)
+    ref = erlang_a(n, A, aht, pat, 20)
+    assert res["asa"].mean() == pytest.approx(float(ref["asa"]), rel=0.1)
+    assert res["abandon"].mean() == pytest.approx(float(ref["abandon"]), rel=0.1)
+    assert res["sl"].mean() == pytest.approx(float(ref["sl"]), abs=0.02)
+
+def test_exponential_matches_erlang_c_and_seed_reproduces():
+    q, g = [dict(rate=6.5 * 3600 / 240, aht=240, sl_seconds=20)], [dict(agents=10)]
+    a = queuesim.simulate(q, g, hours=2000, reps=2, seed=3)
+    b = queuesim.simulate(q, g, hours=2000, reps=2, seed=3)
+    assert np.array_equal(a["sl"], b["sl"])
+    assert a["sl"].mean() == pytest.approx(float(service_level(10, 6.5, 240, 20)), abs=0.01)
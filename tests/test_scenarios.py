@@ -0,0 +1,58 @@
+"""Scenario library and FX projection: batched passes against one-at-a-time ones."""
+
+import pytest
+
+from ccbudget.engine import MONTHS, DEFAULT_SETTINGS, TotalsCache, default_budget, year_totals, scenarios
+
+def _budget():
+    b = default_budget()
+    b["blocks"] = {m: [dict(id="a", lang="DE", hc=30, salary=42000, unit_price=22.0, attrition_override=0.02),
+                       dict(id="b", lang="EN", hc=12, salary=30000, unit_price=14.0, fx_override=40.0),
+                       dict(id="c", lang="TR", hc=8, salary=25000, unit_price=11.0, up_currency="USD",
+                            unit_price_raw=12.0)]
+                   for m in MONTHS}
+    b["cola_configs"]   = {"a": dict(date="2026-04-15", new_up=24.0)}
+    b["global_changes"] = {"hours": [], "fx": [dict(date="2026-07-01", value=42.0)], "shrink": []}
+    return b
+
+LIBRARY = [dict(name="Plan"),
+           dict(name="Price up", up_pct=8, sal_pct=-2),
+           dict(name="Ramp", hc_pct=25, attrition=7, shrink=18),
+           dict(name="Weak TRY", fx=45.0)]
+
+def test_make_overlay_reads_percent_units():
+    assert scenarios.make_overlay(LIBRARY[0]) == dict(up_pct=1.0, sal_pct=1.0)
+    assert scenarios.make_overlay(LIBRARY[2]) == pytest.approx(dict(up_pct=1.0, sal_pct=1.0, hc_pct=1.25,
+                                                                    attrition=0.07, shrink=0.18))
+    assert scenarios.make_overlay(LIBRARY[3])["fx_override"] == 45.0
+
+def test_batched_library_matches_one_scenario_at_a_time():
+    b, g = _budget(), dict(DEFAULT_SETTINGS)
+    sos  = [scenarios.make_overlay(sc) for sc in LIBRARY]
+    for so, year in zip(sos, scenarios.scenario_years(b, g, sos)):
+        want = year_totals(b, g, so)
+        for m in MONTHS:
+            for k in ("rev", "cost", "margin", "hc", "oh_cost_eur", "breakeven_up"):
+                assert year[m][k] == pytest.approx(want[m][k], rel=1e-12), (so, m, k)
+
+def test_library_shares_the_get_totals_scenario_cache():
+    b, g, c = _budget(), dict(DEFAULT_SETTINGS), TotalsCache()
+    sos  = [scenarios.make_overlay(sc) for sc in LIBRARY]
+    warm = year_totals(b, g, sos[1], cache=c)
+    years = scenarios.scenario_years(b, g, sos, cache=c)
+    assert years[1] is warm
+    assert all(x is y for x, y in zip(scenarios.scenario_years(b, g, sos, cache=c), years))
+
+def test_fx_projection_is_the_engine_at_each_curve():
+    b, g = _budget(), dict(DEFAULT_SETTINGS, usd_try=35.0)
+    b["global_changes"] = {"hours": [], "fx": [], "shrink": []}
+    curves = [[38.0] * 12, [45.0] * 12, [38.0 + i for i in range(12)]]
+    proj   = scenarios.fx_projection(b, g, curves)
+    assert proj["margin"].shape == (3, 12)
+    for i, rate in ((0, 38.0), (1, 45.0)):                  # a flat curve = the FX setting moved
+        want = year_totals(b, dict(g, fx=rate, usd_try=35.0 * rate / 38.0))
+        assert proj["margin"][i] == pytest.approx([want[m]["margin"] for m in MONTHS], rel=1e-12)
+    for mi, m in enumerate(MONTHS):                         # a path: each month at its own rate
+        want = year_totals(b, dict(g, fx=38.0 + mi, usd_try=35.0 * (38.0 + mi) / 38.0))[m]
+        for k in ("rev", "cost", "rev_try", "cost_try"):
+            assert proj[k][2, mi] == pytest.approx(want[k], rel=1e-12), (m, k)
@@ -0,0 +1,62 @@
+"""Tornado block cases against a full recompute of the edited budget; heatmap cells
+against single overlays."""
+
+import copy
+import pytest
+
+from ccbudget.engine import MONTHS, DEFAULT_SETTINGS, TotalsCache, default_budget, year_lines, sensitivity
+
+def _budget():
+    b = default_budget()
+    blocks = [dict(id="a", lang="DE", hc=30, salary=42000, unit_price=22.0, fx_override=40.0),
+              dict(id="b", lang="EN", hc=10, salary=30000, unit_price=14.0, up_currency="USD", unit_price_raw=15.0),
+              dict(id="c", lang="TR", hc=8, salary=25000, unit_price=11.0, hours_override=160.0)]
+    b["blocks"] = {m: [dict(x) for x in blocks[: 3 - i % 2]] for i, m in enumerate(MONTHS)}
+    b["salary_raises"] = {"a": dict(date="2026-06-10", pct=0.08)}
+    b["cola_configs"] = {"b": dict(date="2026-04-15", new_up=15.5)}
+    return b
+
+def _scaled(b, bid, field, k):
+    b = copy.deepcopy(b)
+    for m in MONTHS:
+        for x in b["blocks"][m]:
+            if x["id"] == bid:
+                x[field] *= k
+                if field == "unit_price" and x.get("unit_price_raw"):
+                    x["unit_price_raw"] *= k
+    return float(year_lines(b, dict(DEFAULT_SETTINGS))["margin"].sum())
+
+@pytest.mark.parametrize("bid", ["a", "b", "c"])
+def test_block_cases_match_a_recompute(bid):
+    b = _budget()
+    base, rows = sensitivity.tornado(b, dict(DEFAULT_SETTINGS), 0.1)
+    by = {(r["kind"], r["key"]): r for r in rows}
+    assert by[("salary", bid)]["low"] == pytest.approx(_scaled(b, bid, "salary", 0.9) - base)
+    if bid != "b":                                          # b's COLA price is not a block field
+        assert by[("up", bid)]["high"] == pytest.approx(_scaled(b, bid, "unit_price", 1.1) - base)
+
+def test_tornado_is_cached_by_budget_and_pct():
+    b, c = _budget(), TotalsCache()
+    first = sensitivity.tornado(b, dict(DEFAULT_SETTINGS), 0.1, cache=c)
+    assert sensitivity.tornado(b, dict(DEFAULT_SETTINGS), 0.1, cache=c) is first
+    assert sensitivity.tornado(b, dict(DEFAULT_SETTINGS), 0.2, cache=c) is not first
+
+def test_heatmap_cells_match_single_overlays():
+    b, g = _budget(), dict(DEFAULT_SETTINGS)
+    hm   = sensitivity.heatmap(b, g, ("up_pct", [0.9, 1.0, 1.2]), ("fx", [36.0, 42.0]))
+    assert hm["margin"].shape == (2, 3)
+    for i, fx in enumerate((36.0, 42.0)):
+        for j, up in enumerate((0.9, 1.0, 1.2)):
+            lines = year_lines(b, g, dict(up_pct=up, fx=fx))
+            assert hm["margin"][i, j] == pytest.approx(lines["margin"].sum())
+            assert hm["margin_pct"][i, j] == pytest.approx(lines["margin"].sum() / lines["rev"].sum())
+            assert hm["breakeven"][i, j] == pytest.approx(lines["cost"].sum() / lines["hrs_billable"].sum())
+    with pytest.raises(ValueError):
+        sensitivity.heatmap(b, g, ("fx", [1.0]), ("fx", [2.0]))
+
+def test_heatmap_is_cached_by_budget_and_grid():
+    b, c = _budget(), TotalsCache()
+    grid = (("hc_pct", [0.8, 1.2]), ("sal_pct", [1.0, 1.1]))
+    first = sensitivity.heatmap(b, dict(DEFAULT_SETTINGS), *grid, cache=c)
+    assert sensitivity.heatmap(b, dict(DEFAULT_SETTINGS), *grid, cache=c) is first
+    assert sensitivity.heatmap(b, dict(DEFAULT_SETTINGS, fx=40.0), *grid, cache=c) is not first
@@ -0,0 +1,98 @@
+"""SQLite budget store: round trips, lazy stubs, diffed saves, missing clients,
+failed writes, per-client settings."""
+
+import sqlite3
+import pytest
+
+from ccbudget.engine import MONTHS, DEFAULT_SETTINGS, default_budget, new_block, load_blocks, year_totals
+from ccbudget.store import BudgetStore, is_stub, open_client
+
+def _store(tmp_path):
+    return BudgetStore(str(tmp_path / "budget.db"))
+
+def _budget(name):
+    b = default_budget(name)
+    b["blocks"] = {m: [dict(lang="DE", hc=30, salary=42000, unit_price=22.0),
+                       dict(lang="EN", hc=10 + (m == "May"), salary=30000, unit_price=14.0)] for m in MONTHS}
+    load_blocks(b)
+    b["cola_configs"] = {b["blocks"]["Jan"][1]["id"]: dict(date="2026-04-15", new_up=15.0)}
+    b["actuals"]["Jan"] = dict(rev=100000.0)
+    return b
+
+def test_round_trip_keeps_masters_deltas_and_prices(tmp_path):
+    st = _store(tmp_path)
+    b  = _budget("A")
+    st.save(b, pos=0)
+    st.flush()
+    back = BudgetStore(st.path).load(b["client_id"])
+    assert back["blocks"]["Jan"][0].master is back["blocks"]["Dec"][0].master
+    assert back["blocks"]["May"][1].delta == {"hc": 11}
+    assert (back["cola_configs"], back["actuals"]["Jan"]) == (b["cola_configs"], b["actuals"]["Jan"])
+    g = dict(DEFAULT_SETTINGS)
+    assert year_totals(back, g) == year_totals(b, g)
+
+def test_stubs_load_lazily_in_tab_order(tmp_path):
+    st = _store(tmp_path)
+    a, b = _budget("A"), _budget("B")
+    st.save(b, pos=1, summary=dict(n_blocks=24))
+    st.save(a, pos=0)
+    st.flush()
+    clients = BudgetStore(st.path).client_stubs()
+    assert [c["name"] for c in clients] == ["A", "B"] and all(is_stub(c) for c in clients)
+    assert clients[1]["summary"] == dict(n_blocks=24)
+    full = open_client(clients, 1, st)
+    assert clients[1] is full and not is_stub(full) and is_stub(clients[0])
+
+def test_save_writes_only_what_changed(tmp_path):
+    st = _store(tmp_path)
+    b  = _budget("A")
+    st.save(b, pos=0)
+    st.flush()
+    sent = []
+    put  = st._queue.put
+    st._queue.put = lambda item: (sent.append(item[1]), put(item))
+    st.save(b, pos=0)
+    b["blocks"]["Mar"][0]["hc"] = 31
+    st.save(b, pos=0)
+    assert len(sent) == 1 and [sql.split()[0:3] for sql, _ in sent[0]] == [["INSERT", "OR", "REPLACE"]]
+    st.flush()
+    assert BudgetStore(st.path).load(b["client_id"])["blocks"]["Mar"][0]["hc"] == 31
+
+def test_load_missing_client_raises_key_error(tmp_path):
+    with pytest.raises(KeyError):
+        _store(tmp_path).load("nope")
+
+def test_removed_block_stays_removed_after_a_failed_write(tmp_path):
+    st = _store(tmp_path)
+    b  = default_budget("A")
+    b["blocks"]["Jan"] += [new_block(lang="EN", hc=10), new_block(lang="DE", hc=5)]
+    st.save(b, pos=0)
+    st.flush()
+    st._queue.put((b["client_id"], [("INSERT INTO no_such_table VALUES (1)", ())]))
+    st.flush()
+    assert st.error
+    del b["blocks"]["Jan"][1]
+    st.save(b, pos=0)
+    st.flush()
+    assert st.error is None
+    back = BudgetStore(st.path).load(b["client_id"])
+    assert [x["lang"] for x in back["blocks"]["Jan"]] == ["EN"]
+
+def test_settings_are_per_client(tmp_path):
+    st = _store(tmp_path)
+    st.save_settings("a", {"hours": 170, "ctc": 1.6})
+    st.save_settings("b", {"hours": 150})
+    assert st.settings("a") == {"hours": 170, "ctc": 1.6}
+    assert st.settings("b") == {"hours": 150}
+    st.delete("a")
+    assert st.settings("a") == {}
+
+def test_global_settings_migrate_as_defaults(tmp_path):
+    path = str(tmp_path / "old.db")
+    with sqlite3.connect(path) as con:
+        con.execute("CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT)")
+        con.execute("INSERT INTO settings VALUES ('hours', '165'), ('meal', '6000')")
+    st = BudgetStore(path)
+    st.save_settings("a", {"hours": 170})
+    assert st.settings("a") == {"hours": 170, "meal": 6000}
+    assert st.settings("b") == {"hours": 165, "meal": 6000}
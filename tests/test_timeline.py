@@ -0,0 +1,53 @@
+"""Effective-dated timelines: day-prorated COLA, raises, waves and global changes."""
+
+import pytest
+
+from ccbudget.engine import (MONTHS, DEFAULT_SETTINGS, default_budget, date_pos, timelines, effective_up,
+                             effective_salary, month_globals)
+
+def _budget():
+    b = default_budget()
+    b["cola_configs"]   = {"a": dict(date="2026-04-15", new_up=24.0), "x": dict(date="bad", new_up=9.0)}
+    b["salary_raises"]  = {"a": dict(date="2026-07-01", pct=0.10)}
+    b["hc_waves"]       = {"a": [dict(date="2026-03-11", delta=10), dict(date="2026-09-01", delta=-4)]}
+    b["global_changes"] = {"hours": [], "shrink": [dict(date="2026-11-01", value=20)],
+                           "fx": [dict(date="2026-06-11", value=40.0), dict(date="2026-06-21", value=42.0)]}
+    return b
+
+def test_date_pos():
+    assert date_pos("2026-01-01") == 0.0
+    assert date_pos("2026-04-15") == pytest.approx(3 + 14 / 30)
+    assert date_pos("2027-02-01", start_year=2026) == 13.0
+    assert date_pos("bad") is None
+
+def test_cola_and_raise_are_day_prorated_in_their_month():
+    b = _budget()
+    assert [effective_up(m, "a", 20.0, b) for m in ("Mar", "May")] == [20.0, 24.0]
+    assert effective_up("Apr", "a", 20.0, b) == pytest.approx((14 * 20.0 + 16 * 24.0) / 30)
+    assert effective_up("Dec", "x", 20.0, b) == 20.0               # invalid date: never applies
+    assert [effective_salary(m, "a", 1000.0, b) for m in ("Jun", "Jul")] == [1000.0, pytest.approx(1100.0)]
+
+def test_hiring_waves_hold_from_their_day():
+    tl = timelines(_budget())
+    w  = tl["hc_wave"][tl["ids"]["a"]]
+    assert w[:2].tolist() == [0.0, 0.0]
+    assert w[2] == pytest.approx(10 * 21 / 31)
+    assert w[3:8] == pytest.approx([10.0] * 5)
+    assert w[9:] == pytest.approx([6.0] * 3)
+
+def test_global_changes_several_in_one_month():
+    g  = dict(DEFAULT_SETTINGS, fx=38.0, shrink=0.15)
+    mg = month_globals(g, _budget())
+    assert mg["fx"][:5] == pytest.approx([38.0] * 5)
+    assert mg["fx"][5] == pytest.approx((10 * 38.0 + 10 * 40.0 + 10 * 42.0) / 30)
+    assert mg["fx"][6:] == pytest.approx([42.0] * 6)
+    assert mg["shrink"][10:] == pytest.approx([0.2, 0.2])                 # 20 is read as 20%
+    assert mg["hours"] == pytest.approx([g["hours"]] * len(MONTHS))
+
+def test_timelines_recompile_only_on_a_dated_config_edit():
+    b  = _budget()
+    tl = timelines(b)
+    b["blocks"]["Jan"] = []
+    assert timelines(b) is tl
+    b["cola_configs"]["a"]["new_up"] = 25.0
+    assert timelines(b) is not tl
@@ -0,0 +1,167 @@
+"""Vectorised full-year engine against the per-month, per-block loop it replaced."""
+
+import calendar
+import copy
+import datetime
+import math
+import pytest
+
+from ccbudget.engine import (MONTHS, DEFAULT_SETTINGS, MonthTracker, load_blocks, budget_fps, get_totals,
+                             get_totals_scenario, year_totals)
+
+# ── Reference: the per-block loop get_totals ran before the engine ──
+def _ref_up(cl, month, i, base_up):
+    cfg = cl.get("cola_configs", {}).get(str(i))
+    if not cfg or not cfg.get("date") or not cfg.get("new_up"):
+        return base_up
+    try:
+        d, new = datetime.date.fromisoformat(cfg["date"]), float(cfg["new_up"])
+    except ValueError:
+        return base_up
+    mo = MONTHS.index(month) + 1
+    if mo != d.month:
+        return base_up if mo < d.month else new
+    days = calendar.monthrange(d.year, d.month)[1]
+    return ((d.day - 1) * base_up + (days - d.day + 1) * new) / days
+
+def _ref_hc(month, b):
+    return (b.get("hc_ramp") or {}).get(month, b.get("hc", 0))
+
+def _ref_month(cl, month, g):
+    rev = rev_try = cost = cost_try = hc_t = hrs = w_sal = w_fx = w_att = 0.0
+    blks = cl["blocks"].get(month, [])
+    for i, b in enumerate(blks):
+        shr   = b["shrink_override"] if b.get("shrink_override") is not None else g["shrink"]
+        shr   = max(0.0, min(0.99, shr / 100 if shr > 1 else shr))
+        fx    = b["fx_override"]    if b.get("fx_override")    is not None else g["fx"]
+        hours = b["hours_override"] if b.get("hours_override") is not None else g["hours"]
+        hc, sal = _ref_hc(month, b), b.get("salary", 0)
+        up    = _ref_up(cl, month, i, b.get("unit_price", 0))
+        eff   = hours * (1 - shr)
+        if b.get("up_currency", "EUR") == "USD":
+            raw = b.get("unit_price_raw", up)
+            r_e = hc * eff * (raw * (g.get("usd_try", g["fx"]) / g["fx"]) if g["fx"] else raw)
+            r_t = hc * eff * raw * g.get("usd_try", g["fx"])
+        else:
+            r_e = hc * eff * up
+            r_t = r_e * fx
+        c_t   = hc * sal * g["ctc"] * (1 + g["bonus_pct"]) + hc * g["meal"]
+        rev  += r_e; rev_try += r_t; cost_try += c_t; cost += c_t / fx if fx else 0
+        hc_t += hc; hrs += hc * eff; w_sal += hc * sal; w_fx += hc * fx
+        att   = b.get("attrition_override")
+        att   = att if att is not None else g["attrition_rate"]
+        w_att += hc * max(0.0, min(1.0, att if att <= 1 else att / 100))
+    avg_sal = w_sal / hc_t if hc_t else 0
+    avg_fx  = w_fx / hc_t if hc_t else g["fx"]
+    avg_eff = hrs / hc_t if hc_t else g["hours"] * (1 - g["shrink"])
+    eur     = lambda t: t / avg_fx if avg_fx else 0
+    bf_t    = w_att * avg_sal * g["ctc"] * (1 + g["bonus_pct"]) + w_att * g["meal"]
+    opex    = cl.get("opex", {})
+    mi      = MONTHS.index(month)
+    prior   = sum(_ref_hc(MONTHS[mi - 1], b) for b in cl["blocks"].get(MONTHS[mi - 1], [])) if mi else hc_t
+    inc     = max(0.0, hc_t - prior)
+    opex_t  = (w_att * opex.get("training_cost_per_hire", 0) + (w_att + inc) * opex.get("recruitment_fee", 0)
+               + hc_t * (opex.get("it_cost_per_seat", 0) + opex.get("facilities_per_seat", 0)))
+    capex_t = inc * (opex.get("capex_pc", 0) + opex.get("capex_headset", 0) + opex.get("capex_software", 0))
+    oh_cfg  = cl["overhead_monthly"].get(month) or cl["overhead_global"]
+    oh_t = oh_e = 0.0
+    for role, ratio, salary in (("TM", 10, 55000), ("QM", 20, 60000), ("OM", 50, 80000)):
+        c = oh_cfg.get(role, {})
+        ratio, salary = c.get("ratio", ratio), c.get("salary", salary)
+        n = c["hc_override"] if c.get("hc_override") is not None else \
+            (math.ceil(hc_t / ratio) if ratio > 0 and hc_t > 0 else 0)
+        t = n * salary * g["ctc"] * (1 + g["bonus_pct"]) + n * g["meal"]
+        oh_t += t; oh_e += t / g["fx"] if g["fx"] else 0
+    grand = cost + eur(bf_t) + eur(opex_t) + eur(capex_t) + oh_e
+    return dict(rev=rev, rev_try=rev_try, cost=grand, cost_try=cost_try + bf_t + opex_t + capex_t + oh_t,
+                margin=rev - grand, hc=hc_t, hrs_billable=hrs, hrs=hrs + w_att * avg_eff * g["backfill_efficiency"],
+                attrition_hc=w_att, hc_increase=inc, capex_eur=eur(capex_t), oh_cost_eur=oh_e,
+                breakeven_up=grand / hrs if hrs > 0 else 0)
+
+# ── A legacy (schema 0) budget: plain dicts, COLA keyed by position ──
+def _legacy():
+    base = [dict(lang="DE", hc=30, salary=42000, unit_price=22.0, shrink_override=12.0),
+            dict(lang="EN", hc=12, salary=30000, unit_price=14.5, fx_override=40.0, attrition_override=7.0),
+            dict(lang="TR", hc=8, salary=25000, unit_price=11.0, up_currency="USD", unit_price_raw=12.5,
+                 hours_override=160.0),
+            dict(lang="FR", hc=5, salary=45000, unit_price=24.0, hc_ramp={"Mar": 9, "Sep": 0},
+                 attrition_override=0.02)]
+    blocks = {m: [dict(x) for x in base[: 4 - (i % 3 == 2)]] for i, m in enumerate(MONTHS)}
+    blocks["May"][0]["hc"] = 36
+    blocks["Jul"] = []
+    return dict(name="Legacy", blocks=blocks,
+                cola_configs={"0": dict(date="2026-04-15", new_up=24.0), "1": dict(date="bad", new_up=3)},
+                overhead_global={"TM": {"ratio": 10, "hc_override": None, "salary": 55000},
+                                 "QM": {"ratio": 20, "hc_override": 2.0, "salary": 60000},
+                                 "OM": {"ratio": 50, "hc_override": None, "salary": 80000}},
+                overhead_monthly={m: None for m in MONTHS},
+                opex=dict(training_cost_per_hire=5000, recruitment_fee=8000, it_cost_per_seat=1500,
+                          facilities_per_seat=2000, capex_pc=15000, capex_headset=3000, capex_software=5000))
+
+@pytest.mark.parametrize("g", [dict(DEFAULT_SETTINGS), dict(DEFAULT_SETTINGS, usd_try=35.0, shrink=0.2),
+                               dict(DEFAULT_SETTINGS, fx=0.0, attrition_rate=6.0)])
+def test_legacy_budget_matches_the_per_block_loop(g):
+    cl   = _legacy()
+    year = year_totals(load_blocks(copy.deepcopy(cl)), g)
+    for m in MONTHS:
+        want = _ref_month(cl, m, g)
+        for k, v in want.items():
+            assert year[m][k] == pytest.approx(v, rel=1e-9, abs=1e-6), (m, k)
+
+def test_get_totals_is_the_year_month():
+    cl = load_blocks(_legacy())
+    g  = dict(DEFAULT_SETTINGS)
+    assert get_totals("Apr", cl, g)["rev"] == year_totals(cl, g)["Apr"]["rev"]
+
+# ── Scenario overlay: the same engine, so an overlay = the budget edited by hand ──
+def _edited(cl, so):
+    cl = copy.deepcopy(cl)
+    k, s = so.get("up_pct", 1.0), so.get("sal_pct", 1.0)
+    for m in MONTHS:
+        for b in cl["blocks"][m]:
+            b["unit_price"] *= k
+            b["salary"]     *= s
+            if b.get("unit_price_raw"):
+                b["unit_price_raw"] *= k
+            if "fx_override" in so:
+                b["fx_override"] = so["fx_override"]
+    for cfg in cl["cola_configs"].values():
+        cfg["new_up"] *= k
+    return cl
+
+@pytest.mark.parametrize("so", [{}, dict(up_pct=1.1, sal_pct=0.95, attrition=0.08, shrink=0.2),
+                                dict(up_pct=0.9, sal_pct=1.2, attrition=0.0, shrink=0.1, fx_override=45.0),
+                                dict(ctc_override=1.9)])
+def test_scenario_overlay_matches_the_edited_budget(so):
+    cl   = _legacy()
+    g    = dict(DEFAULT_SETTINGS)
+    year = year_totals(load_blocks(copy.deepcopy(cl)), g, so)
+    sg   = dict(g, shrink=so.get("shrink", g["shrink"]), ctc=so.get("ctc_override", g["ctc"]),
+                attrition_rate=so.get("attrition", g["attrition_rate"]))
+    if "fx_override" in so:                                 # every block and the USD conversion
+        sg.update(fx=so["fx_override"], usd_try=g.get("usd_try", g["fx"]))
+    for m in MONTHS:
+        want = _ref_month(_edited(cl, so), m, sg)
+        for k, v in want.items():
+            assert year[m][k] == pytest.approx(v, rel=1e-9, abs=1e-6), (m, k)
+    assert get_totals_scenario("Apr", load_blocks(copy.deepcopy(cl)), g, so)["margin"] == \
+        pytest.approx(year["Apr"]["margin"])
+
+# ── Month-level dirty tracking ──
+def test_tracker_recomputes_only_dirty_months():
+    cl, g, tr = load_blocks(_legacy()), dict(DEFAULT_SETTINGS), MonthTracker()
+    year = lambda: year_totals(cl, g, tracker=tr)
+    year()
+    assert tr.last_dirty == MONTHS
+    cl["blocks"]["May"][1]["hc"] = 20
+    cl["blocks"]["Nov"].pop()
+    assert year() == year_totals(cl, g)
+    assert tr.last_dirty == ["May", "Nov"]
+    cl["cola_configs"][cl["blocks"]["Jan"][1]["id"]] = dict(date="2026-10-20", new_up=16.0)
+    assert year() == year_totals(cl, g)
+    assert tr.last_dirty == ["Oct", "Nov", "Dec"]
+
+def test_tracker_keeps_stats_across_a_settings_change():
+    cl, tr = load_blocks(_legacy()), MonthTracker()
+    first = tr.stats(cl, budget_fps(cl, dict(DEFAULT_SETTINGS))[0])
+    assert tr.stats(cl, budget_fps(cl, dict(DEFAULT_SETTINGS, fx=41.0))[0]) is first